@@ -3,6 +3,9 @@ ChurnGuard - Configuration et Constantes
 Fichier centralisant toutes les configurations de l'application
 """
 
+import os
+import json
+
  
 # INFORMATIONS PROJET
  
@@ -40,6 +43,26 @@ N_SAMPLES = 5000
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
 
+# Génération par blocs (tests de charge à grande échelle)
+GENERATION_CHUNK_SIZE = 250_000
+
+# Cache disque des datasets (une colonne .npy par variable, relue en memory-mapping)
+CACHE_DIR = os.environ.get(
+    'CHURNGUARD_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+)
+DATA_SCHEMA_VERSION = 2
+
+# Fichier clients réel (CSV ou Parquet) ; à défaut, données synthétiques
+DATA_FILE = os.environ.get('CHURNGUARD_DATA_FILE')
+INGEST_CHUNK_SIZE = 200_000
+
+# Moteur des agrégations : 'auto', 'pandas', 'arrow' ou 'polars'.
+# En 'auto', Polars puis pyarrow (multi-threads) sont utilisés s'ils sont
+# installés, à partir de BACKEND_MIN_ROWS lignes ; pandas sinon.
+DATA_BACKEND = os.environ.get('CHURNGUARD_BACKEND', 'auto')
+BACKEND_MIN_ROWS = 1_000_000
+
 # Variables catégorielles
 CATEGORICAL_COLUMNS = ['gender', 'contract_type', 'payment_method', 'online_activity']
 
@@ -49,6 +72,49 @@ NUMERIC_COLUMNS = [
     'num_services', 'support_tickets', 'satisfaction_score'
 ]
 
+# Modalités des variables catégorielles, dans l'ordre de LabelEncoder
+# (tri lexicographique) : les codes pandas coïncident avec l'encodage ML
+CATEGORY_LEVELS = {
+    'gender': ['Femme', 'Homme'],
+    'contract_type': ['Annuel', 'Bi-annuel', 'Mensuel'],
+    'payment_method': ['Carte bancaire', 'Chèque', 'Prélèvement', 'Virement'],
+    'online_activity': ['Faible', 'Moyenne', 'Élevée']
+}
+
+# Types compacts des colonnes non catégorielles
+COLUMN_DTYPES = {
+    'customer_id': 'int32',
+    'age': 'int8',
+    'tenure_months': 'int16',
+    'monthly_charges': 'float32',
+    'total_charges': 'float32',
+    'num_services': 'int8',
+    'support_tickets': 'int16',
+    'satisfaction_score': 'float32',
+    'has_partner': 'int8',
+    'has_dependents': 'int8',
+    'churn': 'int8'
+}
+
+# Format d'affichage de l'identifiant client (stocké en entier)
+CUSTOMER_ID_FORMAT = 'CUST_{:05d}'
+
+# Classes [a, b) des variables numériques dans le cube de segments ;
+# les bornes reprennent les seuils métier (ancienneté < 12, satisfaction < 3...)
+CUBE_NUMERIC_BINS = {
+    'age': [0, 30, 45, 60, float('inf')],
+    'tenure_months': [0, 12, 24, 48, float('inf')],
+    'monthly_charges': [0, 50, 80, float('inf')],
+    'satisfaction_score': [0, 3, 4, float('inf')],
+    'support_tickets': [0, 2, 4, float('inf')]
+}
+
+# Variables de la matrice de corrélation
+CORRELATION_COLUMNS = [
+    'age', 'tenure_months', 'monthly_charges', 'num_services',
+    'support_tickets', 'satisfaction_score', 'churn'
+]
+
 # Labels français pour les colonnes
 COLUMN_LABELS = {
     'customer_id': 'ID Client',
@@ -72,21 +138,126 @@ COLUMN_LABELS = {
 # CONFIGURATION DES MODELES
  
 
+# Recherche des voisins des KNN : 'exact' (scikit-learn) ou 'ann' (forêt de
+# projections aléatoires, utils/neighbors.py) ; ANN_PARAMS règle le compromis
+# rappel / latence (search_trees <= n_trees)
+KNN_SEARCH = os.environ.get('CHURNGUARD_KNN_SEARCH', 'exact')
+ANN_PARAMS = {'n_trees': 16, 'leaf_size': 32, 'search_trees': 8}
+
+if KNN_SEARCH == 'ann':
+    KNN_ESTIMATOR, KNN_PARAMS = 'utils.neighbors.ANNKNeighborsClassifier', ANN_PARAMS
+else:
+    KNN_ESTIMATOR, KNN_PARAMS = 'sklearn.neighbors.KNeighborsClassifier', {}
+
+# Chaque modèle : classe d'estimateur (chemin d'import) et paramètres
 MODELS_CONFIG = {
     'Régression Logistique': {
         'type': 'classification',
+        'estimator': 'sklearn.linear_model.LogisticRegression',
         'params': {'random_state': RANDOM_STATE, 'max_iter': 1000}
     },
     'KNN (k=5)': {
         'type': 'classification',
-        'params': {'n_neighbors': 5}
+        'estimator': KNN_ESTIMATOR,
+        'params': {'n_neighbors': 5, **KNN_PARAMS}
     },
     'KNN (k=11)': {
         'type': 'classification',
-        'params': {'n_neighbors': 11}
+        'estimator': KNN_ESTIMATOR,
+        'params': {'n_neighbors': 11, **KNN_PARAMS}
     }
 }
 
+# Configuration issue d'une recherche d'hyperparamètres (utils/search.py) :
+# fichier JSON au format de MODELS_CONFIG, qui la remplace s'il est fourni
+MODELS_FILE = os.environ.get('CHURNGUARD_MODELS_FILE')
+
+if MODELS_FILE:
+    with open(MODELS_FILE, encoding='utf-8') as f:
+        MODELS_CONFIG = json.load(f)['models']
+
+# Espace de recherche des hyperparamètres : par famille, nom du modèle retenu
+# (gabarit sur ses paramètres, comme dans MODELS_CONFIG), estimateur,
+# paramètres fixes et valeurs candidates (grille complète). Régularisation
+# L2 / L1 par l1_ratio (0 / 1) : ``penalty`` est déprécié depuis scikit-learn 1.8
+SEARCH_SPACE = {
+    'Régression Logistique': {
+        'name': 'Régression Logistique',
+        'estimator': 'sklearn.linear_model.LogisticRegression',
+        'params': {'solver': 'liblinear', 'max_iter': 1000, 'random_state': RANDOM_STATE},
+        'grid': {'C': [0.001, 0.01, 0.1, 1.0, 10.0, 100.0], 'l1_ratio': [0.0, 1.0]}
+    },
+    'KNN': {
+        'name': 'KNN (k={n_neighbors})',
+        'estimator': 'sklearn.neighbors.KNeighborsClassifier',
+        'params': {},
+        'grid': {
+            'n_neighbors': [3, 5, 7, 11, 15, 21, 31, 41, 51],
+            'weights': ['uniform', 'distance'],
+            'metric': ['euclidean', 'manhattan']
+        }
+    }
+}
+
+# Successive halving : un tiers des candidats conservé à chaque tour,
+# échantillon multiplié par SEARCH_FACTOR (au moins SEARCH_MIN_RESOURCES lignes)
+SEARCH_FACTOR = 3
+SEARCH_MIN_RESOURCES = 1000
+SEARCH_CV_FOLDS = 3
+SEARCH_DIR = os.path.join(CACHE_DIR, 'search')
+
+# Entraînements simultanés (threads partageant la matrice ; -1 = tous les cœurs)
+TRAINING_N_JOBS = -1
+
+# Registre des modèles entraînés (clé : empreinte des données et de MODELS_CONFIG)
+REGISTRY_DIR = os.path.join(CACHE_DIR, 'registry')
+
+# Validation croisée : nombre de plis (stratifiés) et cache disque des
+# prédictions hors pli (clé : empreinte des données et des modèles)
+CV_FOLDS = 5
+CV_DIR = os.path.join(CACHE_DIR, 'cv')
+
+# Apprentissage incrémental (lots quotidiens, utils/online.py) : régression
+# logistique par descente de gradient (partial_fit), index KNN fusionné dès
+# que les points ajoutés dépassent ONLINE_REBUILD_FRACTION de l'index, et
+# réentraînement complet tous les ONLINE_REFIT_EVERY lots (0 = jamais)
+ONLINE_SGD_PARAMS = {'loss': 'log_loss', 'alpha': 1e-4, 'random_state': RANDOM_STATE}
+ONLINE_N_NEIGHBORS = 11
+ONLINE_REBUILD_FRACTION = 0.25
+ONLINE_REFIT_EVERY = 7
+# Mémoire des distances requêtes × tampon KNN (octets)
+ONLINE_KNN_MEMORY = 64 * 2**20
+
+# Entraînement hors mémoire (utils/outofcore.py) : features float32 projetées
+# depuis le disque, lues par blocs de OUT_OF_CORE_BLOCK_SIZE lignes
+OUT_OF_CORE_DIR = os.path.join(CACHE_DIR, 'outofcore')
+OUT_OF_CORE_BLOCK_SIZE = 100_000
+OUT_OF_CORE_EPOCHS = 3
+# Mémoire des distances d'un lot de requêtes du KNN hors mémoire (octets) :
+# borne le nombre de requêtes comparées à la fois à un bloc de points
+OUT_OF_CORE_KNN_MEMORY = 64 * 2**20
+# SGD moyenné : sur quelques passes, proche de la régression logistique exacte
+OUT_OF_CORE_SGD_PARAMS = {**ONLINE_SGD_PARAMS, 'average': True}
+
+# Scoring par lots (predict_batch, score.py) : clients prédits par blocs de
+# SCORING_CHUNK_SIZE lignes ; niveaux de risque aux bornes de la jauge de la
+# page Prédiction (probabilité < 0.3, < 0.6, au-delà)
+SCORING_CHUNK_SIZE = 100_000
+RISK_BINS = [0.3, 0.6]
+RISK_LABELS = ['Faible', 'Moyen', 'Élevé']
+
+# Cache des prédictions de la page Prédiction (par processus, éviction LRU)
+PREDICTION_CACHE_SIZE = 10_000
+
+# Serveur de scoring (serve.py) : requêtes simultanées regroupées en lots
+# pendant au plus SERVER_BATCH_WINDOW secondes (SERVER_MAX_BATCH clients),
+# latences des SERVER_LATENCY_SAMPLES dernières requêtes conservées
+SERVER_HOST = os.environ.get('CHURNGUARD_SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.environ.get('CHURNGUARD_SERVER_PORT', 8600))
+SERVER_BATCH_WINDOW = 0.002
+SERVER_MAX_BATCH = 256
+SERVER_LATENCY_SAMPLES = 10_000
+
 # Features pour le ML
 FEATURE_COLUMNS = [
     'age', 'tenure_months', 'monthly_charges', 'total_charges',
@@ -4,32 +4,216 @@ ChurnGuard - Data Loader
 Module de génération et chargement des données
 """
 
+import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
 import pandas as pd
 import numpy as np
 import streamlit as st
-from config import N_SAMPLES, RANDOM_STATE, CATEGORICAL_COLUMNS
+from config import (
+    N_SAMPLES, RANDOM_STATE, CATEGORICAL_COLUMNS, GENERATION_CHUNK_SIZE,
+    CACHE_DIR, DATA_SCHEMA_VERSION, CATEGORY_LEVELS, COLUMN_DTYPES,
+    CUSTOMER_ID_FORMAT, COLUMN_LABELS, DATA_FILE, INGEST_CHUNK_SIZE
+)
+from utils.cube import SegmentCube
+from utils.filters import FilterIndex, Selection
+from utils.stats import SummaryStats
+from utils.store import DatasetStore
+from utils.backends import get_backend, churn_table
+
+
+# Modalités et probabilités des variables catégorielles générées
+GENDER_VALUES = ['Homme', 'Femme']
+CONTRACT_VALUES = ['Mensuel', 'Annuel', 'Bi-annuel']
+CONTRACT_PROBS = [0.5, 0.3, 0.2]
+PAYMENT_VALUES = ['Carte bancaire', 'Prélèvement', 'Virement', 'Chèque']
+PAYMENT_PROBS = [0.4, 0.35, 0.15, 0.1]
+ACTIVITY_VALUES = ['Faible', 'Moyenne', 'Élevée']
+
+
+def _categorical(draws: np.ndarray, values: list, column: str) -> pd.Categorical:
+    """Convertit des indices tirés dans ``values`` en catégorielle au schéma"""
+    levels = CATEGORY_LEVELS[column]
+    remap = np.array([levels.index(v) for v in values], dtype=np.int8)
+    return pd.Categorical.from_codes(remap[draws], categories=levels, validate=False)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convertit un DataFrame clients vers le schéma compact.
+    
+    Les variables de ``CATEGORICAL_COLUMNS`` deviennent des catégorielles
+    pandas (modalités de ``CATEGORY_LEVELS``), les entiers bornés et les
+    montants prennent les types de ``COLUMN_DTYPES`` et l'identifiant
+    ``CUST_xxxxx`` est remplacé par sa clé entière.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Données clients (schéma compact ou non)
+    
+    Returns
+    -------
+    pd.DataFrame
+        Données clients au schéma compact
+    """
+    columns = {}
+    for name in df.columns:
+        values = df[name]
+        if name in CATEGORY_LEVELS:
+            dtype = pd.CategoricalDtype(CATEGORY_LEVELS[name])
+            if values.dtype != dtype:
+                values = values.astype(dtype)
+        elif name == 'customer_id' and not pd.api.types.is_integer_dtype(values):
+            keys = parse_customer_ids(values)
+            if keys.isna().any():
+                raise ValueError(f"{int(keys.isna().sum())} identifiant(s) client illisible(s)")
+            values = keys.astype(COLUMN_DTYPES[name])
+        elif name in COLUMN_DTYPES and values.dtype != COLUMN_DTYPES[name]:
+            values = values.astype(COLUMN_DTYPES[name])
+        columns[name] = values
+    
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def parse_customer_ids(values) -> pd.Series:
+    """
+    Extrait la clé entière d'identifiants clients (NaN si illisible).
+    
+    Une colonne numérique est lue telle quelle (une valeur vide la rend
+    flottante) : seules les valeurs entières sont retenues. Une colonne
+    texte est lue au format ``CUST_xxxxx``.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        keys = pd.to_numeric(values, errors='coerce')
+        return keys.where(np.isfinite(keys) & (keys == np.floor(keys)))
+    digits = values.astype(str).str.extract(r'(\d+)$', expand=False)
+    return pd.to_numeric(digits, errors='coerce')
+
+
+def format_customer_ids(values) -> np.ndarray:
+    """Rend les clés entières au format d'affichage ``CUST_xxxxx``"""
+    return np.array([CUSTOMER_ID_FORMAT.format(int(v)) for v in values], dtype=object)
+
+
+def format_for_display(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prépare un extrait du dataset pour l'affichage.
+    
+    À n'appliquer qu'à un petit nombre de lignes : l'identifiant est rendu
+    en texte ligne par ligne.
+    """
+    display = df.copy()
+    if 'customer_id' in display.columns:
+        display['customer_id'] = format_customer_ids(display['customer_id'])
+    return display
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Empreinte mémoire du DataFrame, par colonne.
+    
+    La colonne ``Octets (non compact)`` estime l'empreinte du schéma
+    historique : entiers et flottants sur 64 bits, textes en objets Python
+    (pointeur + chaîne par ligne).
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Données clients
+    
+    Returns
+    -------
+    pd.DataFrame
+        Type, octets et octets estimés hors schéma compact, par colonne
+    """
+    rows = []
+    for name in df.columns:
+        values = df[name]
+        actual = values.memory_usage(index=False, deep=True)
+        
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            counts = values.value_counts()
+            legacy = len(values) * 8 + sum(sys.getsizeof(k) * c for k, c in counts.items())
+        elif name == 'customer_id':
+            legacy = len(values) * (8 + sys.getsizeof(CUSTOMER_ID_FORMAT.format(0)))
+        elif values.dtype == object:
+            legacy = actual
+        else:
+            legacy = len(values) * 8
+        
+        rows.append({'Colonne': name, 'Type': str(values.dtype), 'Octets': actual, 'Octets (non compact)': legacy})
+    
+    report = pd.DataFrame(rows).set_index('Colonne')
+    report.loc['Total'] = ['', report['Octets'].sum(), report['Octets (non compact)'].sum()]
+    return report
+
+
+def _churn_probability(df: pd.DataFrame) -> pd.Series:
+    """Probabilité de churn dérivée des features (logique métier du générateur)"""
+    return (
+        0.1 +
+        (df['contract_type'] == 'Mensuel').astype(float) * 0.25 +
+        (df['tenure_months'] < 12).astype(float) * 0.15 +
+        (df['support_tickets'] > 3).astype(float) * 0.2 +
+        (df['satisfaction_score'] < 3).astype(float) * 0.25 +
+        (df['monthly_charges'] > 80).astype(float) * 0.1 -
+        (df['num_services'] > 4).astype(float) * 0.15
+    ).clip(0.05, 0.85)
 
 
 @st.cache_data
-def generate_churn_data(n_samples: int = N_SAMPLES) -> pd.DataFrame:
+def generate_churn_data(
+    n_samples: int = N_SAMPLES,
+    seed: int = RANDOM_STATE,
+    chunk_size: int = None,
+    n_jobs: int = 1
+) -> pd.DataFrame:
     """
     Génère des données synthétiques réalistes de churn client.
     
+    Sans ``chunk_size``, le générateur historique (graine globale NumPy)
+    est utilisé. Avec ``chunk_size``, les données sont produites par blocs
+    indépendants (voir ``iter_churn_chunks``) puis assemblées dans des
+    colonnes préallouées : le résultat est identique quel que soit
+    ``n_jobs``.
+    
     Parameters
     ----------
     n_samples : int
         Nombre d'échantillons à générer
-        
+    seed : int
+        Graine aléatoire
+    chunk_size : int, optional
+        Taille des blocs ; active le mode par blocs
+    n_jobs : int
+        Nombre de processus (mode par blocs uniquement, -1 = tous les cœurs)
+    
     Returns
     -------
     pd.DataFrame
         DataFrame contenant les données clients
     """
-    np.random.seed(RANDOM_STATE)
+    if chunk_size is not None:
+        return _assemble_chunks(
+            iter_churn_chunks(n_samples, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs),
+            n_samples
+        )
+    
+    np.random.seed(seed)
     
     # Génération des données de base
     data = {
-        'customer_id': [f'CUST_{i:05d}' for i in range(n_samples)],
+        'customer_id': np.arange(n_samples),
         'age': np.random.normal(45, 15, n_samples).clip(18, 80).astype(int),
         'gender': np.random.choice(['Homme', 'Femme'], n_samples),
         'tenure_months': np.random.exponential(24, n_samples).clip(1, 72).astype(int),
@@ -59,35 +243,770 @@ def generate_churn_data(n_samples: int = N_SAMPLES) -> pd.DataFrame:
     df['total_charges'] = (df['monthly_charges'] * df['tenure_months']).round(2)
     
     # Logique de churn basée sur les features
-    churn_prob = (
-        0.1 +
-        (df['contract_type'] == 'Mensuel').astype(float) * 0.25 +
-        (df['tenure_months'] < 12).astype(float) * 0.15 +
-        (df['support_tickets'] > 3).astype(float) * 0.2 +
-        (df['satisfaction_score'] < 3).astype(float) * 0.25 +
-        (df['monthly_charges'] > 80).astype(float) * 0.1 -
-        (df['num_services'] > 4).astype(float) * 0.15
-    ).clip(0.05, 0.85)
+    churn_prob = _churn_probability(df)
     
     df['churn'] = (np.random.random(n_samples) < churn_prob).astype(int)
     
+    return apply_schema(df)
+
+
+def _generate_chunk(seed: int, chunk_index: int, start: int, n: int) -> pd.DataFrame:
+    """
+    Génère un bloc de clients à partir d'un flux aléatoire indépendant.
+    
+    Le flux est dérivé de ``SeedSequence(seed, spawn_key=(chunk_index,))`` :
+    il ne dépend que de la graine et de la position du bloc, jamais du
+    processus qui l'exécute.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    
+    data = {
+        'customer_id': np.arange(start, start + n),
+        'age': rng.normal(45, 15, n).clip(18, 80).astype(int),
+        'gender': _categorical(rng.integers(0, 2, n), GENDER_VALUES, 'gender'),
+        'tenure_months': rng.exponential(24, n).clip(1, 72).astype(int),
+        'monthly_charges': rng.normal(65, 30, n).clip(20, 150).round(2),
+        'total_charges': np.zeros(n),
+        'contract_type': _categorical(rng.choice(3, n, p=CONTRACT_PROBS), CONTRACT_VALUES, 'contract_type'),
+        'payment_method': _categorical(rng.choice(4, n, p=PAYMENT_PROBS), PAYMENT_VALUES, 'payment_method'),
+        'num_services': rng.poisson(3, n).clip(1, 8),
+        'support_tickets': rng.poisson(2, n),
+        'satisfaction_score': rng.normal(3.5, 1, n).clip(1, 5).round(1),
+        'online_activity': _categorical(rng.integers(0, 3, n), ACTIVITY_VALUES, 'online_activity'),
+        'has_partner': (rng.random(n) < 0.6).astype(int),
+        'has_dependents': (rng.random(n) < 0.3).astype(int)
+    }
+    
+    df = pd.DataFrame(data, index=pd.RangeIndex(start, start + n))
+    df['total_charges'] = (df['monthly_charges'] * df['tenure_months']).round(2)
+    df['churn'] = (rng.random(n) < _churn_probability(df)).astype(int)
+    
+    return apply_schema(df)
+
+
+def empty_frame() -> pd.DataFrame:
+    """DataFrame clients vide, au schéma compact"""
+    return _generate_chunk(RANDOM_STATE, 0, 0, 0)
+
+
+def _generate_chunk_args(args: tuple) -> pd.DataFrame:
+    """Adaptateur pour ``ProcessPoolExecutor.map``"""
+    return _generate_chunk(*args)
+
+
+def iter_churn_chunks(
+    n_samples: int = N_SAMPLES,
+    seed: int = RANDOM_STATE,
+    chunk_size: int = GENERATION_CHUNK_SIZE,
+    n_jobs: int = 1
+) -> Iterator[pd.DataFrame]:
+    """
+    Génère les données clients par blocs, dans l'ordre.
+    
+    Chaque bloc dispose de son propre ``np.random.Generator`` ; les blocs
+    peuvent donc être calculés en parallèle sur un pool de processus sans
+    modifier le résultat. Les blocs sont produits au fil de l'eau, ce qui
+    permet de les écrire sur disque sans matérialiser tout le dataset.
+    
+    Parameters
+    ----------
+    n_samples : int
+        Nombre total de clients
+    seed : int
+        Graine aléatoire
+    chunk_size : int
+        Nombre de clients par bloc
+    n_jobs : int
+        Nombre de processus (1 = séquentiel, -1 = tous les cœurs)
+    
+    Yields
+    ------
+    pd.DataFrame
+        Bloc de données clients (index global conservé)
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size doit être strictement positif")
+    
+    tasks = [
+        (seed, i, start, min(chunk_size, n_samples - start))
+        for i, start in enumerate(range(0, n_samples, chunk_size))
+    ]
+    
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(tasks))
+    
+    if n_jobs <= 1:
+        for task in tasks:
+            yield _generate_chunk(*task)
+        return
+    
+    # "spawn" : pas de fork d'un serveur Streamlit multi-threadé
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as executor:
+        yield from executor.map(_generate_chunk_args, tasks)
+
+
+def _assemble_chunks(chunks: Iterator[pd.DataFrame], n_samples: int) -> pd.DataFrame:
+    """
+    Assemble des blocs dans des colonnes préallouées.
+    
+    Contrairement à ``pd.concat`` sur la liste complète des blocs, le pic
+    mémoire reste proche de la taille finale plus un bloc. ``n_samples``
+    peut n'être qu'une estimation : les colonnes sont agrandies si elle est
+    dépassée et ramenées au nombre de lignes reçues (vues, sans copie).
+    """
+    columns = None
+    offset = 0
+    capacity = n_samples
+    
+    for chunk in chunks:
+        if columns is None:
+            dtypes = chunk.dtypes
+            columns = {
+                name: np.empty(capacity, dtype=_storage(chunk[name]).dtype)
+                for name in chunk.columns
+            }
+        n = len(chunk)
+        if offset + n > capacity:
+            capacity = max(offset + n, 2 * capacity)
+            for name, values in columns.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:offset] = values[:offset]
+                columns[name] = grown
+        for name, values in columns.items():
+            values[offset:offset + n] = _storage(chunk[name])
+        offset += n
+    
+    if columns is None:
+        return empty_frame()
+    
+    columns = {name: values[:offset] for name, values in columns.items()}
+    for name, dtype in dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            columns[name] = pd.Categorical.from_codes(columns[name], dtype=dtype, validate=False)
+    
+    return pd.DataFrame(columns, copy=False)
+
+
+def _storage(values: pd.Series) -> np.ndarray:
+    """Tableau physique d'une colonne (codes pour une catégorielle)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy()
+    return values.to_numpy()
+
+
+def _monthly_hazard(df: pd.DataFrame) -> np.ndarray:
+    """Probabilité mensuelle de churn équivalente à la probabilité annuelle du générateur"""
+    return 1 - (1 - _churn_probability(df).to_numpy()) ** (1 / 12)
+
+
+def _panel_months(seed: int, chunk_index: int, start: int, n: int, n_months: int) -> Iterator[tuple]:
+    """
+    Simule l'historique mensuel d'un bloc de clients.
+    
+    Le mois 0 est l'instantané de ``_generate_chunk`` (churn remis à 0) ;
+    chaque mois suivant fait évoluer tous les clients du bloc en une seule
+    opération vectorisée. Un client qui churne apparaît une dernière fois
+    avec ``churn = 1`` puis sort du panel (événement absorbant).
+    
+    Yields
+    ------
+    tuple
+        ``(mois, DataFrame des clients actifs ce mois-là)``
+    """
+    base = _generate_chunk(seed, chunk_index, start, n)
+    # Flux distinct de celui de l'instantané, toujours dérivé de la position du bloc
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index, 1)))
+    
+    state = base.copy()
+    for column in ['tenure_months', 'support_tickets']:
+        state[column] = state[column].astype(np.int64)
+    for column in ['monthly_charges', 'total_charges', 'satisfaction_score']:
+        state[column] = state[column].astype(np.float64)
+    alive = np.ones(n, dtype=bool)
+    
+    for month in range(n_months):
+        if month > 0:
+            new_tickets = rng.poisson(0.15 + 0.25 * (state['satisfaction_score'].to_numpy() < 3))
+            state['tenure_months'] += 1
+            state['monthly_charges'] = (state['monthly_charges'] * (1 + rng.normal(0.002, 0.01, n))).clip(20, 150).round(2)
+            state['total_charges'] = (state['total_charges'] + state['monthly_charges']).round(2)
+            state['support_tickets'] += new_tickets
+            state['satisfaction_score'] = (
+                state['satisfaction_score'] + rng.normal(0, 0.05, n) - 0.1 * new_tickets
+            ).clip(1, 5).round(1)
+        
+        churned = alive & (rng.random(n) < _monthly_hazard(state))
+        state['churn'] = churned.astype(np.int64)
+        
+        snapshot = apply_schema(state[alive].reset_index(drop=True))
+        snapshot.insert(0, 'month', np.int16(month))
+        yield month, snapshot
+        
+        alive &= ~churned
+        if not alive.any():
+            return
+
+
+def _write_panel_chunk(args: tuple) -> tuple:
+    """Écrit les partitions mensuelles d'un bloc ; renvoie (lignes, octets, fichiers)"""
+    output_dir, file_format, seed, chunk_index, start, n, n_months = args
+    rows, size, files = 0, 0, 0
+    
+    for month, snapshot in _panel_months(seed, chunk_index, start, n, n_months):
+        partition = os.path.join(output_dir, f"month={month:03d}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"part-{chunk_index:05d}.{file_format}")
+        if file_format == 'parquet':
+            snapshot.to_parquet(path, index=False)
+        else:
+            snapshot.to_csv(path, index=False)
+        rows += len(snapshot)
+        size += os.path.getsize(path)
+        files += 1
+    
+    return rows, size, files
+
+
+def generate_churn_panel(
+    output_dir: str,
+    n_customers: int = N_SAMPLES,
+    n_months: int = 24,
+    seed: int = RANDOM_STATE,
+    chunk_size: int = GENERATION_CHUNK_SIZE,
+    n_jobs: int = 1,
+    file_format: str = 'parquet'
+) -> dict:
+    """
+    Génère un panel d'instantanés mensuels par client, en fichiers partitionnés.
+    
+    D'un mois à l'autre, l'ancienneté avance, les charges dérivent, les
+    tickets s'accumulent (davantage chez les clients insatisfaits) et le
+    churn est tiré selon une probabilité mensuelle ; un client churné sort
+    du panel. Les fichiers sont écrits sous ``month=MMM/part-BBBBB.<format>``
+    (un fichier par mois et par bloc de clients), chacun lisible par
+    ``read_customer_file``. Le résultat ne dépend pas de ``n_jobs``.
+    
+    Parameters
+    ----------
+    output_dir : str
+        Répertoire de sortie
+    n_customers : int
+        Nombre de clients au mois 0
+    n_months : int
+        Nombre de mois simulés
+    seed : int
+        Graine aléatoire
+    chunk_size : int
+        Nombre de clients par bloc
+    n_jobs : int
+        Nombre de processus (1 = séquentiel, -1 = tous les cœurs)
+    file_format : str
+        'parquet' (nécessite pyarrow) ou 'csv'
+    
+    Returns
+    -------
+    dict
+        Lignes et fichiers écrits, octets, durée et débit (lignes/s)
+    """
+    if file_format not in ('parquet', 'csv'):
+        raise ValueError(f"Format inconnu : {file_format} (choix : parquet, csv)")
+    if file_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("L'écriture Parquet nécessite pyarrow (pip install pyarrow)") from e
+    if chunk_size <= 0:
+        raise ValueError("chunk_size doit être strictement positif")
+    
+    tasks = [
+        (output_dir, file_format, seed, i, start, min(chunk_size, n_customers - start), n_months)
+        for i, start in enumerate(range(0, n_customers, chunk_size))
+    ]
+    
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(tasks))
+    
+    start_time = time.perf_counter()
+    if n_jobs <= 1:
+        results = [_write_panel_chunk(task) for task in tasks]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as executor:
+            results = list(executor.map(_write_panel_chunk, tasks))
+    seconds = time.perf_counter() - start_time
+    
+    rows = sum(r[0] for r in results)
+    return {
+        'rows': rows,
+        'files': sum(r[2] for r in results),
+        'bytes': sum(r[1] for r in results),
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else float('inf')
+    }
+
+
+def panel_files(output_dir: str) -> list:
+    """Fichiers d'un panel, triés par mois puis par bloc"""
+    files = []
+    for partition in sorted(os.listdir(output_dir)):
+        if partition.startswith('month='):
+            directory = os.path.join(output_dir, partition)
+            files.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory)))
+    return files
+
+
+def dataset_key(n_samples: int = N_SAMPLES, seed: int = RANDOM_STATE) -> str:
+    """Clé du dataset synthétique dans le cache disque"""
+    return f"churn_n{n_samples}_s{seed}_v{DATA_SCHEMA_VERSION}"
+
+
+def save_dataset(df: pd.DataFrame, path: str) -> str:
+    """
+    Écrit un DataFrame dans le cache disque, une colonne ``.npy`` par variable.
+    
+    Les colonnes catégorielles et texte sont stockées sous forme de codes
+    entiers, leurs modalités étant conservées dans ``manifest.json``.
+    L'écriture se fait dans un répertoire temporaire renommé atomiquement :
+    un autre processus ne voit jamais un cache partiel.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Données à écrire
+    path : str
+        Répertoire cible
+    
+    Returns
+    -------
+    str
+        Répertoire du dataset
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp_')
+    
+    manifest = {
+        'schema_version': DATA_SCHEMA_VERSION,
+        'n_rows': len(df),
+        'columns': []
+    }
+    
+    try:
+        for i, name in enumerate(df.columns):
+            entry = {'name': name, 'file': f"{i:03d}.npy"}
+            
+            if isinstance(df[name].dtype, pd.CategoricalDtype):
+                values = _storage(df[name])
+                entry['categories'] = df[name].cat.categories.tolist()
+            elif df[name].dtype == object:
+                codes, categories = pd.factorize(df[name].to_numpy())
+                values = codes.astype(np.int32)
+                entry['categories'] = categories.tolist()
+            else:
+                values = df[name].to_numpy()
+            
+            entry['dtype'] = values.dtype.str
+            np.save(os.path.join(tmp_dir, entry['file']), np.ascontiguousarray(values))
+            manifest['columns'].append(entry)
+        
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        
+        try:
+            os.replace(tmp_dir, path)
+        except OSError:
+            # Un autre processus a publié le même dataset entre-temps
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    
+    return path
+
+
+def load_dataset(path: str, mmap: bool = True) -> pd.DataFrame:
+    """
+    Relit un dataset écrit par ``save_dataset``.
+    
+    Avec ``mmap=True``, les colonnes numériques sont projetées en mémoire
+    (lecture seule) : aucune copie n'est faite et les pages sont partagées
+    entre processus via le cache du système.
+    
+    Parameters
+    ----------
+    path : str
+        Répertoire du dataset
+    mmap : bool
+        Projection mémoire des colonnes
+    
+    Returns
+    -------
+    pd.DataFrame
+        Données clients
+    """
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    if manifest['schema_version'] != DATA_SCHEMA_VERSION:
+        raise ValueError(
+            f"Version de schéma {manifest['schema_version']} incompatible "
+            f"(attendue : {DATA_SCHEMA_VERSION})"
+        )
+    
+    columns = {}
+    for entry in manifest['columns']:
+        # np.asarray : vue ndarray simple sur la projection, sans copie
+        values = np.asarray(np.load(os.path.join(path, entry['file']), mmap_mode='r' if mmap else None))
+        if 'categories' in entry:
+            # from_codes sans validation : les codes restent projetés en mémoire
+            values = pd.Categorical.from_codes(values, categories=entry['categories'], validate=False)
+        columns[entry['name']] = values
+    
+    return pd.DataFrame(columns, copy=False)
+
+
+# Colonnes attendues dans un export client (total_charges est recalculé s'il manque)
+REQUIRED_COLUMNS = [c for c in COLUMN_LABELS if c != 'total_charges']
+BINARY_COLUMNS = ['has_partner', 'has_dependents', 'churn']
+
+
+def _iter_raw_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Lit un fichier CSV ou Parquet par blocs, limité aux colonnes du schéma"""
+    extension = os.path.splitext(path)[1].lower()
+    
+    if extension in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("La lecture Parquet nécessite pyarrow (pip install pyarrow)") from e
+        
+        parquet_file = pq.ParquetFile(path)
+        columns = [c for c in parquet_file.schema_arrow.names if c in COLUMN_LABELS]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            path,
+            chunksize=chunksize,
+            usecols=lambda c: c in COLUMN_LABELS,
+            dtype={c: 'category' for c in CATEGORY_LEVELS}
+        )
+
+
+def _count_rows(path: str) -> int:
+    """
+    Nombre de lignes d'un fichier clients, sans le charger.
+    
+    Lu dans les métadonnées d'un Parquet ; pour un CSV, nombre de fins de
+    ligne (borne supérieure : lignes vides, champs sur plusieurs lignes).
+    """
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("La lecture Parquet nécessite pyarrow (pip install pyarrow)") from e
+        return pq.ParquetFile(path).metadata.num_rows
+    
+    n_lines = 0
+    with open(path, 'rb') as f:
+        while block := f.read(1 << 20):
+            n_lines += block.count(b'\n')
+    # En-tête + lignes, moins une si la dernière n'a pas de fin de ligne : borne supérieure
+    return n_lines
+
+
+def _validate_chunk(chunk: pd.DataFrame, offset: int, errors: str, labelled: bool = True) -> tuple:
+    """
+    Valide un bloc brut et le convertit au schéma compact.
+    
+    Returns
+    -------
+    tuple
+        (bloc compact, nombre de lignes rejetées)
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns and (labelled or c != 'churn')]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+    
+    invalid = np.zeros(len(chunk), dtype=bool)
+    invalid_columns = []
+    columns = {}
+    
+    for name in COLUMN_LABELS:
+        if name not in chunk.columns:
+            continue
+        
+        if name in CATEGORY_LEVELS:
+            values = pd.Categorical(chunk[name], categories=CATEGORY_LEVELS[name])
+            bad = values.codes < 0
+        elif name == 'customer_id':
+            values = chunk[name]
+            if not pd.api.types.is_integer_dtype(values):
+                values = parse_customer_ids(values)
+            bounds = np.iinfo(COLUMN_DTYPES[name])
+            bad = (values.isna() | (values < 0) | (values > bounds.max)).to_numpy()
+        else:
+            values = pd.to_numeric(chunk[name], errors='coerce')
+            bad = values.isna().to_numpy()
+            dtype = np.dtype(COLUMN_DTYPES[name])
+            if dtype.kind == 'i':
+                bounds = np.iinfo(dtype)
+                bad |= ((values < bounds.min) | (values > bounds.max)).to_numpy()
+            if name in BINARY_COLUMNS:
+                bad |= ~values.isin([0, 1]).to_numpy()
+        
+        if bad.any():
+            invalid_columns.append(name)
+            invalid |= bad
+        columns[name] = values
+    
+    n_invalid = int(invalid.sum())
+    if n_invalid and errors == 'raise':
+        first = offset + int(np.flatnonzero(invalid)[0])
+        raise ValueError(
+            f"{n_invalid} ligne(s) invalide(s) à partir de la ligne {first} "
+            f"(colonnes : {', '.join(invalid_columns)})"
+        )
+    
+    df = pd.DataFrame(columns, index=chunk.index)
+    if n_invalid:
+        df = df[~invalid]
+    
+    if 'total_charges' not in df.columns:
+        df.insert(
+            df.columns.get_loc('monthly_charges') + 1,
+            'total_charges',
+            (df['monthly_charges'] * df['tenure_months']).round(2)
+        )
+    
+    return apply_schema(df), n_invalid
+
+
+def read_customer_file(
+    path: str,
+    chunksize: int = INGEST_CHUNK_SIZE,
+    errors: str = 'raise',
+    stats: dict = None,
+    labelled: bool = True
+) -> Iterator[pd.DataFrame]:
+    """
+    Lit un export clients (CSV ou Parquet) par blocs validés.
+    
+    Seules les colonnes de ``COLUMN_LABELS`` sont lues. Chaque bloc est
+    contrôlé (colonnes obligatoires, valeurs manquantes ou hors schéma,
+    bornes des entiers compacts, variables binaires), converti au schéma
+    compact et complété par ``total_charges`` si besoin. La mémoire reste
+    bornée par la taille d'un bloc.
+    
+    Parameters
+    ----------
+    path : str
+        Fichier ``.csv`` ou ``.parquet``
+    chunksize : int
+        Nombre de lignes par bloc
+    errors : str
+        ``'raise'`` (erreur à la première ligne invalide) ou ``'drop'``
+        (lignes invalides écartées)
+    stats : dict, optional
+        Compteurs mis à jour au fil de la lecture (``rows``,
+        ``rejected_rows``, ``chunks``)
+    labelled : bool
+        Si False, la colonne ``churn`` est facultative (clients à scorer)
+    
+    Yields
+    ------
+    pd.DataFrame
+        Bloc de données clients au schéma compact
+    """
+    if errors not in ('raise', 'drop'):
+        raise ValueError("errors doit valoir 'raise' ou 'drop'")
+    
+    if stats is None:
+        stats = {}
+    stats.update(rows=0, rejected_rows=0, chunks=0)
+    
+    offset = 0
+    for raw in _iter_raw_chunks(path, chunksize):
+        chunk, n_invalid = _validate_chunk(raw, offset, errors, labelled)
+        offset += len(raw)
+        stats['rows'] += len(chunk)
+        stats['rejected_rows'] += n_invalid
+        stats['chunks'] += 1
+        yield chunk
+
+
+def ingest_customer_file(path: str, chunksize: int = INGEST_CHUNK_SIZE, errors: str = 'raise') -> tuple:
+    """
+    Charge un export clients complet par blocs.
+    
+    Parameters
+    ----------
+    path : str
+        Fichier ``.csv`` ou ``.parquet``
+    chunksize : int
+        Nombre de lignes par bloc
+    errors : str
+        ``'raise'`` ou ``'drop'`` (voir ``read_customer_file``)
+    
+    Returns
+    -------
+    tuple
+        (DataFrame au schéma compact, rapport d'ingestion : lignes,
+        lignes rejetées, blocs, durée, lignes/s, octets en mémoire)
+    """
+    stats = {}
+    start = time.perf_counter()
+    # Blocs copiés dans des colonnes dimensionnées d'après le fichier : pas de
+    # liste de blocs ni de concaténation (pic mémoire ≈ taille finale + un bloc)
+    df = _assemble_chunks(
+        read_customer_file(path, chunksize=chunksize, errors=errors, stats=stats),
+        _count_rows(path)
+    )
+    
+    seconds = time.perf_counter() - start
+    report = {
+        **stats,
+        'seconds': seconds,
+        'rows_per_sec': stats['rows'] / seconds if seconds > 0 else float('inf'),
+        'bytes': int(df.memory_usage(index=False, deep=True).sum())
+    }
+    return df, report
+
+
+def file_key(path: str) -> str:
+    """Clé d'un fichier clients dans le cache disque (chemin, taille, date)"""
+    info = os.stat(path)
+    signature = f"{os.path.abspath(path)}|{info.st_size}|{info.st_mtime_ns}"
+    digest = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+    return f"file_{digest}_v{DATA_SCHEMA_VERSION}"
+
+
+def data_version(n_samples: int = N_SAMPLES, seed: int = RANDOM_STATE, path: str = None) -> str:
+    """Version des données chargées par ``load_data`` (clé du cache disque)"""
+    path = path or DATA_FILE
+    return file_key(path) if path else dataset_key(n_samples, seed)
+
+
+@st.cache_resource
+def get_store() -> DatasetStore:
+    """Magasin de données unique du processus, partagé par les pages et sessions"""
+    return DatasetStore()
+
+
+def _read_or_build(n_samples: int, seed: int, path: str) -> pd.DataFrame:
+    """Lit les données dans le cache disque, ou les produit et les y écrit"""
+    cache_path = os.path.join(CACHE_DIR, 'datasets', data_version(n_samples, seed, path))
+    
+    if os.path.exists(os.path.join(cache_path, 'manifest.json')):
+        return load_dataset(cache_path)
+    
+    if path:
+        df, _ = ingest_customer_file(path)
+    elif n_samples > GENERATION_CHUNK_SIZE:
+        df = generate_churn_data(n_samples, seed, chunk_size=GENERATION_CHUNK_SIZE, n_jobs=-1)
+    else:
+        df = generate_churn_data(n_samples, seed)
+    
+    save_dataset(df, cache_path)
     return df
 
 
-@st.cache_data
-def load_data() -> pd.DataFrame:
+def load_data(n_samples: int = N_SAMPLES, seed: int = RANDOM_STATE, path: str = None) -> pd.DataFrame:
     """
     Charge les données (génération ou fichier CSV).
     
+    Si ``path`` (ou la variable d'environnement ``CHURNGUARD_DATA_FILE``)
+    désigne un export clients CSV ou Parquet, il est ingéré par blocs ;
+    sinon le dataset synthétique est utilisé. Dans les deux cas, le
+    résultat est lu depuis le cache disque s'il existe, et y est écrit
+    sinon pour les processus suivants.
+    
+    Le dataset n'est chargé qu'une fois par processus, dans le magasin
+    partagé (``get_store``) : chaque appel renvoie une vue sans copie dont
+    les colonnes sont en lecture seule.
+    
+    Parameters
+    ----------
+    n_samples : int
+        Nombre de clients (données synthétiques)
+    seed : int
+        Graine aléatoire (données synthétiques)
+    path : str, optional
+        Fichier clients à charger
+    
     Returns
     -------
     pd.DataFrame
-        DataFrame des données clients
+        DataFrame des données clients (lecture seule)
+    """
+    path = path or DATA_FILE
+    return get_store().get(
+        data_version(n_samples, seed, path),
+        lambda: _read_or_build(n_samples, seed, path)
+    )
+
+
+def get_segment_cube(version: str = None) -> SegmentCube:
+    """
+    Cube de segments des données chargées, partagé par les sessions.
+    
+    Le cube est mémorisé dans le magasin de données et n'est reconstruit
+    que lorsque ``version`` (voir ``data_version``) change.
+    
+    Parameters
+    ----------
+    version : str, optional
+        Version des données (données par défaut si omise)
+    
+    Returns
+    -------
+    SegmentCube
+        Cube des agrégats par segment
+    """
+    version = version or data_version()
+    return get_store().derive(version, 'segment_cube', lambda df: SegmentCube.from_frame(df, version=version))
+
+
+def get_filter_index(version: str = None) -> FilterIndex:
+    """
+    Index de filtres (bitsets) des données chargées, partagé par les sessions.
+    
+    Parameters
+    ----------
+    version : str, optional
+        Version des données (données par défaut si omise)
+    
+    Returns
+    -------
+    FilterIndex
+        Bitsets par modalité des variables catégorielles et du churn
+    """
+    version = version or data_version()
+    return get_store().derive(version, 'filter_index', lambda df: FilterIndex(df, version=version))
+
+
+def get_summary_accumulator(version: str = None) -> SummaryStats:
     """
-    return generate_churn_data()
+    Accumulateur des statistiques résumées des données chargées.
+    
+    Parameters
+    ----------
+    version : str, optional
+        Version des données (données par défaut si omise)
+    
+    Returns
+    -------
+    SummaryStats
+        Accumulateur fusionnable des indicateurs clés
+    """
+    version = version or data_version()
+    return get_store().derive(version, 'summary_stats', SummaryStats.from_frame)
 
 
-def get_summary_stats(df: pd.DataFrame) -> dict:
+def get_summary_stats(df: pd.DataFrame, stats: SummaryStats = None, backend=None) -> dict:
     """
     Calcule les statistiques résumées du dataset.
     
@@ -95,24 +1014,23 @@ def get_summary_stats(df: pd.DataFrame) -> dict:
     ----------
     df : pd.DataFrame
         DataFrame des données
-        
+    stats : SummaryStats, optional
+        Accumulateur déjà alimenté ; les statistiques en sont lues sans
+        parcourir ``df``
+    backend : str, optional
+        Moteur d'agrégation (voir ``utils.backends.get_backend``)
+    
     Returns
     -------
     dict
         Dictionnaire des statistiques
     """
-    return {
-        'total_clients': len(df),
-        'churn_count': df['churn'].sum(),
-        'churn_rate': df['churn'].mean() * 100,
-        'avg_tenure': df['tenure_months'].mean(),
-        'avg_charges': df['monthly_charges'].mean(),
-        'avg_satisfaction': df['satisfaction_score'].mean(),
-        'total_revenue': df['total_charges'].sum()
-    }
+    if stats is None:
+        return get_backend(backend, len(df)).summary_stats(df)
+    return stats.summary()
 
 
-def get_churn_by_category(df: pd.DataFrame, column: str) -> pd.DataFrame:
+def get_churn_by_category(df: pd.DataFrame, column: str, cube: SegmentCube = None, backend=None) -> pd.DataFrame:
     """
     Calcule le taux de churn par catégorie.
     
@@ -122,13 +1040,64 @@ def get_churn_by_category(df: pd.DataFrame, column: str) -> pd.DataFrame:
         DataFrame des données
     column : str
         Colonne catégorielle à analyser
-        
+    cube : SegmentCube, optional
+        Cube pré-calculé sur ``df`` ; la réponse est alors lue dans le cube
+        sans parcourir les lignes
+    backend : str, optional
+        Moteur d'agrégation utilisé sans cube
+    
     Returns
     -------
     pd.DataFrame
         DataFrame avec les statistiques par catégorie
     """
-    return df.groupby(column).agg({
-        'customer_id': 'count',
-        'churn': ['sum', 'mean']
-    }).round(3)
+    if cube is not None and column in cube.dimensions:
+        stats = cube.churn_by(column)
+        index = stats.index
+        if column in CATEGORY_LEVELS:
+            index = pd.CategoricalIndex(index, categories=CATEGORY_LEVELS[column], name=column)
+        return churn_table(index, stats['count'], stats['churn'])
+    
+    return get_backend(backend, len(df)).churn_by_category(df, column)
+
+
+def filter_customers(df: pd.DataFrame, filters: dict, backend=None) -> Selection:
+    """
+    Applique des filtres ``{variable: modalités autorisées}``.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame des données
+    filters : dict
+        Modalités (ou valeurs) retenues par variable
+    backend : str, optional
+        Moteur d'agrégation
+    
+    Returns
+    -------
+    Selection
+        Lignes retenues par tous les filtres
+    """
+    return Selection.from_mask(get_backend(backend, len(df)).filter_mask(df, filters))
+
+
+def get_correlation_matrix(df: pd.DataFrame, columns: list = None, backend=None) -> pd.DataFrame:
+    """
+    Calcule la matrice de corrélation des variables numériques.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame des données
+    columns : list, optional
+        Variables (``CORRELATION_COLUMNS`` par défaut)
+    backend : str, optional
+        Moteur d'agrégation
+    
+    Returns
+    -------
+    pd.DataFrame
+        Matrice de corrélation de Pearson
+    """
+    return get_backend(backend, len(df)).correlation(df, columns)
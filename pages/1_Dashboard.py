@@ -7,50 +7,17 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
-st.set_page_config(page_title="Dashboard - ChurnGuard", layout="wide")
+import sys
+from pathlib import Path
 
-  
-# GÉNÉRATION DES DONNÉES
-  
+sys.path.append(str(Path(__file__).parent.parent))
 
-@st.cache_data
-def load_data():
-    np.random.seed(42)
-    n = 5000
-    
-    data = {
-        'customer_id': [f'CUST_{i:05d}' for i in range(n)],
-        'age': np.random.normal(45, 15, n).clip(18, 80).astype(int),
-        'gender': np.random.choice(['Homme', 'Femme'], n),
-        'tenure_months': np.random.exponential(24, n).clip(1, 72).astype(int),
-        'monthly_charges': np.random.normal(65, 30, n).clip(20, 150).round(2),
-        'contract_type': np.random.choice(['Mensuel', 'Annuel', 'Bi-annuel'], n, p=[0.5, 0.3, 0.2]),
-        'payment_method': np.random.choice(['Carte bancaire', 'Prélèvement', 'Virement', 'Chèque'], n, p=[0.4, 0.35, 0.15, 0.1]),
-        'num_services': np.random.poisson(3, n).clip(1, 8),
-        'support_tickets': np.random.poisson(2, n),
-        'satisfaction_score': np.random.normal(3.5, 1, n).clip(1, 5).round(1),
-        'online_activity': np.random.choice(['Faible', 'Moyenne', 'Élevée'], n),
-        'has_partner': np.random.choice([0, 1], n, p=[0.4, 0.6]),
-        'has_dependents': np.random.choice([0, 1], n, p=[0.7, 0.3])
-    }
-    
-    df = pd.DataFrame(data)
-    df['total_charges'] = (df['monthly_charges'] * df['tenure_months']).round(2)
-    
-    # Logique de churn
-    churn_prob = (
-        0.1 +
-        (df['contract_type'] == 'Mensuel').astype(float) * 0.25 +
-        (df['tenure_months'] < 12).astype(float) * 0.15 +
-        (df['support_tickets'] > 3).astype(float) * 0.2 +
-        (df['satisfaction_score'] < 3).astype(float) * 0.25 +
-        (df['monthly_charges'] > 80).astype(float) * 0.1 -
-        (df['num_services'] > 4).astype(float) * 0.15
-    ).clip(0.05, 0.85)
-    
-    df['churn'] = (np.random.random(n) < churn_prob).astype(int)
-    
-    return df
+from data_loader import (
+    load_data, data_version, get_segment_cube, get_summary_accumulator, get_summary_stats,
+    get_store, format_for_display, memory_report
+)
+
+st.set_page_config(page_title="Dashboard - ChurnGuard", layout="wide")
 
   
 # PAGE
@@ -60,25 +27,27 @@ st.title("Dashboard")
 st.markdown("Vue d'ensemble des données clients et indicateurs clés")
 
 df = load_data()
+cube = get_segment_cube(data_version())
+kpis = get_summary_stats(df, stats=get_summary_accumulator(data_version()))
 
 # KPIs
 st.header("Indicateurs Clés")
 
 col1, col2, col3, col4 = st.columns(4)
 
-churn_rate = df['churn'].mean() * 100
+churn_rate = kpis['churn_rate']
 
 with col1:
-    st.metric("Total Clients", f"{len(df):,}")
+    st.metric("Total Clients", f"{kpis['total_clients']:,}")
 
 with col2:
     st.metric("Taux de Churn", f"{churn_rate:.1f}%", delta=f"{churn_rate - 15:.1f}% vs objectif", delta_color="inverse")
 
 with col3:
-    st.metric("Ancienneté Moyenne", f"{df['tenure_months'].mean():.0f} mois")
+    st.metric("Ancienneté Moyenne", f"{kpis['avg_tenure']:.0f} mois")
 
 with col4:
-    st.metric("Charges Moyennes", f"{df['monthly_charges'].mean():.0f} €/mois")
+    st.metric("Charges Moyennes", f"{kpis['avg_charges']:.0f} €/mois")
 
 st.markdown("---")
 
@@ -87,10 +56,9 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Pie chart churn
-    churn_counts = df['churn'].value_counts()
     fig = go.Figure(data=[go.Pie(
         labels=['Fidèles', 'Churn'],
-        values=[churn_counts.get(0, 0), churn_counts.get(1, 0)],
+        values=[kpis['total_clients'] - kpis['churn_count'], kpis['churn_count']],
         hole=0.5,
         marker_colors=['#2E86AB', '#E94F37']
     )])
@@ -99,7 +67,7 @@ with col1:
 
 with col2:
     # Churn par contrat
-    churn_by_contract = df.groupby('contract_type')['churn'].mean() * 100
+    churn_by_contract = cube.churn_by('contract_type')['churn_rate'] * 100
     fig = go.Figure(data=[go.Bar(
         x=churn_by_contract.index,
         y=churn_by_contract.values,
@@ -119,24 +87,30 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Par Type de Contrat")
-    contract_stats = df.groupby('contract_type').agg({
-        'customer_id': 'count',
-        'churn': 'mean',
-        'monthly_charges': 'mean'
+    segments = cube.churn_by('contract_type')
+    contract_stats = pd.DataFrame({
+        'Nombre': segments['count'],
+        'Taux Churn': segments['churn_rate'],
+        'Charges Moy.': segments['monthly_charges'] / segments['count']
     }).round(2)
-    contract_stats.columns = ['Nombre', 'Taux Churn', 'Charges Moy.']
     contract_stats['Taux Churn'] = (contract_stats['Taux Churn'] * 100).round(1).astype(str) + '%'
     st.dataframe(contract_stats, use_container_width=True)
 
 with col2:
     st.subheader("Insights Clés")
     
-    mensuel_churn = df[df['contract_type'] == 'Mensuel']['churn'].mean() * 100
-    low_sat_churn = df[df['satisfaction_score'] < 3]['churn'].mean() * 100
+    mensuel_churn = cube.total({'contract_type': ['Mensuel']})['churn_rate'] * 100
+    low_sat_churn = cube.total({'satisfaction_score': (None, 3)})['churn_rate'] * 100
     
     st.warning(f"Contrats Mensuels : {mensuel_churn:.1f}% de churn")
     st.error(f"Satisfaction < 3 : {low_sat_churn:.1f}% de churn")
 
 # Données brutes
 with st.expander("Voir les données brutes"):
-    st.dataframe(df.head(100), use_container_width=True)
+    st.dataframe(format_for_display(df.head(100)), use_container_width=True)
+
+# Empreinte mémoire
+with st.expander("Empreinte mémoire du dataset"):
+    st.dataframe(memory_report(df), use_container_width=True)
+    st.caption("Magasin partagé du processus (une seule copie pour toutes les sessions)")
+    st.dataframe(get_store().memory_report(), use_container_width=True, hide_index=True)
@@ -8,49 +8,15 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 
-st.set_page_config(page_title="Analyse - ChurnGuard", layout="wide")
+import sys
+from pathlib import Path
 
-  
-# GÉNÉRATION DES DONNÉES
-  
+sys.path.append(str(Path(__file__).parent.parent))
 
-@st.cache_data
-def load_data():
-    np.random.seed(42)
-    n = 5000
-    
-    data = {
-        'customer_id': [f'CUST_{i:05d}' for i in range(n)],
-        'age': np.random.normal(45, 15, n).clip(18, 80).astype(int),
-        'gender': np.random.choice(['Homme', 'Femme'], n),
-        'tenure_months': np.random.exponential(24, n).clip(1, 72).astype(int),
-        'monthly_charges': np.random.normal(65, 30, n).clip(20, 150).round(2),
-        'contract_type': np.random.choice(['Mensuel', 'Annuel', 'Bi-annuel'], n, p=[0.5, 0.3, 0.2]),
-        'payment_method': np.random.choice(['Carte bancaire', 'Prélèvement', 'Virement', 'Chèque'], n, p=[0.4, 0.35, 0.15, 0.1]),
-        'num_services': np.random.poisson(3, n).clip(1, 8),
-        'support_tickets': np.random.poisson(2, n),
-        'satisfaction_score': np.random.normal(3.5, 1, n).clip(1, 5).round(1),
-        'online_activity': np.random.choice(['Faible', 'Moyenne', 'Élevée'], n),
-        'has_partner': np.random.choice([0, 1], n, p=[0.4, 0.6]),
-        'has_dependents': np.random.choice([0, 1], n, p=[0.7, 0.3])
-    }
-    
-    df = pd.DataFrame(data)
-    df['total_charges'] = (df['monthly_charges'] * df['tenure_months']).round(2)
-    
-    churn_prob = (
-        0.1 +
-        (df['contract_type'] == 'Mensuel').astype(float) * 0.25 +
-        (df['tenure_months'] < 12).astype(float) * 0.15 +
-        (df['support_tickets'] > 3).astype(float) * 0.2 +
-        (df['satisfaction_score'] < 3).astype(float) * 0.25 +
-        (df['monthly_charges'] > 80).astype(float) * 0.1 -
-        (df['num_services'] > 4).astype(float) * 0.15
-    ).clip(0.05, 0.85)
-    
-    df['churn'] = (np.random.random(n) < churn_prob).astype(int)
-    
-    return df
+from config import CORRELATION_COLUMNS
+from data_loader import load_data, data_version, get_segment_cube, get_filter_index, get_correlation_matrix
+
+st.set_page_config(page_title="Analyse - ChurnGuard", layout="wide")
 
   
 # PAGE
@@ -60,14 +26,16 @@ st.title("Analyse Exploratoire")
 st.markdown("Exploration des facteurs de churn et relations entre variables")
 
 df = load_data()
+cube = get_segment_cube(data_version())
+filter_index = get_filter_index(data_version())
 
 # Sidebar - Filtres
 st.sidebar.header("Filtres")
 
 contract_filter = st.sidebar.multiselect(
     "Type de contrat",
-    df['contract_type'].unique(),
-    default=list(df['contract_type'].unique())
+    list(df['contract_type'].cat.categories),
+    default=list(df['contract_type'].cat.categories)
 )
 
 churn_filter = st.sidebar.radio(
@@ -75,15 +43,17 @@ churn_filter = st.sidebar.radio(
     ['Tous', 'Fidèles uniquement', 'Churn uniquement']
 )
 
-# Application des filtres
-df_filtered = df[df['contract_type'].isin(contract_filter)]
+# Application des filtres (bitsets, sans copie du DataFrame)
+segment_filters = {'contract_type': contract_filter}
 
 if churn_filter == 'Fidèles uniquement':
-    df_filtered = df_filtered[df_filtered['churn'] == 0]
+    segment_filters['churn'] = [0]
 elif churn_filter == 'Churn uniquement':
-    df_filtered = df_filtered[df_filtered['churn'] == 1]
+    segment_filters['churn'] = [1]
+
+selection = filter_index.query(segment_filters)
 
-st.info(f"Analyse sur **{len(df_filtered):,}** clients")
+st.info(f"Analyse sur **{selection.count():,}** clients")
 
 st.markdown("---")
 
@@ -94,7 +64,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Churn par méthode de paiement
-    churn_rate = df_filtered.groupby('payment_method')['churn'].mean() * 100
+    churn_rate = cube.churn_by('payment_method', segment_filters)['churn_rate'] * 100
     fig = go.Figure(data=[go.Bar(
         x=churn_rate.index,
         y=churn_rate.values,
@@ -107,7 +77,7 @@ with col1:
 
 with col2:
     # Churn par activité en ligne
-    churn_rate = df_filtered.groupby('online_activity')['churn'].mean() * 100
+    churn_rate = cube.churn_by('online_activity', segment_filters)['churn_rate'] * 100
     fig = go.Figure(data=[go.Bar(
         x=churn_rate.index,
         y=churn_rate.values,
@@ -130,7 +100,7 @@ with col1:
     fig = go.Figure()
     for churn_val, label, color in [(0, 'Fidèles', '#2E86AB'), (1, 'Churn', '#E94F37')]:
         fig.add_trace(go.Histogram(
-            x=df_filtered[df_filtered['churn'] == churn_val]['tenure_months'],
+            x=(selection & filter_index.select('churn', [churn_val])).take(df, ['tenure_months'])['tenure_months'],
             name=label,
             opacity=0.7,
             marker_color=color
@@ -143,7 +113,7 @@ with col2:
     fig = go.Figure()
     for churn_val, label, color in [(0, 'Fidèles', '#2E86AB'), (1, 'Churn', '#E94F37')]:
         fig.add_trace(go.Histogram(
-            x=df_filtered[df_filtered['churn'] == churn_val]['satisfaction_score'],
+            x=(selection & filter_index.select('churn', [churn_val])).take(df, ['satisfaction_score'])['satisfaction_score'],
             name=label,
             opacity=0.7,
             marker_color=color
@@ -156,9 +126,7 @@ st.markdown("---")
 # Matrice de corrélation
 st.header("Matrice de Corrélation")
 
-numeric_cols = ['age', 'tenure_months', 'monthly_charges', 'num_services', 
-               'support_tickets', 'satisfaction_score', 'churn']
-corr_matrix = df_filtered[numeric_cols].corr()
+corr_matrix = get_correlation_matrix(selection.take(df, CORRELATION_COLUMNS))
 
 fig = go.Figure(data=go.Heatmap(
     z=corr_matrix.values,
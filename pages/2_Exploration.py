@@ -10,10 +10,10 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config import CUSTOM_CSS, COLUMN_LABELS, NUMERIC_COLUMNS, CATEGORICAL_COLUMNS
-from data_loader import load_data
+from config import CUSTOM_CSS, COLUMN_LABELS, NUMERIC_COLUMNS, CATEGORICAL_COLUMNS, CORRELATION_COLUMNS
+from data_loader import load_data, data_version, get_segment_cube, get_filter_index, get_correlation_matrix
 from utils.visualizations import (
-    plot_churn_by_feature, plot_correlation_matrix, 
+    plot_churn_by_feature, plot_churn_rate, plot_correlation_matrix, 
     plot_histogram, plot_boxplot
 )
 
@@ -36,6 +36,8 @@ st.markdown('<p class="subtitle">Analyse univariée et multivariée des facteurs
   
 
 df = load_data()
+cube = get_segment_cube(data_version())
+filter_index = get_filter_index(data_version())
 
   
 # SIDEBAR - FILTRES
@@ -45,8 +47,8 @@ st.sidebar.header("Filtres")
 
 contract_filter = st.sidebar.multiselect(
     "Type de contrat",
-    df['contract_type'].unique(),
-    default=list(df['contract_type'].unique())
+    list(df['contract_type'].cat.categories),
+    default=list(df['contract_type'].cat.categories)
 )
 
 churn_filter = st.sidebar.radio(
@@ -54,15 +56,17 @@ churn_filter = st.sidebar.radio(
     ['Tous', 'Fidèles uniquement', 'Churn uniquement']
 )
 
-# Application des filtres
-df_filtered = df[df['contract_type'].isin(contract_filter)]
+# Application des filtres (bitsets, sans copie du DataFrame)
+segment_filters = {'contract_type': contract_filter}
 
 if churn_filter == 'Fidèles uniquement':
-    df_filtered = df_filtered[df_filtered['churn'] == 0]
+    segment_filters['churn'] = [0]
 elif churn_filter == 'Churn uniquement':
-    df_filtered = df_filtered[df_filtered['churn'] == 1]
+    segment_filters['churn'] = [1]
 
-st.sidebar.info(f"{len(df_filtered):,} clients analysés")
+selection = filter_index.query(segment_filters)
+
+st.sidebar.info(f"{selection.count():,} clients analysés")
 
 st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
 
@@ -79,13 +83,13 @@ with tab1:
     
     with col1:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'contract_type', "Churn par Type de Contrat"),
+            plot_churn_rate(cube.churn_by('contract_type', segment_filters), 'contract_type', "Churn par Type de Contrat"),
             use_container_width=True
         )
     
     with col2:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'payment_method', "Churn par Méthode de Paiement"),
+            plot_churn_rate(cube.churn_by('payment_method', segment_filters), 'payment_method', "Churn par Méthode de Paiement"),
             use_container_width=True
         )
     
@@ -93,13 +97,13 @@ with tab1:
     
     with col1:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'online_activity', "Churn par Activité en Ligne"),
+            plot_churn_rate(cube.churn_by('online_activity', segment_filters), 'online_activity', "Churn par Activité en Ligne"),
             use_container_width=True
         )
     
     with col2:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'gender', "Churn par Genre"),
+            plot_churn_rate(cube.churn_by('gender', segment_filters), 'gender', "Churn par Genre"),
             use_container_width=True
         )
 
@@ -108,13 +112,13 @@ with tab2:
     
     with col1:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'tenure_months', "Distribution de l'Ancienneté"),
+            plot_churn_by_feature(selection.take(df, ['tenure_months', 'churn']), 'tenure_months', "Distribution de l'Ancienneté"),
             use_container_width=True
         )
     
     with col2:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'monthly_charges', "Distribution des Charges Mensuelles"),
+            plot_churn_by_feature(selection.take(df, ['monthly_charges', 'churn']), 'monthly_charges', "Distribution des Charges Mensuelles"),
             use_container_width=True
         )
     
@@ -122,13 +126,13 @@ with tab2:
     
     with col1:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'satisfaction_score', "Distribution de la Satisfaction"),
+            plot_churn_by_feature(selection.take(df, ['satisfaction_score', 'churn']), 'satisfaction_score', "Distribution de la Satisfaction"),
             use_container_width=True
         )
     
     with col2:
         st.plotly_chart(
-            plot_churn_by_feature(df_filtered, 'support_tickets', "Distribution des Tickets Support"),
+            plot_churn_by_feature(selection.take(df, ['support_tickets', 'churn']), 'support_tickets', "Distribution des Tickets Support"),
             use_container_width=True
         )
 
@@ -144,13 +148,13 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.plotly_chart(
-        plot_boxplot(df_filtered, 'monthly_charges', 'churn', "Charges Mensuelles par Statut Churn"),
+        plot_boxplot(selection.take(df, ['monthly_charges', 'churn']), 'monthly_charges', 'churn', "Charges Mensuelles par Statut Churn"),
         use_container_width=True
     )
 
 with col2:
     st.plotly_chart(
-        plot_boxplot(df_filtered, 'tenure_months', 'churn', "Ancienneté par Statut Churn"),
+        plot_boxplot(selection.take(df, ['tenure_months', 'churn']), 'tenure_months', 'churn', "Ancienneté par Statut Churn"),
         use_container_width=True
     )
 
@@ -162,7 +166,8 @@ st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
 
 st.markdown('<div class="section-header">Matrice de Corrélation</div>', unsafe_allow_html=True)
 
-st.plotly_chart(plot_correlation_matrix(df_filtered), use_container_width=True)
+corr_matrix = get_correlation_matrix(selection.take(df, CORRELATION_COLUMNS))
+st.plotly_chart(plot_correlation_matrix(df, corr_matrix), use_container_width=True)
 
 st.markdown("""
 <div class="insight-card">
@@ -214,4 +219,4 @@ with col3:
   
 
 with st.expander("Statistiques Descriptives Complètes"):
-    st.dataframe(df_filtered.describe().round(2), use_container_width=True)
+    st.dataframe(selection.take(df, list(df.columns.drop('customer_id'))).describe().round(2), use_container_width=True)
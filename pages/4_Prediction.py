@@ -6,94 +6,33 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.linear_model import LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import CATEGORY_LEVELS
+from data_loader import load_data, data_version
+from utils.models import (
+    get_model_features, split_features, train_models, registry_key, predict_single, get_prediction_cache,
+    sensitivity_curves
+)
+from utils.visualizations import plot_sensitivity_curves
 
 st.set_page_config(page_title="Prédiction - ChurnGuard", layout="wide")
 
   
-# GÉNÉRATION DES DONNÉES ET MODÈLES
+# MODÈLES
   
 
-@st.cache_data
-def load_data():
-    np.random.seed(42)
-    n = 5000
-    
-    data = {
-        'customer_id': [f'CUST_{i:05d}' for i in range(n)],
-        'age': np.random.normal(45, 15, n).clip(18, 80).astype(int),
-        'gender': np.random.choice(['Homme', 'Femme'], n),
-        'tenure_months': np.random.exponential(24, n).clip(1, 72).astype(int),
-        'monthly_charges': np.random.normal(65, 30, n).clip(20, 150).round(2),
-        'contract_type': np.random.choice(['Mensuel', 'Annuel', 'Bi-annuel'], n, p=[0.5, 0.3, 0.2]),
-        'payment_method': np.random.choice(['Carte bancaire', 'Prélèvement', 'Virement', 'Chèque'], n, p=[0.4, 0.35, 0.15, 0.1]),
-        'num_services': np.random.poisson(3, n).clip(1, 8),
-        'support_tickets': np.random.poisson(2, n),
-        'satisfaction_score': np.random.normal(3.5, 1, n).clip(1, 5).round(1),
-        'online_activity': np.random.choice(['Faible', 'Moyenne', 'Élevée'], n),
-        'has_partner': np.random.choice([0, 1], n, p=[0.4, 0.6]),
-        'has_dependents': np.random.choice([0, 1], n, p=[0.7, 0.3])
-    }
-    
-    df = pd.DataFrame(data)
-    df['total_charges'] = (df['monthly_charges'] * df['tenure_months']).round(2)
-    
-    churn_prob = (
-        0.1 +
-        (df['contract_type'] == 'Mensuel').astype(float) * 0.25 +
-        (df['tenure_months'] < 12).astype(float) * 0.15 +
-        (df['support_tickets'] > 3).astype(float) * 0.2 +
-        (df['satisfaction_score'] < 3).astype(float) * 0.25 +
-        (df['monthly_charges'] > 80).astype(float) * 0.1 -
-        (df['num_services'] > 4).astype(float) * 0.15
-    ).clip(0.05, 0.85)
-    
-    df['churn'] = (np.random.random(n) < churn_prob).astype(int)
-    
-    return df
-
-@st.cache_resource
 def prepare_and_train():
     df = load_data()
-    df_ml = df.copy()
-    
-    label_encoders = {}
-    categorical_cols = ['gender', 'contract_type', 'payment_method', 'online_activity']
-    
-    for col in categorical_cols:
-        le = LabelEncoder()
-        df_ml[col + '_encoded'] = le.fit_transform(df_ml[col])
-        label_encoders[col] = le
-    
-    feature_cols = [
-        'age', 'tenure_months', 'monthly_charges', 'total_charges',
-        'num_services', 'support_tickets', 'satisfaction_score',
-        'has_partner', 'has_dependents',
-        'gender_encoded', 'contract_type_encoded', 
-        'payment_method_encoded', 'online_activity_encoded'
-    ]
-    
-    X = df_ml[feature_cols]
-    y = df_ml['churn']
-    
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    
-    models = {
-        'Régression Logistique': LogisticRegression(random_state=42, max_iter=1000),
-        'KNN (k=5)': KNeighborsClassifier(n_neighbors=5),
-        'KNN (k=11)': KNeighborsClassifier(n_neighbors=11)
-    }
-    
-    for model in models.values():
-        model.fit(X_train_scaled, y_train)
-    
-    return models, scaler, label_encoders
+    version = data_version()
+    X, y, preprocessor, _ = get_model_features(version, df)
+    X_train, _, y_train, _ = split_features(X, y)
+    models, trained_preprocessor = train_models(X_train, y_train, preprocessor, version)
+    return models, trained_preprocessor, registry_key(X_train, y_train, preprocessor, version)
 
   
 # PAGE
@@ -102,12 +41,14 @@ def prepare_and_train():
 st.title("Prédiction Individuelle")
 st.markdown("Estimez le risque de churn pour un client spécifique")
 
-models, scaler, label_encoders = prepare_and_train()
+models, preprocessor, models_key = prepare_and_train()
 
 # Sidebar
 st.sidebar.header("Configuration")
 selected_model = st.sidebar.selectbox("Modèle", list(models.keys()))
 
+prediction_cache = get_prediction_cache()
+
 st.markdown("---")
 
 # Formulaire
@@ -142,27 +83,29 @@ st.markdown("---")
 if st.button("Analyser le Risque", type="primary", use_container_width=True):
     
     # Préparation
-    new_data = pd.DataFrame({
-        'age': [age],
-        'tenure_months': [tenure],
-        'monthly_charges': [monthly],
-        'total_charges': [monthly * tenure],
-        'num_services': [num_services],
-        'support_tickets': [tickets],
-        'satisfaction_score': [satisfaction],
-        'has_partner': [1 if has_partner else 0],
-        'has_dependents': [1 if has_dependents else 0],
-        'gender_encoded': [label_encoders['gender'].transform([gender])[0]],
-        'contract_type_encoded': [label_encoders['contract_type'].transform([contract])[0]],
-        'payment_method_encoded': [label_encoders['payment_method'].transform([payment])[0]],
-        'online_activity_encoded': [label_encoders['online_activity'].transform([activity])[0]]
-    })
-    
-    features_scaled = scaler.transform(new_data)
+    new_data = {
+        'age': age,
+        'tenure_months': tenure,
+        'monthly_charges': monthly,
+        'total_charges': monthly * tenure,
+        'num_services': num_services,
+        'support_tickets': tickets,
+        'satisfaction_score': satisfaction,
+        'has_partner': 1 if has_partner else 0,
+        'has_dependents': 1 if has_dependents else 0,
+        'gender': gender,
+        'contract_type': contract,
+        'payment_method': payment,
+        'online_activity': activity
+    }
     
-    model = models[selected_model]
-    prediction = model.predict(features_scaled)[0]
-    proba = model.predict_proba(features_scaled)[0][1] if hasattr(model, 'predict_proba') else prediction
+    # Cache partagé : une combinaison déjà scorée (par toute session) n'est pas
+    # reprédite ; les entrées sont invalidées quand les modèles changent
+    # (clé du registre : données, configuration des modèles, découpage)
+    prediction, proba = prediction_cache.get_or_predict(
+        selected_model, models_key, new_data,
+        lambda: predict_single(models[selected_model], preprocessor, new_data)
+    )
     
     st.markdown("---")
     
@@ -221,6 +164,24 @@ if st.button("Analyser le Risque", type="primary", use_container_width=True):
     
     st.markdown("---")
     
+    # Sensibilité : chaque variable parcourt la plage de son contrôle, les
+    # autres restant celles du client (une seule prédiction par lot)
+    st.header("Sensibilité du Risque")
+    
+    sensitivity_ranges = {
+        'age': np.arange(18, 81),
+        'tenure_months': np.arange(1, 73),
+        'monthly_charges': np.arange(20.0, 151.0),
+        'num_services': np.arange(1, 9),
+        'support_tickets': np.arange(0, 11),
+        'satisfaction_score': np.round(np.arange(1.0, 5.05, 0.1), 1),
+        **{column: CATEGORY_LEVELS[column] for column in ['gender', 'contract_type', 'payment_method', 'online_activity']}
+    }
+    curves = sensitivity_curves(models[selected_model], preprocessor, new_data, sensitivity_ranges)
+    st.plotly_chart(plot_sensitivity_curves(curves, new_data), use_container_width=True)
+    
+    st.markdown("---")
+    
     # Recommandations
     st.header("Recommandations")
     
@@ -247,3 +208,10 @@ if st.button("Analyser le Risque", type="primary", use_container_width=True):
         - Proposer des services complémentaires
         - Programme parrainage
         """)
+
+# Cache des prédictions (partagé par toutes les sessions)
+cache_stats = prediction_cache.stats()
+st.sidebar.caption(
+    f"Cache de prédictions : {cache_stats['hits']} réutilisées, "
+    f"{cache_stats['misses']} calculées ({cache_stats['size']} en mémoire)"
+)
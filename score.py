@@ -0,0 +1,187 @@
+"""
+ChurnGuard - Scoring de Fichiers Clients
+========================================
+Scoring d'un export clients complet (CSV ou Parquet) par blocs : probabilité
+de churn, prédiction et niveau de risque écrits au fil de la lecture
+
+Usage :
+    python score.py clients.parquet scores.parquet --model "Régression Logistique"
+"""
+
+import os
+import time
+import argparse
+
+import pandas as pd
+
+from config import SCORING_CHUNK_SIZE
+from data_loader import load_data, data_version, read_customer_file, format_customer_ids
+from utils.models import get_model_features, split_features, train_models, predict_batch, risk_levels
+from utils.evaluation import DEFAULT_THRESHOLD
+from utils.outofcore import PeakMemory
+
+
+# Colonnes du fichier de scores
+SCORE_COLUMNS = ['customer_id', 'churn_probability', 'churn_prediction', 'risk_level']
+
+
+def load_scoring_models() -> tuple:
+    """
+    Modèles et prétraitement de l'application (ceux de la page Prédiction).
+    
+    Les modèles sont rechargés depuis le registre disque s'ils y sont déjà.
+    
+    Returns
+    -------
+    tuple
+        (models, preprocessor)
+    """
+    df = load_data()
+    version = data_version()
+    X, y, preprocessor, _ = get_model_features(version, df)
+    X_train, _, y_train, _ = split_features(X, y)
+    return train_models(X_train, y_train, preprocessor, version)
+
+
+class _ScoreWriter:
+    """Écriture par blocs d'un fichier de scores (CSV ou Parquet)"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+        self._writer = None
+        self._header = True
+    
+    @property
+    def empty(self) -> bool:
+        """Vrai si aucun bloc n'a été écrit"""
+        return self._header and self._writer is None
+    
+    def write(self, df: pd.DataFrame, tmp_path: str):
+        if not self.parquet:
+            df.to_csv(tmp_path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+            return
+        
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("L'écriture Parquet nécessite pyarrow (pip install pyarrow)") from e
+        
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(tmp_path, table.schema)
+        self._writer.write_table(table)
+    
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_customer_file(path: str, output: str, model, preprocessor, chunksize: int = SCORING_CHUNK_SIZE,
+                        threshold: float = DEFAULT_THRESHOLD, errors: str = 'raise') -> dict:
+    """
+    Score un export clients et écrit les résultats par blocs.
+    
+    Le fichier est lu et validé par ``read_customer_file`` (colonne
+    ``churn`` facultative), chaque bloc est prédit en une inférence
+    (``predict_batch``) puis ajouté au fichier de sortie : la mémoire reste
+    bornée par la taille d'un bloc. Le fichier de sortie n'est publié
+    (renommage atomique) qu'une fois complet.
+    
+    Parameters
+    ----------
+    path : str
+        Export clients (``.csv`` ou ``.parquet``)
+    output : str
+        Fichier de scores (``.csv`` ou ``.parquet``) : ``customer_id``,
+        ``churn_probability``, ``churn_prediction``, ``risk_level``
+    model : estimator
+        Modèle entraîné
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    chunksize : int
+        Clients par bloc
+    threshold : float
+        Seuil de décision de ``churn_prediction``
+    errors : str
+        ``'raise'`` ou ``'drop'`` (lignes invalides écartées)
+    
+    Returns
+    -------
+    dict
+        Lignes scorées et rejetées, clients à risque, durée, débit
+        (lignes/s) et mémoire résidente de pointe
+    """
+    stats = {}
+    n_churn = 0
+    writer = _ScoreWriter(output)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    
+    start = time.perf_counter()
+    with PeakMemory() as memory:
+        try:
+            for chunk in read_customer_file(path, chunksize, errors, stats, labelled=False):
+                predictions, probabilities = predict_batch(model, preprocessor, chunk, chunksize, threshold)
+                n_churn += int(predictions.sum())
+                writer.write(pd.DataFrame({
+                    'customer_id': format_customer_ids(chunk['customer_id']),
+                    'churn_probability': probabilities,
+                    'churn_prediction': predictions,
+                    'risk_level': risk_levels(probabilities)
+                }), tmp_path)
+            if writer.empty:
+                writer.write(pd.DataFrame(columns=SCORE_COLUMNS), tmp_path)
+            writer.close()
+            os.replace(tmp_path, output)
+        except BaseException:
+            writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    seconds = time.perf_counter() - start
+    
+    return {
+        'rows': stats['rows'],
+        'rejected_rows': stats['rejected_rows'],
+        'churn_predicted': n_churn,
+        'seconds': seconds,
+        'rows_per_second': stats['rows'] / seconds if seconds else float('nan'),
+        'peak_rss_bytes': memory.peak
+    }
+
+
+def main(argv: list = None) -> dict:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Score un export clients (CSV ou Parquet) par blocs")
+    parser.add_argument('input', help="Export clients (.csv ou .parquet)")
+    parser.add_argument('output', help="Fichier de scores (.csv ou .parquet)")
+    parser.add_argument('--model', default=None, help="Modèle à utiliser (premier modèle par défaut)")
+    parser.add_argument('--chunksize', type=int, default=SCORING_CHUNK_SIZE, help="Clients par bloc")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Seuil de décision")
+    parser.add_argument('--errors', choices=['raise', 'drop'], default='raise',
+                        help="Lignes invalides : erreur ou rejet")
+    args = parser.parse_args(argv)
+    
+    models, preprocessor = load_scoring_models()
+    name = args.model or next(iter(models))
+    if name not in models:
+        parser.error(f"Modèle inconnu : {name} (choix : {', '.join(models)})")
+    
+    report = score_customer_file(
+        args.input, args.output, models[name], preprocessor,
+        args.chunksize, args.threshold, args.errors
+    )
+    peak = f"{report['peak_rss_bytes'] / 1e6:.0f} Mo" if report['peak_rss_bytes'] else "inconnue"
+    print(
+        f"{name} : {report['rows']} clients scorés ({report['rejected_rows']} rejetés, "
+        f"{report['churn_predicted']} à risque) en {report['seconds']:.1f} s, "
+        f"{report['rows_per_second']:.0f} clients/s, mémoire de pointe {peak}"
+    )
+    return report
+
+
+if __name__ == '__main__':
+    main()
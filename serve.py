@@ -0,0 +1,325 @@
+"""
+ChurnGuard - Serveur de Scoring
+===============================
+Service HTTP local (bibliothèque standard) : modèles chargés une fois,
+requêtes simultanées regroupées en micro-lots, latences p50/p99 et débit
+
+Usage :
+    python serve.py --port 8600 --window 0.002
+
+    curl -X POST localhost:8600/predict -d '{"age": 35, "gender": "Homme", ...}'
+    curl localhost:8600/stats
+"""
+
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import numpy as np
+
+from config import (
+    SERVER_HOST, SERVER_PORT, SERVER_BATCH_WINDOW, SERVER_MAX_BATCH, SERVER_LATENCY_SAMPLES
+)
+from score import load_scoring_models
+from utils.models import predict_batch, risk_levels
+
+
+class LatencyStats:
+    """
+    Latences et débit des dernières requêtes.
+    
+    Parameters
+    ----------
+    samples : int
+        Nombre de requêtes conservées pour les percentiles et le débit
+    """
+    
+    def __init__(self, samples: int = SERVER_LATENCY_SAMPLES):
+        self._recent = deque(maxlen=samples)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_rows = 0
+    
+    def record(self, latency: float, error: bool = False):
+        """Enregistre une requête terminée (latence en secondes)"""
+        with self._lock:
+            self._recent.append((time.perf_counter(), latency))
+            self.requests += 1
+            self.errors += error
+    
+    def record_batch(self, size: int):
+        """Enregistre un micro-lot prédit"""
+        with self._lock:
+            self.batches += 1
+            self.batched_rows += size
+    
+    def snapshot(self) -> dict:
+        """
+        État courant.
+        
+        Returns
+        -------
+        dict
+            Compteurs, taille moyenne des lots, latences p50/p99 (ms) et
+            débit (requêtes/s) sur les dernières requêtes
+        """
+        with self._lock:
+            recent = np.array(self._recent) if self._recent else np.empty((0, 2))
+            snapshot = {
+                'requests': self.requests,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch_size': self.batched_rows / self.batches if self.batches else 0.0,
+                'uptime_seconds': time.time() - self.started
+            }
+        
+        if len(recent):
+            latencies = recent[:, 1] * 1000
+            span = recent[-1, 0] - recent[0, 0] + recent[0, 1]
+            snapshot.update(
+                p50_ms=float(np.percentile(latencies, 50)),
+                p99_ms=float(np.percentile(latencies, 99)),
+                throughput_rps=len(recent) / span if span > 0 else 0.0
+            )
+        else:
+            snapshot.update(p50_ms=None, p99_ms=None, throughput_rps=0.0)
+        return snapshot
+
+
+class MicroBatcher:
+    """
+    Regroupe des requêtes individuelles en micro-lots.
+    
+    Un thread unique attend la première requête, collecte celles qui
+    arrivent pendant ``window`` secondes (au plus ``max_batch``) et les
+    prédit en un appel. Si le lot échoue (client invalide), chaque requête
+    est reprise seule : l'erreur ne concerne que la requête fautive.
+    
+    Parameters
+    ----------
+    score : callable
+        Fonction ``list of dict -> list of dict`` (un résultat par client)
+    window : float
+        Attente maximale après la première requête d'un lot (secondes)
+    max_batch : int
+        Taille maximale d'un lot
+    stats : LatencyStats, optional
+        Compteurs de lots
+    """
+    
+    def __init__(self, score, window: float = SERVER_BATCH_WINDOW, max_batch: int = SERVER_MAX_BATCH,
+                 stats: LatencyStats = None):
+        self.score = score
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = stats
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def submit(self, record: dict) -> Future:
+        """Ajoute un client au prochain lot ; le résultat arrive dans le ``Future``"""
+        future = Future()
+        self._queue.put((record, future))
+        return future
+    
+    def close(self):
+        """Arrête le thread après les requêtes en attente"""
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _collect(self, first) -> list:
+        """Lot commençant par ``first`` : requêtes arrivées pendant la fenêtre"""
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+    
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            if self.stats is not None:
+                self.stats.record_batch(len(batch))
+            
+            try:
+                results = self.score([record for record, _ in batch])
+            except Exception:
+                results = None
+            
+            for i, (record, future) in enumerate(batch):
+                if results is not None:
+                    future.set_result(results[i])
+                    continue
+                try:
+                    future.set_result(self.score([record])[0])
+                except Exception as e:
+                    future.set_exception(e)
+
+
+def make_scorer(model, preprocessor):
+    """
+    Fonction de score d'un micro-lot pour ``MicroBatcher``.
+    
+    ``total_charges`` est déduit des charges mensuelles et de l'ancienneté
+    s'il n'est pas fourni (comme sur la page Prédiction).
+    """
+    def score(records: list) -> list:
+        df = pd.DataFrame.from_records(records)
+        derived = df['monthly_charges'] * df['tenure_months']
+        df['total_charges'] = df['total_charges'].fillna(derived) if 'total_charges' in df else derived
+        predictions, probabilities = predict_batch(model, preprocessor, df)
+        levels = risk_levels(probabilities)
+        return [
+            {'probability': float(p), 'prediction': int(c), 'risk_level': str(r)}
+            for p, c, r in zip(probabilities, predictions, levels)
+        ]
+    return score
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """
+    Serveur HTTP de scoring.
+    
+    Routes : ``POST /predict`` (un client ou une liste de clients en JSON ;
+    paramètre ``?model=`` facultatif), ``GET /stats`` et ``GET /health``.
+    
+    Parameters
+    ----------
+    address : tuple
+        (hôte, port)
+    models : dict
+        Modèles entraînés (un micro-batcher par modèle)
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    window : float
+        Fenêtre de regroupement (secondes)
+    max_batch : int
+        Taille maximale d'un lot
+    """
+    
+    daemon_threads = True
+    request_queue_size = 128
+    
+    def __init__(self, address: tuple, models: dict, preprocessor, window: float = SERVER_BATCH_WINDOW,
+                 max_batch: int = SERVER_MAX_BATCH):
+        super().__init__(address, ScoringHandler)
+        self.stats = LatencyStats()
+        self.default_model = next(iter(models))
+        self.batchers = {
+            name: MicroBatcher(make_scorer(model, preprocessor), window, max_batch, self.stats)
+            for name, model in models.items()
+        }
+    
+    def server_close(self):
+        super().server_close()
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """Requêtes du serveur de scoring (HTTP/1.1, connexions persistantes)"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Réponses courtes sur connexion persistante : sans TCP_NODELAY, l'ACK
+    # retardé du client ajoute ~40 ms à chaque requête
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/stats':
+            self._send(200, self.server.stats.snapshot())
+        elif path == '/health':
+            self._send(200, {'status': 'ok', 'models': list(self.server.batchers)})
+        else:
+            self._send(404, {'error': f"Route inconnue : {path}"})
+    
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != '/predict':
+            self._send(404, {'error': f"Route inconnue : {url.path}"})
+            return
+        
+        name = parse_qs(url.query).get('model', [self.server.default_model])[0]
+        batcher = self.server.batchers.get(name)
+        if batcher is None:
+            self._send(404, {'error': f"Modèle inconnu : {name}"})
+            return
+        
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            records = payload if isinstance(payload, list) else [payload]
+            if not all(isinstance(record, dict) for record in records):
+                raise ValueError("Un client est un objet JSON")
+            futures = [batcher.submit(record) for record in records]
+            results = [future.result() for future in futures]
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+            self.server.stats.record(time.perf_counter() - start, error=True)
+            return
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+            self.server.stats.record(time.perf_counter() - start, error=True)
+            return
+        
+        self._send(200, results if isinstance(payload, list) else results[0])
+        self.server.stats.record(time.perf_counter() - start)
+
+
+def main(argv: list = None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Serveur HTTP de scoring avec micro-lots")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--window', type=float, default=SERVER_BATCH_WINDOW,
+                        help="Fenêtre de regroupement des requêtes (secondes)")
+    parser.add_argument('--max-batch', type=int, default=SERVER_MAX_BATCH, help="Clients par lot au plus")
+    args = parser.parse_args(argv)
+    
+    models, preprocessor = load_scoring_models()
+    server = ScoringServer((args.host, args.port), models, preprocessor, args.window, args.max_batch)
+    print(f"Scoring sur http://{args.host}:{args.port} (modèles : {', '.join(models)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.snapshot(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+ChurnGuard - Fixtures de Test
+=============================
+Données clients synthétiques partagées par les tests
+"""
+
+import os
+import tempfile
+
+# Caches disque (datasets, registre, validation croisée) isolés de ceux de l'application
+os.environ.setdefault('CHURNGUARD_CACHE_DIR', tempfile.mkdtemp(prefix='churnguard_tests_'))
+
+import pytest
+
+from data_loader import generate_churn_data
+
+
+@pytest.fixture(scope='session')
+def customers():
+    """Petit dataset au schéma compact (générateur par blocs, graine fixe)"""
+    return generate_churn_data(4000, seed=7, chunk_size=1500)
@@ -0,0 +1,74 @@
+"""Cube de segments : agrégats comparés à un groupby pandas"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import CUBE_NUMERIC_BINS
+from utils.cube import SegmentCube, _bin_label
+
+
+@pytest.fixture(scope='module')
+def cube(customers):
+    return SegmentCube.from_frame(customers)
+
+
+def _expected(df: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Agrégats par modalité calculés ligne à ligne"""
+    keys = df[dimension]
+    if dimension in CUBE_NUMERIC_BINS:
+        edges = CUBE_NUMERIC_BINS[dimension]
+        labels = [_bin_label(lo, hi) for lo, hi in zip(edges[:-1], edges[1:])]
+        keys = pd.cut(df[dimension], edges, right=False, labels=labels)
+    grouped = df.groupby(keys, observed=True)
+    expected = pd.DataFrame({
+        'count': grouped.size(),
+        'churn': grouped['churn'].sum().astype(float),
+        'monthly_charges': grouped['monthly_charges'].sum(),
+        'total_charges': grouped['total_charges'].sum()
+    })
+    return expected[expected['count'] > 0]
+
+
+@pytest.mark.parametrize('dimension', ['contract_type', 'payment_method', 'age', 'tenure_months'])
+def test_churn_by_matches_groupby(customers, cube, dimension):
+    result = cube.churn_by(dimension)
+    expected = _expected(customers, dimension)
+    
+    assert [str(level) for level in result.index] == [str(level) for level in expected.index]
+    np.testing.assert_array_equal(result['count'].to_numpy(), expected['count'].to_numpy())
+    np.testing.assert_allclose(result['churn'].to_numpy(), expected['churn'].to_numpy())
+    np.testing.assert_allclose(result['monthly_charges'].to_numpy(), expected['monthly_charges'].to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(result['total_charges'].to_numpy(), expected['total_charges'].to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(result['churn_rate'].to_numpy(), (expected['churn'] / expected['count']).to_numpy())
+
+
+def test_filtered_query_matches_groupby(customers, cube):
+    filters = {'contract_type': ['Mensuel'], 'gender': ['Femme'], 'age': (30, 60)}
+    mask = (
+        (customers['contract_type'] == 'Mensuel') & (customers['gender'] == 'Femme')
+        & (customers['age'] >= 30) & (customers['age'] < 60)
+    )
+    result = cube.churn_by('online_activity', filters)
+    expected = _expected(customers[mask], 'online_activity')
+    
+    np.testing.assert_array_equal(result['count'].to_numpy(), expected['count'].to_numpy())
+    np.testing.assert_allclose(result['churn'].to_numpy(), expected['churn'].to_numpy())
+
+
+def test_total_matches_frame(customers, cube):
+    total = cube.total()
+    assert total['count'] == len(customers)
+    assert total['churn'] == customers['churn'].sum()
+    assert total['total_charges'] == pytest.approx(customers['total_charges'].astype(float).sum(), rel=1e-9)
+    assert total['churn_rate'] == pytest.approx(customers['churn'].mean())
+    
+    subset = cube.total({'payment_method': ['Chèque', 'Virement']})
+    assert subset['count'] == customers['payment_method'].isin(['Chèque', 'Virement']).sum()
+
+
+def test_misaligned_interval_rejected(cube):
+    with pytest.raises(ValueError):
+        cube.churn_by('contract_type', {'age': (35, 60)})
+    with pytest.raises(KeyError):
+        cube.churn_by('inconnue')
@@ -0,0 +1,63 @@
+"""Évaluation en une passe : métriques à tout seuil comparées à scikit-learn"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score
+)
+from sklearn.neighbors import KNeighborsClassifier
+
+from utils.evaluation import ModelEvaluation, evaluate, evaluation_table
+from utils.preprocessing import ChurnPreprocessor
+
+
+@pytest.fixture(scope='module')
+def scores():
+    rng = np.random.default_rng(2)
+    y = rng.integers(0, 2, 2000)
+    # Scores arrondis : nombreux ex aequo, dont certains sur les seuils testés
+    return y, np.round(np.clip(0.3 * y + rng.random(2000) * 0.7, 0, 1), 2)
+
+
+@pytest.mark.parametrize('threshold', [0.0, 0.2, 0.35, 0.5, 0.71, 1.0])
+def test_metrics_match_sklearn(scores, threshold):
+    y, s = scores
+    evaluation = ModelEvaluation(y, s)
+    y_pred = (s > threshold).astype(int)
+    
+    np.testing.assert_array_equal(evaluation.confusion(threshold), confusion_matrix(y, y_pred, labels=[0, 1]))
+    np.testing.assert_array_equal(evaluation.predict(threshold), y_pred)
+    metrics = evaluation.metrics(threshold)
+    assert metrics['Accuracy'] == pytest.approx(accuracy_score(y, y_pred))
+    assert metrics['Precision'] == pytest.approx(precision_score(y, y_pred, zero_division=0))
+    assert metrics['Recall'] == pytest.approx(recall_score(y, y_pred))
+    assert metrics['F1-Score'] == pytest.approx(f1_score(y, y_pred, zero_division=0))
+
+
+def test_auc_matches_sklearn(scores):
+    y, s = scores
+    assert ModelEvaluation(y, s).auc == pytest.approx(roc_auc_score(y, s))
+    with pytest.raises(ValueError):
+        ModelEvaluation(y, s[:-1])
+
+
+def test_evaluate_matches_models(customers):
+    preprocessor = ChurnPreprocessor()
+    X = preprocessor.fit_transform(customers)
+    y = customers['churn'].to_numpy()
+    X_train, X_test, y_train, y_test = X[:3000], X[3000:], y[:3000], y[3000:]
+    models = {
+        'LR': LogisticRegression(max_iter=1000).fit(X_train, y_train),
+        'KNN (k=5)': KNeighborsClassifier(5).fit(X_train, y_train),
+        'KNN (k=11)': KNeighborsClassifier(11).fit(X_train, y_train)
+    }
+    
+    evaluations = evaluate(models, X_test, y_test)
+    table = evaluation_table(evaluations).set_index('Modèle')
+    for name, model in models.items():
+        y_pred = model.predict(X_test)
+        np.testing.assert_allclose(evaluations[name].scores, model.predict_proba(X_test)[:, 1])
+        np.testing.assert_array_equal(evaluations[name].confusion(), confusion_matrix(y_test, y_pred))
+        assert table.loc[name, 'F1-Score'] == pytest.approx(f1_score(y_test, y_pred))
+        assert evaluations[name].auc == pytest.approx(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]))
@@ -0,0 +1,51 @@
+"""Index de filtres : sélections comparées à des masques booléens"""
+
+import numpy as np
+import pytest
+
+from utils.filters import Selection, FilterIndex
+
+
+@pytest.fixture(scope='module')
+def index(customers):
+    return FilterIndex(customers)
+
+
+@pytest.mark.parametrize('n_rows', [1, 8, 13, 1001])
+def test_selection_algebra_matches_masks(n_rows):
+    rng = np.random.default_rng(n_rows)
+    a, b = rng.random(n_rows) < 0.4, rng.random(n_rows) < 0.6
+    sa, sb = Selection.from_mask(a), Selection.from_mask(b)
+    
+    for selection, mask in [(sa, a), (sa & sb, a & b), (sa | sb, a | b), (~sa, ~a), (~(sa | sb), ~(a | b))]:
+        assert selection.count() == mask.sum()
+        np.testing.assert_array_equal(selection.mask(), mask)
+        np.testing.assert_array_equal(selection.indices, np.flatnonzero(mask))
+    
+    assert Selection.full(n_rows).is_full()
+    assert (~Selection.full(n_rows)).count() == 0
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'contract_type': ['Mensuel']},
+    {'gender': ['Femme'], 'churn': [1]},
+    {'payment_method': ['Chèque', 'Virement'], 'online_activity': ['Faible', 'Élevée'], 'contract_type': ['Annuel']},
+    {'contract_type': ['Inconnu']}
+])
+def test_query_matches_boolean_masks(customers, index, filters):
+    mask = np.ones(len(customers), dtype=bool)
+    for column, values in filters.items():
+        mask &= customers[column].isin(values).to_numpy()
+    
+    selection = index.query(filters)
+    assert selection.count() == mask.sum()
+    np.testing.assert_array_equal(selection.mask(), mask)
+    
+    taken = selection.take(customers, ['customer_id', 'churn'])
+    np.testing.assert_array_equal(taken['customer_id'].to_numpy(), customers['customer_id'].to_numpy()[mask])
+
+
+def test_unknown_column_rejected(index):
+    with pytest.raises(KeyError):
+        index.select('age', [30])
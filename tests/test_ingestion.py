@@ -0,0 +1,102 @@
+"""Ingestion d'exports clients : lecture par blocs comparée au DataFrame d'origine"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import apply_schema, format_customer_ids, ingest_customer_file, read_customer_file
+
+
+def _export(df: pd.DataFrame) -> pd.DataFrame:
+    """Export au format d'un fichier réel : identifiants CUST_xxxxx, modalités en texte"""
+    return df.assign(customer_id=format_customer_ids(df['customer_id'])).astype(
+        {column: str for column in df.select_dtypes('category').columns}
+    )
+
+
+@pytest.fixture(scope='module')
+def sample(customers):
+    return customers.iloc[:1000].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('extension', ['csv', 'parquet'])
+def test_roundtrip_matches_source(sample, tmp_path, extension):
+    path = tmp_path / f'clients.{extension}'
+    export = _export(sample)
+    if extension == 'csv':
+        export.to_csv(path, index=False)
+    else:
+        export.to_parquet(path, index=False)
+    
+    df, report = ingest_customer_file(str(path), chunksize=300)
+    pd.testing.assert_frame_equal(df, sample)
+    assert report['rows'] == 1000 and report['rejected_rows'] == 0 and report['chunks'] == 4
+    
+    chunks = list(read_customer_file(str(path), chunksize=300))
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), sample)
+
+
+def test_total_charges_derived(sample, tmp_path):
+    path = tmp_path / 'clients.csv'
+    _export(sample).drop(columns='total_charges').to_csv(path, index=False)
+    
+    df, _ = ingest_customer_file(str(path), chunksize=256)
+    expected = (sample['monthly_charges'] * sample['tenure_months']).round(2)
+    np.testing.assert_allclose(df['total_charges'], expected, rtol=1e-6)
+    assert list(df.columns) == list(sample.columns)
+
+
+def test_invalid_rows(sample, tmp_path):
+    path = tmp_path / 'clients.csv'
+    export = _export(sample).astype({'age': object, 'churn': object})
+    export.loc[3, 'contract_type'] = 'Hebdomadaire'
+    export.loc[10, 'age'] = 'inconnu'
+    export.loc[11, 'age'] = 400
+    export.loc[12, 'churn'] = 2
+    export.loc[500, 'customer_id'] = 'CLIENT'
+    export.to_csv(path, index=False)
+    
+    with pytest.raises(ValueError, match='à partir de la ligne 3'):
+        ingest_customer_file(str(path), chunksize=256)
+    
+    df, report = ingest_customer_file(str(path), chunksize=256, errors='drop')
+    kept = sample.drop(index=[3, 10, 11, 12, 500])
+    assert report['rows'] == len(kept) and report['rejected_rows'] == 5
+    pd.testing.assert_frame_equal(df, kept.reset_index(drop=True))
+
+
+@pytest.mark.parametrize('extension', ['csv', 'parquet'])
+def test_numeric_ids_with_blank(sample, tmp_path, extension):
+    # Identifiants numériques : une valeur vide rend la colonne flottante (2.0, NaN...)
+    path = tmp_path / f'clients.{extension}'
+    export = _export(sample.iloc[:6]).assign(customer_id=[0, 1, None, 3, 4, 5])
+    export.to_csv(path, index=False) if extension == 'csv' else export.to_parquet(path, index=False)
+    
+    df, report = ingest_customer_file(str(path), errors='drop')
+    assert list(df['customer_id']) == [0, 1, 3, 4, 5] and report['rejected_rows'] == 1
+    
+    export['customer_id'] = [0, 1, 2.5, 3, 4, 5]
+    export.to_csv(path, index=False) if extension == 'csv' else export.to_parquet(path, index=False)
+    df, _ = ingest_customer_file(str(path), errors='drop')
+    assert list(df['customer_id']) == [0, 1, 3, 4, 5]
+
+
+def test_apply_schema_numeric_ids(sample):
+    df = apply_schema(sample.iloc[:3].assign(customer_id=[7.0, 8.0, 12.0]))
+    assert list(df['customer_id']) == [7, 8, 12] and df['customer_id'].dtype == np.int32
+    assert list(apply_schema(_export(sample.iloc[:3]))['customer_id']) == [0, 1, 2]
+    with pytest.raises(ValueError, match='illisible'):
+        apply_schema(sample.iloc[:3].assign(customer_id=[7.0, 8.5, 12.0]))
+
+
+def test_missing_columns(sample, tmp_path):
+    path = tmp_path / 'clients.csv'
+    _export(sample).drop(columns=['churn', 'age']).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='Colonnes manquantes : age, churn'):
+        ingest_customer_file(str(path))
+    
+    # Clients à scorer : churn facultatif
+    _export(sample).drop(columns='churn').to_csv(path, index=False)
+    chunk, = read_customer_file(str(path), labelled=False)
+    assert 'churn' not in chunk.columns and len(chunk) == len(sample)
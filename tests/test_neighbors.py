@@ -0,0 +1,147 @@
+"""Voisins approchés et recherches partagées : comparaison à scikit-learn"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score, roc_auc_score
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+
+from utils.neighbors import RandomProjectionForest, ANNKNeighborsClassifier, MultiKNeighbors, knn_groups, ann_report
+from utils.evaluation import predict_models, knn_sweep
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(11)
+    centers = rng.standard_normal((20, 6)) * 4
+    labels = rng.integers(0, 20, 3000)
+    X = (centers[labels] + rng.standard_normal((3000, 6))).astype(np.float32)
+    y = (labels % 3 == 0).astype(np.int8)
+    Q = (centers[rng.integers(0, 20, 300)] + rng.standard_normal((300, 6))).astype(np.float32)
+    return X, y, Q
+
+
+def test_single_leaf_forest_is_exact(points):
+    X, _, Q = points
+    forest = RandomProjectionForest(n_trees=2, leaf_size=len(X), random_state=0).fit(X)
+    distances, indices = forest.query(Q, 7)
+    expected_distances, expected_indices = NearestNeighbors(n_neighbors=7).fit(X).kneighbors(Q)
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+    assert (indices == expected_indices).mean() > 0.999
+
+
+def test_forest_results_are_sorted_true_distances(points):
+    X, _, Q = points
+    distances, indices = RandomProjectionForest(n_trees=4, leaf_size=32, random_state=0).fit(X).query(Q, 10)
+    assert (np.diff(distances, axis=1) >= 0).all()
+    assert all(len(set(row)) == 10 for row in indices)
+    exact = np.linalg.norm(X[indices] - Q[:, None, :], axis=2)
+    np.testing.assert_allclose(distances, exact, rtol=1e-4, atol=1e-4)
+
+
+def test_recall_grows_with_search_trees(points):
+    X, _, Q = points
+    forest = RandomProjectionForest(n_trees=16, leaf_size=32, random_state=0).fit(X)
+    exact = NearestNeighbors(n_neighbors=10).fit(X).kneighbors(Q, return_distance=False)
+    recalls = []
+    for trees in (1, 4, 16):
+        _, indices = forest.query(Q, 10, trees)
+        recalls.append((indices[:, :, None] == exact[:, None, :]).any(axis=2).mean())
+    assert recalls == sorted(recalls) and recalls[-1] > 0.95
+
+
+def test_forest_with_few_candidates(points):
+    X, y, Q = points
+    # Une feuille d'au plus 4 points dans un seul arbre : moins de k candidats
+    forest = RandomProjectionForest(n_trees=2, leaf_size=4, random_state=0).fit(X)
+    distances, indices = forest.query(Q, 31, search_trees=1)
+    expected_distances, expected_indices = NearestNeighbors(n_neighbors=31).fit(X).kneighbors(Q)
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+    assert (indices == expected_indices).mean() > 0.999
+    
+    # k ramené au nombre de points indexés
+    distances, indices = RandomProjectionForest(n_trees=2, leaf_size=4, random_state=0).fit(X[:10]).query(Q, 31)
+    assert indices.shape == (len(Q), 10) and (np.sort(indices, axis=1) == np.arange(10)).all()
+    
+    # Sweep jusqu'à k = 31 (page Modèles) sur des feuilles de 10 points : voisins exacts
+    y_query = KNeighborsClassifier(3).fit(X, y).predict(Q)
+    model = ANNKNeighborsClassifier(5, n_trees=2, leaf_size=4, search_trees=1).fit(X, y)
+    row = knn_sweep(model, Q, y_query, [5, 31]).set_index('k').loc[31]
+    assert row['F1-Score'] == pytest.approx(f1_score(y_query, KNeighborsClassifier(31).fit(X, y).predict(Q)))
+
+
+def test_ann_classifier_votes_like_knn(points):
+    X, y, Q = points
+    model = ANNKNeighborsClassifier(n_neighbors=9, n_trees=16, random_state=0).fit(X, y)
+    neighbors = model.kneighbors(Q, return_distance=False)
+    np.testing.assert_allclose(model.predict_proba(Q)[:, 1], y[neighbors].mean(axis=1))
+    
+    exact = KNeighborsClassifier(9).fit(X, y)
+    assert (model.predict(Q) == exact.predict(Q)).mean() > 0.95
+
+
+def test_ann_report(points):
+    X, _, Q = points
+    report = ann_report(X, Q, n_neighbors=5, search_trees=[1, 8], n_trees=8)
+    assert list(report['Arbres parcourus'].iloc[1:]) == [1, 8]
+    assert report['Rappel@5'].iloc[0] == 1.0 and report['Rappel@5'].iloc[-1] > 0.9
+
+
+@pytest.mark.parametrize('weights', ['uniform', 'distance'])
+def test_multi_k_matches_knn(points, weights):
+    X, y, Q = points
+    multi = MultiKNeighbors(KNeighborsClassifier(31).fit(X, y), [1, 5, 12, 31]).query(Q)
+    for k in (1, 5, 12, 31):
+        expected = KNeighborsClassifier(k, weights=weights).fit(X, y)
+        np.testing.assert_allclose(multi.predict_proba(k, weights), expected.predict_proba(Q))
+        np.testing.assert_array_equal(multi.predict(k, weights), expected.predict(Q))
+    with pytest.raises(ValueError):
+        multi.predict_proba(32)
+
+
+def test_knn_sweep_matches_metrics(points):
+    X, y, Q = points
+    y_query = KNeighborsClassifier(3).fit(X, y).predict(Q) ^ (np.arange(len(Q)) % 7 == 0)
+    sweep = knn_sweep(KNeighborsClassifier(5).fit(X, y), Q, y_query, [3, 9])
+    for _, row in sweep.iterrows():
+        expected = KNeighborsClassifier(int(row['k'])).fit(X, y)
+        assert row['F1-Score'] == pytest.approx(f1_score(y_query, expected.predict(Q)))
+        assert row['AUC'] == pytest.approx(roc_auc_score(y_query, expected.predict_proba(Q)[:, 1]))
+
+
+def test_knn_groups(points):
+    X, y, _ = points
+    models = {
+        'KNN 5': KNeighborsClassifier(5).fit(X, y),
+        'LR': LogisticRegression().fit(X, y),
+        'KNN 11': KNeighborsClassifier(11).fit(X, y),
+        'KNN pondéré': KNeighborsClassifier(7, weights='distance').fit(X, y),
+        'KNN autre jeu': KNeighborsClassifier(3).fit(X[:1000], y[:1000]),
+        'ANN 5': ANNKNeighborsClassifier(5, leaf_size=32).fit(X, y),
+        'ANN 11': ANNKNeighborsClassifier(11, leaf_size=32).fit(X, y),
+        # Feuilles portées à 2k = 42 : autre forêt
+        'ANN 21': ANNKNeighborsClassifier(21, leaf_size=32).fit(X, y)
+    }
+    assert knn_groups(models) == [
+        ['KNN 5', 'KNN 11'], ['KNN pondéré'], ['KNN autre jeu'], ['ANN 5', 'ANN 11'], ['ANN 21']
+    ]
+
+
+@pytest.mark.parametrize('knn', [
+    KNeighborsClassifier,
+    # Peu d'arbres : voisins approchés sensibles à la forêt utilisée
+    lambda k: ANNKNeighborsClassifier(k, n_trees=2, random_state=0)
+], ids=['exact', 'ann'])
+def test_predict_models_matches_predict(points, knn):
+    X, y, Q = points
+    models = {
+        'LR': LogisticRegression().fit(X, y),
+        'KNN 25': knn(25).fit(X, y),
+        'KNN 16': knn(16).fit(X, y),
+        'KNN 5': knn(5).fit(X, y)
+    }
+    predictions = predict_models(models, Q)
+    assert list(predictions) == list(models)
+    for name, model in models.items():
+        np.testing.assert_array_equal(predictions[name]['pred'], model.predict(Q))
+        np.testing.assert_allclose(predictions[name]['proba'], model.predict_proba(Q))
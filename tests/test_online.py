@@ -0,0 +1,91 @@
+"""Apprentissage en ligne : KNN incrémental comparé à un KNN exact, fichiers quotidiens"""
+
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+from utils.online import IncrementalKNN, OnlineChurnModel
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(5)
+    X = rng.standard_normal((2500, 6)).astype(np.float32)
+    y = (X[:, 1] > 0).astype(np.int8)
+    return X, y, rng.standard_normal((250, 6)).astype(np.float32)
+
+
+@pytest.mark.parametrize('memory_budget', [64 * 2**20, 12 * 500 * 16, 1])
+def test_buffered_neighbors_match_exact(points, memory_budget):
+    X, y, Q = points
+    model = IncrementalKNN(9, rebuild_fraction=10.0, memory_budget=memory_budget).fit(X[:1500], y[:1500])
+    for start in range(1500, len(X), 250):
+        model.partial_fit(X[start:start + 250], y[start:start + 250])
+    assert model.n_buffered == 1000
+    
+    reference = KNeighborsClassifier(9, algorithm='brute').fit(X.astype(np.float64), y)
+    distances, indices = model.kneighbors(Q)
+    expected_distances, expected_indices = reference.kneighbors(Q.astype(np.float64))
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+    assert (indices == expected_indices).mean() > 0.999
+    assert (model.predict(Q) == reference.predict(Q)).mean() > 0.99
+
+
+def test_buffer_merged_into_tree(points):
+    X, y, Q = points
+    model = IncrementalKNN(5, rebuild_fraction=0.5).fit(X[:1000], y[:1000])
+    model.partial_fit(X[1000:1400], y[1000:1400])
+    assert model.n_buffered == 400
+    model.partial_fit(X[1400:1600], y[1400:1600])
+    assert model.n_buffered == 0 and model.n_indexed_ == 1600
+    
+    expected = KNeighborsClassifier(5).fit(X[:1600], y[:1600]).kneighbors(Q, return_distance=False)
+    assert (model.kneighbors(Q, return_distance=False) == expected).mean() > 0.999
+
+
+def test_k_clamped_to_points(points):
+    X, _, Q = points
+    model = IncrementalKNN(5).fit(X[:2], [0, 1])
+    model.partial_fit(X[2:3], [1])
+    distances, indices = model.kneighbors(Q[:4])
+    assert indices.shape == (4, 3)
+    assert (np.sort(indices, axis=1) == [0, 1, 2]).all()
+    assert (np.diff(distances, axis=1) >= 0).all()
+    assert model.predict_proba(Q[:4]).shape == (4, 2)
+
+
+def test_unknown_class_rejected(points):
+    X, y, _ = points
+    model = IncrementalKNN(5).fit(X[:100], y[:100])
+    with pytest.raises(ValueError):
+        model.partial_fit(X[100:102], [0, 2])
+
+
+def test_online_model_partial_fit(customers):
+    model = OnlineChurnModel(refit_every=0).fit(customers.iloc[:1000], customers['churn'].iloc[:1000])
+    entry = model.partial_fit(customers.iloc[1000:1600], customers['churn'].iloc[1000:1600])
+    assert entry['rows'] == 600 and not entry['refit']
+    assert model.n_samples == 1600 and model.knn_.n_buffered + model.knn_.n_indexed_ == 1600
+    assert len(model.history) == 1
+    
+    X_test = model.preprocessor.scale(model._encode(customers.iloc[3000:]))
+    reference = KNeighborsClassifier(model.knn_.n_neighbors).fit(
+        model.preprocessor.scale(model._encode(customers.iloc[:1600])), customers['churn'].iloc[:1600]
+    )
+    assert (model.knn_.predict(X_test) == reference.predict(X_test)).mean() > 0.99
+
+
+def test_partial_fit_file(customers, tmp_path):
+    path = tmp_path / 'clients.csv'
+    day = customers.iloc[1000:1600].astype({'age': object})
+    day.iloc[7, day.columns.get_loc('age')] = 'inconnu'
+    day.to_csv(path, index=False)
+    
+    model = OnlineChurnModel(refit_every=0).fit(customers.iloc[:1000], customers['churn'].iloc[:1000])
+    entry = model.partial_fit_file(str(path), chunksize=128, errors='drop')
+    assert entry['rows'] == 599 and entry['rejected_rows'] == 1 and not entry['refit']
+    assert model.n_samples == 1599 and model.knn_.n_buffered + model.knn_.n_indexed_ == 1599
+    assert len(model.history) == 1
+    
+    with pytest.raises(ValueError):
+        model.partial_fit_file(str(path), chunksize=128)
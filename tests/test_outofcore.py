@@ -0,0 +1,68 @@
+"""KNN hors mémoire : voisins comparés à un KNN exact scikit-learn"""
+
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+from utils.outofcore import ChunkedKNN
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(3)
+    X = rng.standard_normal((3000, 8)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * rng.standard_normal(3000) > 0).astype(np.int8)
+    return X, y, rng.standard_normal((301, 8)).astype(np.float32)
+
+
+def _assert_same_neighbors(X, Q, distances, indices, expected_distances, expected_indices):
+    """Mêmes distances ; indices identiques hors ex aequo en float32"""
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+    exact = np.linalg.norm(X[indices].astype(np.float64) - Q[:, None, :], axis=2)
+    np.testing.assert_allclose(exact, expected_distances, rtol=1e-4, atol=1e-4)
+    assert (indices == expected_indices).mean() > 0.999
+
+
+@pytest.mark.parametrize('block_size, memory_budget, k', [
+    (257, 12 * 257 * 37, 11),   # plusieurs blocs et plusieurs lots de requêtes
+    (9, 12 * 9 * 64, 11),       # blocs plus petits que k
+    (257, 12 * 257, 11),        # une requête par lot
+    (10_000, 64 * 2**20, 5)     # un seul bloc
+])
+def test_kneighbors_matches_exact(points, block_size, memory_budget, k):
+    X, y, Q = points
+    model = ChunkedKNN(k, block_size, memory_budget).fit(X, y)
+    reference = KNeighborsClassifier(k, algorithm='brute').fit(X.astype(np.float64), y)
+    
+    distances, indices = model.kneighbors(Q)
+    expected_distances, expected_indices = reference.kneighbors(Q.astype(np.float64))
+    _assert_same_neighbors(X, Q, distances, indices, expected_distances, expected_indices)
+    assert (model.predict(Q) == reference.predict(Q)).mean() > 0.99
+
+
+def test_memmap_and_pickle(points, tmp_path):
+    X, y, Q = points
+    stored = np.memmap(tmp_path / 'X.f32', dtype=np.float32, mode='w+', shape=X.shape)
+    stored[:] = X
+    stored.flush()
+    
+    model = ChunkedKNN(7, block_size=500).fit(np.memmap(tmp_path / 'X.f32', dtype=np.float32, mode='r',
+                                                        shape=X.shape), y)
+    restored = pickle.loads(pickle.dumps(model))
+    assert isinstance(restored._fit_X, np.memmap)
+    np.testing.assert_array_equal(restored.kneighbors(Q, return_distance=False),
+                                  model.kneighbors(Q, return_distance=False))
+    np.testing.assert_array_equal(model.kneighbors(Q, return_distance=False),
+                                  ChunkedKNN(7).fit(X, y).kneighbors(Q, return_distance=False))
+
+
+def test_k_clamped_to_points(points):
+    X, y, Q = points
+    model = ChunkedKNN(11, block_size=4).fit(X[:6], y[:6])
+    distances, indices = model.kneighbors(Q)
+    assert indices.shape == (len(Q), 6)
+    assert (np.sort(indices, axis=1) == np.arange(6)).all()
+    assert (np.diff(distances, axis=1) >= 0).all()
+    np.testing.assert_allclose(model.predict_proba(Q)[:, 1], y[:6].mean())
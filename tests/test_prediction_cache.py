@@ -0,0 +1,92 @@
+"""Cache des prédictions : éviction LRU, versions et invalidation"""
+
+import pytest
+
+from utils.scoring import PredictionCache
+
+
+def _customer(i: int) -> dict:
+    return {'age': 30 + i, 'contract_type': 'Mensuel', 'monthly_charges': 50.0}
+
+
+class Counter:
+    """Fonction de prédiction comptant ses appels"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self, value=None):
+        def predict():
+            self.calls += 1
+            return value
+        return predict
+
+
+def test_hits_and_canonical_keys():
+    cache, predict = PredictionCache(8), Counter()
+    assert cache.get_or_predict('LR', 'v1', {'age': 65, 'has_partner': True}, predict('a')) == 'a'
+    assert cache.get_or_predict('LR', 'v1', {'has_partner': 1, 'age': 65.0}, predict('b')) == 'a'
+    assert predict.calls == 1
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'size': 1, 'maxsize': 8,
+                             'evictions': 0, 'invalidations': 0}
+
+
+def test_lru_eviction():
+    cache, predict = PredictionCache(3), Counter()
+    for i in range(3):
+        cache.get_or_predict('LR', 'v1', _customer(i), predict(i))
+    cache.get_or_predict('LR', 'v1', _customer(0), predict())   # 0 redevient le plus récent
+    cache.get_or_predict('LR', 'v1', _customer(3), predict(3))  # évince 1
+    
+    assert len(cache) == 3 and cache.evictions == 1
+    calls = predict.calls
+    for i in (0, 2, 3):
+        assert cache.get_or_predict('LR', 'v1', _customer(i), predict()) == i
+    assert predict.calls == calls
+    assert cache.get_or_predict('LR', 'v1', _customer(1), predict('recalculé')) == 'recalculé'
+
+
+def test_version_change_invalidates_model():
+    cache, predict = PredictionCache(8), Counter()
+    cache.get_or_predict('LR', 'v1', _customer(0), predict('lr-v1'))
+    cache.get_or_predict('KNN', 'v1', _customer(0), predict('knn-v1'))
+    
+    assert cache.get_or_predict('LR', 'v2', _customer(0), predict('lr-v2')) == 'lr-v2'
+    assert cache.invalidations == 1 and len(cache) == 2
+    assert cache.get_or_predict('KNN', 'v1', _customer(0), predict()) == 'knn-v1'
+    assert cache.get_or_predict('LR', 'v2', _customer(0), predict()) == 'lr-v2'
+
+
+def test_explicit_invalidation():
+    cache, predict = PredictionCache(8), Counter()
+    for name in ('LR', 'KNN'):
+        cache.get_or_predict(name, 'v1', _customer(0), predict(name))
+    
+    cache.invalidate('LR')
+    assert len(cache) == 1
+    assert cache.get_or_predict('KNN', 'v1', _customer(0), predict()) == 'KNN'
+    cache.invalidate()
+    assert len(cache) == 0 and cache.stats()['invalidations'] == 2
+
+
+def test_stale_result_not_stored():
+    """Une prédiction calculée pendant un changement de version n'est pas mémorisée"""
+    cache = PredictionCache(8)
+    
+    def predict():
+        cache.get_or_predict('LR', 'v2', _customer(1), lambda: 'v2')
+        return 'v1'
+    
+    assert cache.get_or_predict('LR', 'v1', _customer(0), predict) == 'v1'
+    assert cache.get_or_predict('LR', 'v2', _customer(0), lambda: 'recalculé') == 'recalculé'
+
+
+def test_errors_not_cached():
+    cache = PredictionCache(8)
+    
+    def fail():
+        raise ValueError("client invalide")
+    
+    with pytest.raises(ValueError):
+        cache.get_or_predict('LR', 'v1', _customer(0), fail)
+    assert len(cache) == 0
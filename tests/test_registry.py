@@ -0,0 +1,90 @@
+"""Registre des modèles : empreintes d'entraînement et publication sur disque"""
+
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+
+from utils.preprocessing import ChurnPreprocessor
+from utils.registry import ModelRegistry, training_key
+
+
+@pytest.fixture(scope='module')
+def training(customers):
+    preprocessor = ChurnPreprocessor()
+    X = preprocessor.encode(customers)
+    preprocessor.fit_scaler(X)
+    return X, customers['churn'].to_numpy(), preprocessor
+
+
+def test_training_key_follows_data_and_config(training):
+    X, y, preprocessor = training
+    key = training_key(X, y, preprocessor)
+    assert key == training_key(X.copy(), y.copy(), preprocessor)
+    
+    changed = X.copy()
+    changed[0, 0] += 1
+    assert training_key(changed, y, preprocessor) != key
+    assert training_key(X, 1 - y, preprocessor) != key
+    assert training_key(X, y, preprocessor, config={'autre': 1}) != key
+    assert training_key(X, y) != key
+
+
+def test_save_and_load(training, tmp_path):
+    X, y, preprocessor = training
+    X_scaled = preprocessor.transform(X)
+    models = {
+        'LR': LogisticRegression(max_iter=1000).fit(X_scaled, y),
+        'KNN': KNeighborsClassifier(5).fit(X_scaled, y)
+    }
+    registry = ModelRegistry(str(tmp_path))
+    key = training_key(X, y, preprocessor)
+    assert not registry.exists(key) and registry.keys() == []
+    
+    registry.save(key, models, preprocessor, {'note': 'test'})
+    assert registry.keys() == [key]
+    assert registry.manifest(key)['metadata'] == {'note': 'test'}
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp_')]
+    
+    for mmap in (True, False):
+        loaded, loaded_preprocessor = registry.load(key, mmap=mmap)
+        assert list(loaded) == ['LR', 'KNN']
+        np.testing.assert_array_equal(loaded_preprocessor.transform(X[:200]), X_scaled[:200])
+        for name, model in models.items():
+            np.testing.assert_array_equal(loaded[name].predict_proba(X_scaled[:200]),
+                                          model.predict_proba(X_scaled[:200]))
+    
+    registry.drop(key)
+    assert not registry.exists(key)
+    with pytest.raises(KeyError):
+        registry.load(key)
+
+
+def test_get_or_train_trains_once(training, tmp_path):
+    X, y, preprocessor = training
+    registry = ModelRegistry(str(tmp_path))
+    calls = []
+    
+    def trainer():
+        calls.append(1)
+        return {'LR': LogisticRegression(max_iter=1000).fit(preprocessor.transform(X), y)}, {'rows': len(y)}
+    
+    first, _ = registry.get_or_train('key', trainer, preprocessor)
+    second, _ = registry.get_or_train('key', trainer, preprocessor)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first['LR'].coef_, second['LR'].coef_)
+    assert registry.manifest('key')['metadata']['rows'] == len(y)
+
+
+def test_versioned_key_skips_hashing(training):
+    X, y, preprocessor = training
+    key = training_key(X, y, preprocessor, version='v1')
+    changed = X.copy()
+    changed[0, 0] += 1
+    # La version identifie les données : le contenu n'est pas relu, les formes si
+    assert training_key(changed, y, preprocessor, version='v1') == key
+    assert training_key(X, y, preprocessor, version='v2') != key
+    assert training_key(X[:-1], y[:-1], preprocessor, version='v1') != key
+    assert training_key(X, y, preprocessor) != key
@@ -0,0 +1,96 @@
+"""Scoring de fichiers clients : résultats, lignes rejetées et publication atomique"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+from data_loader import format_customer_ids
+from score import SCORE_COLUMNS, score_customer_file
+from utils.models import predict_batch, risk_levels
+from utils.preprocessing import ChurnPreprocessor
+
+
+@pytest.fixture(scope='module')
+def fitted(customers):
+    preprocessor = ChurnPreprocessor()
+    X = preprocessor.fit_transform(customers.iloc[:3000])
+    model = KNeighborsClassifier(7).fit(X, customers['churn'].iloc[:3000])
+    return model, preprocessor
+
+
+@pytest.fixture(scope='module')
+def export(customers):
+    """Clients à scorer au format d'un export : identifiants CUST_xxxxx, sans churn"""
+    sample = customers.iloc[3000:3500].reset_index(drop=True)
+    raw = sample.drop(columns='churn').assign(customer_id=format_customer_ids(sample['customer_id']))
+    return sample, raw.astype({column: str for column in raw.select_dtypes('category').columns})
+
+
+def _read(path):
+    return pd.read_parquet(path) if str(path).endswith('.parquet') else pd.read_csv(path)
+
+
+@pytest.mark.parametrize('input_format, output_format', [('csv', 'csv'), ('parquet', 'parquet'), ('csv', 'parquet')])
+def test_scores_match_model(fitted, export, tmp_path, input_format, output_format):
+    model, preprocessor = fitted
+    sample, raw = export
+    source, output = tmp_path / f'clients.{input_format}', tmp_path / f'scores.{output_format}'
+    raw.to_csv(source, index=False) if input_format == 'csv' else raw.to_parquet(source, index=False)
+    
+    report = score_customer_file(str(source), str(output), model, preprocessor, chunksize=128)
+    scores = _read(output)
+    probabilities = model.predict_proba(preprocessor.transform(sample))[:, 1]
+    
+    assert list(scores.columns) == SCORE_COLUMNS
+    assert list(scores['customer_id']) == list(raw['customer_id'])
+    np.testing.assert_allclose(scores['churn_probability'], probabilities)
+    np.testing.assert_array_equal(scores['churn_prediction'], probabilities > 0.5)
+    assert list(scores['risk_level']) == list(risk_levels(probabilities).astype(str))
+    assert report['rows'] == len(sample) and report['rejected_rows'] == 0
+    assert report['churn_predicted'] == int((probabilities > 0.5).sum())
+    assert sorted(os.listdir(tmp_path)) == sorted([source.name, output.name])
+
+
+def test_predict_batch_matches_model(fitted, export):
+    model, preprocessor = fitted
+    sample, _ = export
+    predictions, probabilities = predict_batch(model, preprocessor, sample, chunk_size=64, threshold=0.3)
+    expected = model.predict_proba(preprocessor.transform(sample))[:, 1]
+    np.testing.assert_allclose(probabilities, expected)
+    np.testing.assert_array_equal(predictions, expected > 0.3)
+
+
+def test_invalid_rows(fitted, export, tmp_path):
+    model, preprocessor = fitted
+    _, raw = export
+    raw = raw.astype({'age': object})
+    raw.loc[[5, 200], 'age'] = 'inconnu'
+    raw.loc[300, 'contract_type'] = 'Hebdomadaire'
+    source, output = tmp_path / 'clients.csv', tmp_path / 'scores.csv'
+    raw.to_csv(source, index=False)
+    
+    # Erreur dans un bloc : pas de fichier partiel publié, pas de fichier temporaire
+    with pytest.raises(ValueError):
+        score_customer_file(str(source), str(output), model, preprocessor, chunksize=128)
+    assert os.listdir(tmp_path) == ['clients.csv']
+    
+    report = score_customer_file(str(source), str(output), model, preprocessor, chunksize=128, errors='drop')
+    assert report['rows'] == len(raw) - 3 and report['rejected_rows'] == 3
+    kept = raw.drop(index=[5, 200, 300])
+    assert list(pd.read_csv(output)['customer_id']) == list(kept['customer_id'])
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_empty_input(fitted, export, tmp_path, output_format):
+    model, preprocessor = fitted
+    _, raw = export
+    source, output = tmp_path / 'clients.csv', tmp_path / f'scores.{output_format}'
+    raw.iloc[:0].to_csv(source, index=False)
+    
+    report = score_customer_file(str(source), str(output), model, preprocessor)
+    assert report['rows'] == 0
+    scores = _read(output)
+    assert list(scores.columns) == SCORE_COLUMNS and len(scores) == 0
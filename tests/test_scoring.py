@@ -0,0 +1,110 @@
+"""Scorer logistique compilé : parité avec ``predict_proba`` de scikit-learn"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.neighbors import KNeighborsClassifier
+
+from utils.preprocessing import ChurnPreprocessor
+from utils.scoring import FusedLogisticScorer, compiled_scorer
+
+
+@pytest.fixture(scope='module')
+def fitted(customers):
+    preprocessor = ChurnPreprocessor()
+    X = preprocessor.fit_transform(customers)
+    model = LogisticRegression(max_iter=1000).fit(X, customers['churn'])
+    return model, preprocessor, X
+
+
+def test_batch_matches_predict_proba(customers, fitted):
+    model, preprocessor, X = fitted
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    np.testing.assert_allclose(scorer.predict_proba(customers), model.predict_proba(X), atol=1e-6)
+
+
+def test_raw_and_encoded_columns_agree(customers, fitted):
+    model, preprocessor, _ = fitted
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    raw = customers.astype({column: object for column in preprocessor.categories})
+    encoded = customers.assign(**{
+        f'{column}_encoded': preprocessor._codes(customers[column], column) for column in preprocessor.categories
+    }).drop(columns=list(preprocessor.categories))
+    np.testing.assert_allclose(scorer.decision_function(raw), scorer.decision_function(customers))
+    np.testing.assert_allclose(scorer.decision_function(encoded), scorer.decision_function(customers))
+
+
+def test_one_by_one_matches_predict_proba(customers, fitted):
+    model, preprocessor, X = fitted
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    expected = model.predict_proba(X[:200])[:, 1]
+    records = customers.iloc[:200].to_dict('records')
+    np.testing.assert_allclose([scorer.predict_proba_one(record) for record in records], expected, atol=1e-6)
+
+
+def test_sgd_logistic_parity(customers, fitted):
+    _, preprocessor, X = fitted
+    model = SGDClassifier(loss='log_loss', random_state=0).fit(X, customers['churn'])
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    np.testing.assert_allclose(scorer.predict_proba(customers), model.predict_proba(X), atol=1e-6)
+
+
+def test_invalid_customers_rejected(customers, fitted):
+    model, preprocessor, _ = fitted
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    record = customers.iloc[0].to_dict()
+    
+    with pytest.raises(ValueError, match='monthly_charges'):
+        scorer.decision_one({**record, 'monthly_charges': float('nan')})
+    with pytest.raises(ValueError, match='contract_type'):
+        scorer.decision_one({**record, 'contract_type': 'Inconnu'})
+    with pytest.raises(KeyError):
+        scorer.decision_one({key: value for key, value in record.items() if key != 'age'})
+    
+    batch = customers.iloc[:10].copy()
+    batch.loc[batch.index[3], 'total_charges'] = np.inf
+    with pytest.raises(ValueError, match='total_charges'):
+        scorer.decision_function(batch)
+
+
+@pytest.mark.parametrize('code', [-1, 1.5, 3, np.nan])
+def test_invalid_codes_rejected(customers, fitted, code):
+    model, preprocessor, _ = fitted
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    # contract_type : 3 modalités, codes 0 à 2
+    codes = preprocessor._codes(customers['contract_type'].iloc[:10], 'contract_type').astype(np.float64)
+    encoded = customers.iloc[:10].assign(contract_type_encoded=codes).drop(columns='contract_type')
+    encoded.iloc[4, encoded.columns.get_loc('contract_type_encoded')] = code
+    
+    with pytest.raises(ValueError, match=r'Modalité\(s\) inconnue\(s\) pour contract_type'):
+        scorer.decision_function(encoded)
+    with pytest.raises(ValueError, match='contract_type'):
+        scorer.decision_one(encoded.iloc[4].to_dict())
+    with pytest.raises(ValueError, match='contract_type'):
+        preprocessor.encode(encoded)
+
+
+def test_missing_category_rejected(customers, fitted):
+    model, preprocessor, _ = fitted
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    # Catégorielle aux modalités apprises : une valeur manquante a le code -1
+    batch = customers.iloc[:10].copy()
+    batch.loc[batch.index[2], 'contract_type'] = np.nan
+    with pytest.raises(ValueError, match='contract_type'):
+        scorer.decision_function(batch)
+    with pytest.raises(ValueError, match='contract_type'):
+        preprocessor.encode(batch)
+
+
+def test_compiled_scorer_follows_coefficients(customers, fitted):
+    model, preprocessor, X = fitted
+    assert compiled_scorer(KNeighborsClassifier().fit(X, customers['churn']), preprocessor) is None
+    
+    model = SGDClassifier(loss='log_loss', random_state=0).fit(X, customers['churn'])
+    scorer = compiled_scorer(model, preprocessor)
+    assert compiled_scorer(model, preprocessor) is scorer
+    
+    model.partial_fit(X[:500], customers['churn'].iloc[:500])
+    updated = compiled_scorer(model, preprocessor)
+    assert updated is not scorer
+    np.testing.assert_allclose(updated.predict_proba(customers), model.predict_proba(X), atol=1e-6)
@@ -0,0 +1,83 @@
+"""Recherche d'hyperparamètres : candidats, recherches partagées et score final"""
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from utils.models import build_estimator
+from utils.preprocessing import ChurnPreprocessor
+from utils.search import candidates, successive_halving, _folds, _run_unit, _work_units
+
+
+SPACE = {
+    'Régression Logistique': {
+        'name': 'Régression Logistique',
+        'estimator': 'sklearn.linear_model.LogisticRegression',
+        'params': {'solver': 'liblinear', 'max_iter': 1000},
+        'grid': {'C': [0.001, 0.1, 10.0]}
+    },
+    'KNN': {
+        'name': 'KNN (k={n_neighbors})',
+        'estimator': 'sklearn.neighbors.KNeighborsClassifier',
+        'params': {},
+        'grid': {'n_neighbors': [3, 9, 25], 'weights': ['uniform', 'distance']}
+    }
+}
+
+
+@pytest.fixture(scope='module')
+def data(customers):
+    return ChurnPreprocessor().encode(customers.iloc[:2400]), customers['churn'].to_numpy()[:2400]
+
+
+def test_candidates_cover_grid():
+    found = candidates(SPACE)
+    assert len(found) == 3 + 3 * 2
+    assert len({c['name'] for c in found}) == len(found)
+    knn = [c for c in found if c['family'] == 'KNN']
+    assert {c['model_name'] for c in knn} == {'KNN (k=3)', 'KNN (k=9)', 'KNN (k=25)'}
+    assert knn[0]['tuned'] == {'n_neighbors': 3, 'weights': 'uniform'}
+    assert all(build_estimator(c['config']).get_params()['C'] == c['tuned']['C']
+               for c in found if c['family'] == 'Régression Logistique')
+
+
+def test_shared_unit_matches_separate_models(data):
+    X, y = data
+    fold = _folds(X, y, 3)[0]
+    knn = [c for c in candidates(SPACE) if c['family'] == 'KNN']
+    units = _work_units(candidates(SPACE))
+    assert [len(unit) for unit in units] == [1, 1, 1, 6]
+    
+    scores = _run_unit(units[-1], fold)
+    for candidate in knn:
+        model = build_estimator(candidate['config']).fit(fold['X_train'], fold['y_train'])
+        np.testing.assert_allclose(scores[candidate['name']], model.predict_proba(fold['X_val'])[:, 1])
+
+
+def test_successive_halving(data, tmp_path):
+    X, y = data
+    result = successive_halving(X, y, SPACE, factor=3, min_resources=600, n_splits=3, n_jobs=2)
+    history = result.history
+    assert list(history.groupby('Tour').size()) == [9, 3]
+    assert history['Lignes'].iloc[-1] == len(y)
+    
+    for family, entry in result.best.items():
+        last = history[(history['Tour'] == history['Tour'].max()) & (history['Famille'] == family)]
+        assert entry['name'] == last.loc[last['Score'].idxmax(), 'Candidat']
+        # Score du dernier tour : AUC hors pli d'un pipeline scikit-learn sur tout l'échantillon
+        estimator = make_pipeline(StandardScaler(), build_estimator(entry['config']))
+        expected = cross_val_predict(estimator, X.astype(np.float64), y, cv=StratifiedKFold(3),
+                                     method='predict_proba')[:, 1]
+        assert entry['score'] == pytest.approx(roc_auc_score(y, expected), abs=2e-3)
+    
+    with open(result.save(str(tmp_path / 'models.json')), encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved['models'] == result.models_config
+    assert set(saved['models']) == {entry['model_name'] for entry in result.best.values()}
+    for config in saved['models'].values():
+        build_estimator(config).fit(X[:100], y[:100])
@@ -0,0 +1,58 @@
+"""Serveur de scoring : micro-lots et isolation des erreurs par requête"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from serve import LatencyStats, MicroBatcher, make_scorer
+from utils.preprocessing import ChurnPreprocessor
+
+
+def fake_score(records: list) -> list:
+    """Double chaque valeur ; un client sans ``value`` fait échouer tout le lot"""
+    return [{'value': record['value'] * 2} for record in records]
+
+
+def test_bad_request_fails_alone():
+    stats = LatencyStats()
+    batcher = MicroBatcher(fake_score, window=0.2, max_batch=16, stats=stats)
+    try:
+        futures = [batcher.submit({'value': i} if i != 2 else {'autre': i}) for i in range(5)]
+        for i, future in enumerate(futures):
+            if i == 2:
+                with pytest.raises(KeyError):
+                    future.result(timeout=5)
+            else:
+                assert future.result(timeout=5) == {'value': 2 * i}
+    finally:
+        batcher.close()
+    assert stats.batches == 1 and stats.batched_rows == 5
+
+
+def test_max_batch_and_close():
+    stats = LatencyStats()
+    batcher = MicroBatcher(fake_score, window=0.2, max_batch=3, stats=stats)
+    futures = [batcher.submit({'value': i}) for i in range(7)]
+    batcher.close()
+    assert [future.result(timeout=0) for future in futures] == [{'value': 2 * i} for i in range(7)]
+    assert stats.batches == 3 and stats.batched_rows == 7
+
+
+def test_scorer_isolates_invalid_customers(customers):
+    preprocessor = ChurnPreprocessor()
+    model = LogisticRegression(max_iter=1000).fit(preprocessor.fit_transform(customers), customers['churn'])
+    records = customers.iloc[:4].drop(columns=['customer_id', 'churn', 'total_charges']).to_dict('records')
+    records[1] = {**records[1], 'monthly_charges': None}
+    records[3] = {**records[3], 'contract_type': 'Inconnu'}
+    
+    batcher = MicroBatcher(make_scorer(model, preprocessor), window=0.2)
+    try:
+        futures = [batcher.submit(record) for record in records]
+        for i in (1, 3):
+            with pytest.raises(ValueError):
+                futures[i].result(timeout=5)
+        expected = model.predict_proba(preprocessor.transform(customers.iloc[[0, 2]]))[:, 1]
+        probabilities = [futures[i].result(timeout=5)['probability'] for i in (0, 2)]
+    finally:
+        batcher.close()
+    np.testing.assert_allclose(probabilities, expected, atol=1e-4)
@@ -0,0 +1,64 @@
+"""Accumulateur de statistiques : fusion de partitions comparée au dataset entier"""
+
+import numpy as np
+import pytest
+
+from config import NUMERIC_COLUMNS
+from data_loader import get_summary_stats
+from utils.stats import SummaryStats
+
+
+def _partitions(df, n_parts, seed=0):
+    """Partitions disjointes de tailles inégales (dont une vide)"""
+    bounds = np.sort(np.random.default_rng(seed).integers(0, len(df), n_parts - 1))
+    bounds = np.concatenate([[0, 0], bounds, [len(df)]])
+    return [df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+@pytest.mark.parametrize('n_parts', [2, 5])
+def test_merge_matches_whole_frame(customers, n_parts):
+    merged = SummaryStats()
+    for part in _partitions(customers, n_parts):
+        merged = merged + SummaryStats.from_frame(part)
+    
+    assert merged.count == len(customers)
+    assert merged.churn_count == customers['churn'].sum()
+    # Schéma compact (float32) : référence calculée en float64 comme l'accumulateur
+    for column in NUMERIC_COLUMNS:
+        values = customers[column].astype(np.float64)
+        assert merged.mean(column) == pytest.approx(values.mean(), rel=1e-9)
+        assert merged.std(column) == pytest.approx(values.std(ddof=1), rel=1e-6)
+        assert merged.total(column) == pytest.approx(values.sum(), rel=1e-9)
+
+
+def test_update_matches_from_frame(customers):
+    streamed = SummaryStats()
+    for part in _partitions(customers, 4, seed=1):
+        streamed.update(part)
+    
+    whole = SummaryStats.from_frame(customers)
+    assert streamed.count == whole.count and streamed.churn_count == whole.churn_count
+    np.testing.assert_allclose(streamed.sums, whole.sums, rtol=1e-12)
+    np.testing.assert_allclose(streamed.sums_sq, whole.sums_sq, rtol=1e-12)
+
+
+def test_summary_matches_get_summary_stats(customers):
+    expected = get_summary_stats(customers)
+    summary = SummaryStats.from_frame(customers).summary()
+    assert summary.keys() == expected.keys()
+    for key, value in expected.items():
+        assert summary[key] == pytest.approx(value, rel=1e-9)
+
+
+def test_json_roundtrip(customers):
+    stats = SummaryStats.from_frame(customers.iloc[:500])
+    restored = SummaryStats.from_json(stats.to_json())
+    assert restored.columns == stats.columns
+    assert restored.summary() == stats.summary()
+
+
+def test_empty_and_mismatched():
+    empty = SummaryStats()
+    assert np.isnan(empty.mean('age')) and np.isnan(empty.std('age'))
+    with pytest.raises(ValueError):
+        empty.merge(SummaryStats(['age']))
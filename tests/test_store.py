@@ -0,0 +1,117 @@
+"""Magasin de données partagé : vues sans copie, chargements et artefacts uniques"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.store import DatasetStore, freeze
+
+
+def test_views_are_readonly_and_shared(customers):
+    store = DatasetStore()
+    view = store.publish('v1', customers)
+    other = store.get('v1')
+    
+    pd.testing.assert_frame_equal(view, customers)
+    assert np.shares_memory(view['age'].to_numpy(), other['age'].to_numpy())
+    assert np.shares_memory(view['age'].to_numpy(), customers['age'].to_numpy())
+    with pytest.raises(ValueError):
+        view['age'].to_numpy()[0] = 1
+    
+    # Une colonne ajoutée à une vue ne modifie pas le magasin
+    view['extra'] = 1
+    assert 'extra' not in store.get('v1').columns
+    assert store.versions == ['v1']
+
+
+def test_freeze_keeps_categoricals(customers):
+    frozen = freeze(customers)
+    pd.testing.assert_frame_equal(frozen, customers)
+    assert not frozen['gender'].cat.codes.to_numpy().flags.writeable
+
+
+def test_loader_runs_once_under_concurrency(customers):
+    store = DatasetStore()
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return customers
+    
+    results = [None] * 8
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, store.get('v1', loader)))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert all(len(result) == len(customers) for result in results)
+    with pytest.raises(KeyError):
+        store.get('v2')
+
+
+def test_derived_artifacts(customers):
+    store = DatasetStore()
+    store.publish('v1', customers)
+    calls = []
+    
+    def churn_rate(df):
+        calls.append(1)
+        return df['churn'].mean()
+    
+    assert store.derive('v1', 'rate', churn_rate) == customers['churn'].mean()
+    assert store.derive('v1', 'rate', churn_rate) == customers['churn'].mean()
+    assert len(calls) == 1
+    
+    # Republier une version efface ses artefacts ; retirer une version aussi
+    store.publish('v1', customers.iloc[:100])
+    assert store.derive('v1', 'rate', churn_rate) == customers['churn'].iloc[:100].mean()
+    store.drop('v1')
+    assert store.versions == []
+    with pytest.raises(KeyError):
+        store.derive('v1', 'rate', churn_rate)
+    
+    report = DatasetStore().memory_report()
+    assert list(report.columns) == ['Version', 'Objet', 'Lignes', 'Octets', 'Octets projetés']
+
+
+def test_slow_load_does_not_block_other_versions(customers):
+    store = DatasetStore()
+    store.publish('ready', customers)
+    started, release = threading.Event(), threading.Event()
+    
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return customers
+    
+    thread = threading.Thread(target=store.get, args=('slow', slow_loader))
+    thread.start()
+    started.wait(5)
+    try:
+        # Lecture, artefact et autre chargement pendant le chargement lent
+        assert len(store.get('ready')) == len(customers)
+        assert store.derive('ready', 'n', len) == len(customers)
+        assert len(store.get('other', lambda: customers.iloc[:10])) == 10
+    finally:
+        release.set()
+        thread.join()
+    assert 'slow' in store.versions
+
+
+def test_failed_load_is_retried(customers):
+    store = DatasetStore()
+    
+    def failing():
+        raise OSError("fichier illisible")
+    
+    with pytest.raises(OSError):
+        store.get('v1', failing)
+    assert store.versions == []
+    assert len(store.get('v1', lambda: customers)) == len(customers)
@@ -0,0 +1,84 @@
+"""Validation croisée parallèle : plis et scores hors pli comparés à scikit-learn"""
+
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from utils.preprocessing import ChurnPreprocessor
+from utils.validation import CrossValidationResult, cached_cross_validate, cross_validate, fold_assignments
+
+
+@pytest.fixture(scope='module')
+def data(customers):
+    X = ChurnPreprocessor().encode(customers.iloc[:2000])
+    return X, customers['churn'].to_numpy()[:2000]
+
+
+@pytest.fixture(scope='module')
+def estimators():
+    return {
+        'LR': LogisticRegression(max_iter=1000),
+        'KNN (k=5)': KNeighborsClassifier(5),
+        'KNN (k=15)': KNeighborsClassifier(15)
+    }
+
+
+def test_fold_assignments_match_stratified_kfold(data):
+    _, y = data
+    folds = fold_assignments(y, 4)
+    for fold, (_, val_index) in enumerate(StratifiedKFold(4).split(np.zeros((len(y), 1)), y)):
+        np.testing.assert_array_equal(np.flatnonzero(folds == fold), val_index)
+
+
+def test_out_of_fold_scores_match_pipelines(data, estimators):
+    X, y = data
+    result = cross_validate(X, y, estimators, n_splits=4, n_jobs=2)
+    assert result.names == list(estimators) and result.n_splits == 4
+    assert result.oof.dtype == np.float64
+    
+    for i, (name, estimator) in enumerate(estimators.items()):
+        # Pipeline scikit-learn de référence : standardisation ajustée dans chaque pli
+        expected = cross_val_predict(make_pipeline(StandardScaler(), estimator), X.astype(np.float64), y,
+                                     cv=StratifiedKFold(4), method='predict_proba')[:, 1]
+        agreement = np.isclose(result.oof[i], expected, atol=1e-4).mean()
+        assert agreement > 0.995, name
+        assert result.evaluation(name).auc == pytest.approx(roc_auc_score(y, expected), abs=2e-3)
+    
+    scores = result.scores()
+    assert len(scores) == 12
+    lr = scores[scores['Modèle'] == 'LR'].set_index('Pli')
+    for fold in range(4):
+        mask = result.folds == fold
+        assert lr.loc[fold, 'F1-Score'] == pytest.approx(f1_score(y[mask], result.oof[0, mask] > 0.5))
+    assert list(result.summary()['Modèle']) == list(estimators)
+
+
+def test_results_cached_on_disk(data, estimators, tmp_path):
+    X, y = data
+    first = cached_cross_validate(X, y, estimators, n_splits=3, n_jobs=1, root=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    second = cached_cross_validate(X, y, estimators, n_splits=3, n_jobs=1, root=str(tmp_path))
+    np.testing.assert_array_equal(second.oof, first.oof)
+    assert second.names == first.names
+    
+    # Version des données : l'entrée est retrouvée sans relire le contenu de X
+    versioned = cached_cross_validate(X, y, estimators, n_splits=3, n_jobs=1, root=str(tmp_path), version='v1')
+    changed = X.copy()
+    changed[0, 0] += 1
+    again = cached_cross_validate(changed, y, estimators, n_splits=3, n_jobs=1, root=str(tmp_path), version='v1')
+    assert len(os.listdir(tmp_path)) == 2
+    np.testing.assert_array_equal(again.oof, versioned.oof)
+    
+    path = first.save(str(tmp_path / 'resultat.npz'))
+    restored = CrossValidationResult.load(path)
+    np.testing.assert_array_equal(restored.folds, first.folds)
+    np.testing.assert_array_equal(restored.oof, first.oof)
+    assert restored.oof.dtype == np.float64
+    assert restored.summary().equals(first.summary())
@@ -5,22 +5,52 @@ ChurnGuard - Package Utils
 
 from .models import (
     prepare_features,
+    split_features,
+    get_model_features,
+    build_estimator,
+    fit_models,
     train_models,
+    registry_key,
+    get_training_report,
+    get_model_evaluations,
+    get_ann_report,
     evaluate_models,
     get_roc_data,
     get_confusion_matrix,
     predict_single,
+    predict_batch,
+    risk_levels,
+    get_prediction_cache,
+    sensitivity_curves,
+    get_cross_validation,
     get_cross_validation_scores
 )
 
+from .preprocessing import ChurnPreprocessor
+from .registry import ModelRegistry, training_key, array_digest
+from .evaluation import ModelEvaluation, evaluate, evaluation_table, predict_models, knn_sweep
+from .online import OnlineChurnModel, IncrementalKNN
+from .scoring import FusedLogisticScorer, compiled_scorer, PredictionCache, canonical_features
+from .outofcore import train_out_of_core, FeatureFile, ChunkedKNN, out_of_core_report
+from .search import successive_halving, SearchResult
+from .validation import CrossValidationResult, cross_validate, cached_cross_validate, fold_assignments
+from .neighbors import RandomProjectionForest, ANNKNeighborsClassifier, MultiKNeighbors, knn_groups, ann_report
+from .cube import SegmentCube
+from .filters import FilterIndex, Selection
+from .stats import SummaryStats
+from .store import DatasetStore
+from .backends import get_backend, PandasBackend, ArrowBackend, PolarsBackend
+
 from .visualizations import (
     plot_churn_distribution,
     plot_churn_by_feature,
+    plot_churn_rate,
     plot_correlation_matrix,
     plot_roc_curves,
     plot_confusion_matrix,
     plot_feature_importance,
     plot_risk_gauge,
+    plot_sensitivity_curves,
     plot_histogram,
     plot_boxplot
 )
@@ -28,20 +58,76 @@ from .visualizations import (
 __all__ = [
     # Models
     'prepare_features',
+    'split_features',
+    'get_model_features',
+    'build_estimator',
+    'fit_models',
     'train_models',
+    'registry_key',
+    'get_training_report',
+    'get_model_evaluations',
+    'get_ann_report',
     'evaluate_models',
     'get_roc_data',
     'get_confusion_matrix',
     'predict_single',
+    'predict_batch',
+    'risk_levels',
+    'get_prediction_cache',
+    'sensitivity_curves',
+    'get_cross_validation',
     'get_cross_validation_scores',
+    'ChurnPreprocessor',
+    'ModelRegistry',
+    'training_key',
+    'array_digest',
+    'ModelEvaluation',
+    'evaluate',
+    'evaluation_table',
+    'predict_models',
+    'knn_sweep',
+    'CrossValidationResult',
+    'cross_validate',
+    'cached_cross_validate',
+    'fold_assignments',
+    'OnlineChurnModel',
+    'IncrementalKNN',
+    'FusedLogisticScorer',
+    'compiled_scorer',
+    'PredictionCache',
+    'canonical_features',
+    'train_out_of_core',
+    'FeatureFile',
+    'ChunkedKNN',
+    'out_of_core_report',
+    'successive_halving',
+    'SearchResult',
+    'RandomProjectionForest',
+    'ANNKNeighborsClassifier',
+    'MultiKNeighbors',
+    'knn_groups',
+    'ann_report',
+    # Segments
+    'SegmentCube',
+    'FilterIndex',
+    'Selection',
+    'SummaryStats',
+    'DatasetStore',
+    # Backends
+    'get_backend',
+    'PandasBackend',
+    'ArrowBackend',
+    'PolarsBackend',
     # Visualizations
     'plot_churn_distribution',
     'plot_churn_by_feature',
+    'plot_churn_rate',
     'plot_correlation_matrix',
     'plot_roc_curves',
     'plot_confusion_matrix',
     'plot_feature_importance',
     'plot_risk_gauge',
+    'plot_sensitivity_curves',
     'plot_histogram',
     'plot_boxplot'
 ]
@@ -0,0 +1,312 @@
+"""
+ChurnGuard - Moteurs d'Agrégation
+=================================
+Agrégations, filtres et corrélations sur pandas, pyarrow ou Polars
+"""
+
+import pandas as pd
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import DATA_BACKEND, BACKEND_MIN_ROWS, NUMERIC_COLUMNS, CORRELATION_COLUMNS
+from utils.stats import SummaryStats
+
+
+def churn_table(index: pd.Index, count, churn) -> pd.DataFrame:
+    """
+    Tableau « taux de churn par modalité » au format du groupby pandas.
+    
+    Parameters
+    ----------
+    index : pd.Index
+        Modalités (triées)
+    count : array-like
+        Effectif par modalité
+    churn : array-like
+        Nombre de churns par modalité
+    
+    Returns
+    -------
+    pd.DataFrame
+        Colonnes ``(customer_id, count)``, ``(churn, sum)``, ``(churn, mean)``
+    """
+    count = np.asarray(count, dtype=np.int64)
+    churn = np.asarray(churn, dtype=np.int64)
+    return pd.DataFrame({
+        ('customer_id', 'count'): count,
+        ('churn', 'sum'): churn,
+        ('churn', 'mean'): churn / count
+    }, index=index).round(3)
+
+
+def _group_index(df: pd.DataFrame, column: str, keys: np.ndarray) -> pd.Index:
+    """Index des groupes à partir des clés triées (codes pour les catégorielles)"""
+    dtype = df[column].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pd.CategoricalIndex(pd.Categorical.from_codes(keys, dtype=dtype), name=column)
+    return pd.Index(keys.astype(dtype), name=column)
+
+
+def _physical(df: pd.DataFrame, columns: list) -> dict:
+    """Tableaux NumPy des colonnes, sans copie (codes pour les catégorielles)"""
+    arrays = {}
+    for column in columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[column] = values.cat.codes.to_numpy()
+        else:
+            arrays[column] = values.to_numpy()
+    return arrays
+
+
+def _filter_keys(df: pd.DataFrame, column: str, values) -> np.ndarray:
+    """Valeurs autorisées d'un filtre, traduites en codes pour les catégorielles"""
+    dtype = df[column].dtype
+    values = list(values)
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = dtype.categories.get_indexer(values)
+        return codes[codes >= 0]
+    return np.asarray(values)
+
+
+def _correlation_frame(pairs: dict, columns: list) -> pd.DataFrame:
+    """Matrice de corrélation symétrique à partir des paires (i < j)"""
+    matrix = np.eye(len(columns))
+    for (i, j), value in pairs.items():
+        matrix[i, j] = matrix[j, i] = value
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+class PandasBackend:
+    """Moteur de référence : pandas, mono-thread, sans dépendance"""
+    
+    name = 'pandas'
+    
+    def churn_by_category(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
+        """Effectif, churns et taux de churn par modalité de ``column``"""
+        return df.groupby(column, observed=True).agg({
+            'customer_id': 'count',
+            'churn': ['sum', 'mean']
+        }).round(3)
+    
+    def summary_stats(self, df: pd.DataFrame) -> dict:
+        """Statistiques résumées (format de ``get_summary_stats``)"""
+        return SummaryStats.from_frame(df).summary()
+    
+    def filter_mask(self, df: pd.DataFrame, filters: dict) -> np.ndarray:
+        """Masque des lignes retenues par les filtres ``{variable: modalités}``"""
+        mask = np.ones(len(df), dtype=bool)
+        for column, values in filters.items():
+            mask &= df[column].isin(list(values)).to_numpy()
+        return mask
+    
+    def correlation(self, df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+        """Matrice de corrélation de Pearson"""
+        return df[columns or CORRELATION_COLUMNS].corr()
+
+
+class ArrowBackend:
+    """Moteur pyarrow : noyaux compute et group_by multi-threads"""
+    
+    name = 'arrow'
+    
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+        except ImportError:
+            raise ImportError("Le moteur 'arrow' nécessite pyarrow : pip install pyarrow")
+        self.pa = pa
+        self.pc = pc
+    
+    def _table(self, df: pd.DataFrame, columns: list):
+        """Table Arrow des colonnes utiles (tampons NumPy partagés)"""
+        return self.pa.table(_physical(df, columns))
+    
+    def churn_by_category(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
+        """Effectif, churns et taux de churn par modalité de ``column``"""
+        table = self._table(df, [column, 'churn'])
+        grouped = table.group_by(column).aggregate([
+            ('churn', 'count'), ('churn', 'sum')
+        ]).sort_by(column)
+        
+        return churn_table(
+            _group_index(df, column, grouped[column].to_numpy()),
+            grouped['churn_count'].to_numpy(),
+            grouped['churn_sum'].to_numpy()
+        )
+    
+    def summary_stats(self, df: pd.DataFrame) -> dict:
+        """Statistiques résumées (format de ``get_summary_stats``)"""
+        pc = self.pc
+        table = self._table(df, NUMERIC_COLUMNS + ['churn'])
+        
+        def total(column):
+            return pc.sum(pc.cast(table[column], self.pa.float64())).as_py()
+        
+        count = table.num_rows
+        churn_count = int(pc.sum(table['churn']).as_py() or 0)
+        return {
+            'total_clients': count,
+            'churn_count': churn_count,
+            'churn_rate': churn_count / count * 100 if count else np.nan,
+            'avg_tenure': total('tenure_months') / count if count else np.nan,
+            'avg_charges': total('monthly_charges') / count if count else np.nan,
+            'avg_satisfaction': total('satisfaction_score') / count if count else np.nan,
+            'total_revenue': total('total_charges') or 0.0
+        }
+    
+    def filter_mask(self, df: pd.DataFrame, filters: dict) -> np.ndarray:
+        """Masque des lignes retenues par les filtres ``{variable: modalités}``"""
+        pc = self.pc
+        table = self._table(df, list(filters))
+        mask = None
+        for column, values in filters.items():
+            keys = _filter_keys(df, column, values)
+            kept = pc.is_in(table[column], value_set=self.pa.array(keys, type=table[column].type))
+            mask = kept if mask is None else pc.and_(mask, kept)
+        if mask is None:
+            return np.ones(len(df), dtype=bool)
+        return mask.to_numpy(zero_copy_only=False)
+    
+    def correlation(self, df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+        """Matrice de corrélation de Pearson"""
+        pc = self.pc
+        columns = list(columns or CORRELATION_COLUMNS)
+        table = self._table(df, columns)
+        
+        centered = []
+        for column in columns:
+            values = pc.cast(table[column], self.pa.float64())
+            centered.append(pc.subtract(values, pc.mean(values)))
+        norms = [np.sqrt(pc.sum(pc.multiply(c, c)).as_py()) for c in centered]
+        
+        pairs = {}
+        for i in range(len(columns)):
+            for j in range(i + 1, len(columns)):
+                dot = pc.sum(pc.multiply(centered[i], centered[j])).as_py()
+                pairs[(i, j)] = dot / (norms[i] * norms[j])
+        return _correlation_frame(pairs, columns)
+
+
+class PolarsBackend:
+    """Moteur Polars : requêtes paresseuses exécutées sur tous les cœurs"""
+    
+    name = 'polars'
+    
+    def __init__(self):
+        try:
+            import polars as pl
+        except ImportError:
+            raise ImportError("Le moteur 'polars' nécessite Polars : pip install polars")
+        self.pl = pl
+    
+    def _frame(self, df: pd.DataFrame, columns: list):
+        """LazyFrame Polars des colonnes utiles"""
+        return self.pl.DataFrame(_physical(df, columns)).lazy()
+    
+    def churn_by_category(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
+        """Effectif, churns et taux de churn par modalité de ``column``"""
+        pl = self.pl
+        grouped = self._frame(df, [column, 'churn']).group_by(column).agg(
+            pl.len().alias('churn_count'),
+            pl.col('churn').cast(pl.Int64).sum().alias('churn_sum')
+        ).sort(column).collect()
+        
+        return churn_table(
+            _group_index(df, column, grouped[column].to_numpy()),
+            grouped['churn_count'].to_numpy(),
+            grouped['churn_sum'].to_numpy()
+        )
+    
+    def summary_stats(self, df: pd.DataFrame) -> dict:
+        """Statistiques résumées (format de ``get_summary_stats``)"""
+        pl = self.pl
+        row = self._frame(df, NUMERIC_COLUMNS + ['churn']).select(
+            pl.col('churn').cast(pl.Int64).sum().alias('churn_count'),
+            *[pl.col(c).cast(pl.Float64).sum().alias(c) for c in NUMERIC_COLUMNS]
+        ).collect().row(0, named=True)
+        
+        count = len(df)
+        churn_count = int(row['churn_count'] or 0)
+        return {
+            'total_clients': count,
+            'churn_count': churn_count,
+            'churn_rate': churn_count / count * 100 if count else np.nan,
+            'avg_tenure': row['tenure_months'] / count if count else np.nan,
+            'avg_charges': row['monthly_charges'] / count if count else np.nan,
+            'avg_satisfaction': row['satisfaction_score'] / count if count else np.nan,
+            'total_revenue': row['total_charges'] or 0.0
+        }
+    
+    def filter_mask(self, df: pd.DataFrame, filters: dict) -> np.ndarray:
+        """Masque des lignes retenues par les filtres ``{variable: modalités}``"""
+        pl = self.pl
+        if not filters:
+            return np.ones(len(df), dtype=bool)
+        
+        condition = pl.lit(True)
+        for column, values in filters.items():
+            keys = _filter_keys(df, column, values).tolist()
+            condition = condition & pl.col(column).is_in(keys)
+        return self._frame(df, list(filters)).select(condition.alias('mask')).collect()['mask'].to_numpy()
+    
+    def correlation(self, df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+        """Matrice de corrélation de Pearson"""
+        pl = self.pl
+        columns = list(columns or CORRELATION_COLUMNS)
+        pairs = [(i, j) for i in range(len(columns)) for j in range(i + 1, len(columns))]
+        
+        # Toutes les paires dans une seule requête, évaluée en parallèle
+        row = self._frame(df, columns).select(*[
+            pl.corr(pl.col(columns[i]).cast(pl.Float64), pl.col(columns[j]).cast(pl.Float64)).alias(f"{i}_{j}")
+            for i, j in pairs
+        ]).collect().row(0)
+        return _correlation_frame(dict(zip(pairs, row)), columns)
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'arrow': ArrowBackend,
+    'polars': PolarsBackend
+}
+
+
+def get_backend(backend=None, n_rows: int = None):
+    """
+    Sélectionne le moteur d'agrégation.
+    
+    Parameters
+    ----------
+    backend : str or objet moteur, optional
+        'auto', 'pandas', 'arrow' ou 'polars' (``DATA_BACKEND`` par défaut) ;
+        un moteur déjà instancié est renvoyé tel quel
+    n_rows : int, optional
+        Taille des données : en 'auto', pandas est conservé sous
+        ``BACKEND_MIN_ROWS`` lignes
+    
+    Returns
+    -------
+    PandasBackend, ArrowBackend or PolarsBackend
+        Moteur à utiliser
+    """
+    backend = backend or DATA_BACKEND
+    if not isinstance(backend, str):
+        return backend
+    
+    if backend == 'auto':
+        if n_rows is not None and n_rows < BACKEND_MIN_ROWS:
+            return PandasBackend()
+        for name in ('polars', 'arrow'):
+            try:
+                return BACKENDS[name]()
+            except ImportError:
+                continue
+        return PandasBackend()
+    
+    if backend not in BACKENDS:
+        raise ValueError(f"Moteur inconnu : {backend} (choix : auto, {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
@@ -0,0 +1,192 @@
+"""
+ChurnGuard - Cube de Segments
+=============================
+Agrégats pré-calculés du churn par segment client
+"""
+
+import pandas as pd
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import CATEGORY_LEVELS, CUBE_NUMERIC_BINS
+
+
+# Mesures additives stockées dans chaque cellule
+CUBE_MEASURES = ['count', 'churn', 'monthly_charges', 'total_charges']
+
+
+def _bin_label(low: float, high: float) -> str:
+    """Libellé d'une classe [a, b)"""
+    if np.isinf(high):
+        return f"≥ {low:g}"
+    return f"[{low:g}, {high:g})"
+
+
+class SegmentCube:
+    """
+    Cube dense d'agrégats par segment client.
+    
+    Les dimensions sont les variables catégorielles, le statut de churn et
+    les variables numériques discrétisées selon ``CUBE_NUMERIC_BINS``.
+    Chaque cellule stocke l'effectif, le nombre de churns et les sommes de
+    charges : toute requête « taux de churn par dimension sous filtres »
+    se résout en sommant des cellules, en O(cellules) et non O(lignes).
+    
+    Parameters
+    ----------
+    dimensions : dict
+        Modalités (libellés) de chaque dimension, dans l'ordre des axes
+    measures : dict
+        Tableaux denses des mesures, de forme ``(len(modalités), ...)``
+    version : str, optional
+        Version des données ayant servi à construire le cube
+    """
+    
+    def __init__(self, dimensions: dict, measures: dict, version: str = None):
+        self.dimensions = dimensions
+        self.measures = measures
+        self.version = version
+        self._axes = {name: i for i, name in enumerate(dimensions)}
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, version: str = None) -> 'SegmentCube':
+        """
+        Construit le cube en un seul passage sur les données.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Données clients au schéma compact
+        version : str, optional
+            Version des données
+        
+        Returns
+        -------
+        SegmentCube
+            Cube des agrégats
+        """
+        dimensions = {}
+        codes = []
+        
+        for column, levels in CATEGORY_LEVELS.items():
+            dimensions[column] = list(levels)
+            codes.append(df[column].cat.codes.to_numpy())
+        
+        dimensions['churn'] = [0, 1]
+        codes.append(df['churn'].to_numpy())
+        
+        for column, edges in CUBE_NUMERIC_BINS.items():
+            dimensions[column] = [_bin_label(lo, hi) for lo, hi in zip(edges[:-1], edges[1:])]
+            bins = np.searchsorted(np.asarray(edges[1:-1]), df[column].to_numpy(), side='right')
+            codes.append(bins)
+        
+        shape = tuple(len(levels) for levels in dimensions.values())
+        cells = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+        
+        measures = {'count': np.bincount(cells, minlength=size).astype(np.float64).reshape(shape)}
+        for name in CUBE_MEASURES[1:]:
+            weights = df[name].to_numpy(dtype=np.float64)
+            measures[name] = np.bincount(cells, weights=weights, minlength=size).reshape(shape)
+        
+        return cls(dimensions, measures, version=version)
+    
+    @property
+    def n_cells(self) -> int:
+        """Nombre de cellules du cube"""
+        return self.measures['count'].size
+    
+    @property
+    def nbytes(self) -> int:
+        """Empreinte mémoire des mesures"""
+        return sum(values.nbytes for values in self.measures.values())
+    
+    def _selector(self, dimension: str, allowed) -> np.ndarray:
+        """Masque booléen des modalités retenues par un filtre"""
+        levels = self.dimensions[dimension]
+        
+        if dimension in CUBE_NUMERIC_BINS and isinstance(allowed, tuple):
+            # Intervalle [bas, haut) : doit couvrir des classes entières
+            low, high = allowed
+            low = -np.inf if low is None else low
+            high = np.inf if high is None else high
+            edges = np.asarray(CUBE_NUMERIC_BINS[dimension], dtype=float)
+            bin_low, bin_high = edges[:-1], edges[1:]
+            inside = (bin_low >= low) & (bin_high <= high)
+            outside = (bin_high <= low) | (bin_low >= high)
+            if not np.all(inside | outside):
+                raise ValueError(
+                    f"L'intervalle {allowed} ne suit pas les classes de {dimension} "
+                    f"({CUBE_NUMERIC_BINS[dimension]})"
+                )
+            return inside
+        
+        return np.isin(np.asarray(levels, dtype=object), list(allowed))
+    
+    def _reduce(self, filters: dict = None, keep: str = None) -> dict:
+        """Somme les mesures sur les cellules filtrées, sauf l'axe ``keep``"""
+        index = [slice(None)] * len(self.dimensions)
+        for dimension, allowed in (filters or {}).items():
+            if dimension not in self._axes:
+                raise KeyError(f"Dimension inconnue : {dimension}")
+            index[self._axes[dimension]] = self._selector(dimension, allowed)
+        
+        axes = tuple(i for name, i in self._axes.items() if name != keep)
+        reduced = {}
+        for name, values in self.measures.items():
+            # Sélection axe par axe (un masque booléen par dimension)
+            for axis, selector in enumerate(index):
+                if not isinstance(selector, slice):
+                    values = np.compress(selector, values, axis=axis)
+            reduced[name] = values.sum(axis=axes)
+        return reduced
+    
+    def churn_by(self, dimension: str, filters: dict = None) -> pd.DataFrame:
+        """
+        Agrégats par modalité d'une dimension, sous filtres.
+        
+        Parameters
+        ----------
+        dimension : str
+            Dimension de regroupement
+        filters : dict, optional
+            ``{dimension: modalités retenues}`` ; pour une variable
+            numérique, un intervalle ``(bas, haut)`` aligné sur les classes
+            est aussi accepté
+        
+        Returns
+        -------
+        pd.DataFrame
+            Effectif, churns, sommes de charges et taux de churn par
+            modalité (modalités vides exclues)
+        """
+        if dimension not in self._axes:
+            raise KeyError(f"Dimension inconnue : {dimension}")
+        
+        reduced = self._reduce(filters, keep=dimension)
+        levels = self.dimensions[dimension]
+        if filters and dimension in filters:
+            levels = [lvl for lvl, kept in zip(levels, self._selector(dimension, filters[dimension])) if kept]
+        
+        result = pd.DataFrame(reduced, index=pd.Index(levels, name=dimension))
+        result = result[result['count'] > 0].copy()
+        result['count'] = result['count'].astype(np.int64)
+        result['churn_rate'] = result['churn'] / result['count']
+        return result
+    
+    def total(self, filters: dict = None) -> dict:
+        """
+        Agrégats globaux sous filtres.
+        
+        Returns
+        -------
+        dict
+            Effectif, churns, sommes de charges et taux de churn
+        """
+        reduced = {name: float(values) for name, values in self._reduce(filters).items()}
+        reduced['count'] = int(reduced['count'])
+        reduced['churn_rate'] = reduced['churn'] / reduced['count'] if reduced['count'] else np.nan
+        return reduced
@@ -0,0 +1,218 @@
+"""
+ChurnGuard - Évaluation des Modèles
+===================================
+Une passe d'inférence par modèle ; métriques, ROC et matrices de confusion
+dérivées des scores mémorisés, à n'importe quel seuil
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.metrics import roc_curve, auc
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.neighbors import MultiKNeighbors, knn_groups
+
+
+# Seuil de décision par défaut (celui de ``predict`` des modèles)
+DEFAULT_THRESHOLD = 0.5
+
+
+def predict_models(models: dict, X_scaled: np.ndarray) -> dict:
+    """
+    Prédictions de tous les modèles sur une matrice standardisée.
+    
+    Les KNN ajustés sur le même jeu et ne différant que par k partagent
+    une seule recherche de voisins, faite pour le plus grand k.
+    
+    Parameters
+    ----------
+    models : dict
+        Dictionnaire des modèles entraînés
+    X_scaled : np.ndarray
+        Features standardisées
+    
+    Returns
+    -------
+    dict
+        Par modèle : ``{'pred': classes prédites, 'proba': probabilités}``
+        (``proba`` vaut None si le modèle n'en fournit pas)
+    """
+    predictions = {}
+    for group in knn_groups(models):
+        if len(group) < 2:
+            continue
+        # Recherche faite par le KNN au plus grand k (sa forêt vaut celle du groupe)
+        largest = max(group, key=lambda name: models[name].n_neighbors)
+        multi = MultiKNeighbors(models[largest], [models[name].n_neighbors for name in group])
+        multi.query(X_scaled)
+        for name in group:
+            k = models[name].n_neighbors
+            predictions[name] = {'pred': multi.predict(k), 'proba': multi.predict_proba(k)}
+    
+    for name, model in models.items():
+        if name not in predictions:
+            proba = model.predict_proba(X_scaled) if hasattr(model, 'predict_proba') else None
+            predictions[name] = {'pred': model.predict(X_scaled), 'proba': proba}
+    return {name: predictions[name] for name in models}
+
+
+def knn_sweep(model, X_test: np.ndarray, y_test: np.ndarray, k_values: list) -> pd.DataFrame:
+    """
+    Métriques d'un KNN pour une série de k, avec une seule recherche.
+    
+    Parameters
+    ----------
+    model : KNeighborsClassifier or ANNKNeighborsClassifier
+        KNN entraîné (son k propre est ignoré)
+    X_test : np.ndarray
+        Features de test standardisées
+    y_test : np.ndarray
+        Labels de test
+    k_values : list
+        Valeurs de k à comparer
+    
+    Returns
+    -------
+    pd.DataFrame
+        Une ligne par k (Accuracy, Precision, Recall, F1-Score, AUC)
+    """
+    return MultiKNeighbors(model, k_values).query(X_test).sweep(y_test)
+
+
+class ModelEvaluation:
+    """
+    Scores d'un modèle sur un jeu de test, calculés une seule fois.
+    
+    Les scores sont triés une fois avec le cumul des positifs : la matrice
+    de confusion à un seuil quelconque s'obtient alors par recherche
+    dichotomique, sans nouvelle prédiction. Un client est prédit churn si
+    son score dépasse strictement le seuil (``predict`` des modèles à 0.5).
+    
+    Parameters
+    ----------
+    y_true : np.ndarray
+        Labels réels (0/1)
+    scores : np.ndarray
+        Probabilité de churn (ou classe prédite si le modèle n'a pas de
+        ``predict_proba``)
+    """
+    
+    def __init__(self, y_true: np.ndarray, scores: np.ndarray):
+        self.y_true = np.asarray(y_true).astype(bool)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        if self.y_true.shape != self.scores.shape:
+            raise ValueError("y_true et scores doivent avoir la même longueur")
+        
+        order = np.argsort(self.scores, kind='stable')
+        self._sorted_scores = self.scores[order]
+        # _positives_below[i] : positifs parmi les i plus petits scores
+        self._positives_below = np.concatenate([[0], np.cumsum(self.y_true[order])])
+        self.n_positive = int(self._positives_below[-1])
+        self._roc = None
+    
+    @classmethod
+    def from_model(cls, model, X_scaled: np.ndarray, y_true: np.ndarray) -> 'ModelEvaluation':
+        """Évaluation d'un modèle (une seule inférence)"""
+        if hasattr(model, 'predict_proba'):
+            return cls(y_true, model.predict_proba(X_scaled)[:, 1])
+        return cls(y_true, model.predict(X_scaled))
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des tableaux mémorisés (octets)"""
+        return self.y_true.nbytes + self.scores.nbytes + self._sorted_scores.nbytes + self._positives_below.nbytes
+    
+    def predict(self, threshold: float = DEFAULT_THRESHOLD) -> np.ndarray:
+        """Classes prédites au seuil donné"""
+        return (self.scores > threshold).astype(np.int8)
+    
+    def confusion(self, threshold: float = DEFAULT_THRESHOLD) -> np.ndarray:
+        """
+        Matrice de confusion au seuil donné.
+        
+        Returns
+        -------
+        np.ndarray
+            ``[[VN, FP], [FN, VP]]`` (format de ``confusion_matrix``)
+        """
+        n = len(self.scores)
+        below = int(np.searchsorted(self._sorted_scores, threshold, side='right'))
+        fn = int(self._positives_below[below])
+        tn = below - fn
+        tp = self.n_positive - fn
+        fp = (n - below) - tp
+        return np.array([[tn, fp], [fn, tp]])
+    
+    def metrics(self, threshold: float = DEFAULT_THRESHOLD) -> dict:
+        """
+        Accuracy, précision, rappel et F1 au seuil donné.
+        
+        Une précision sans prédiction positive vaut 0 (comme ``zero_division=0``).
+        """
+        (tn, fp), (fn, tp) = self.confusion(threshold)
+        n = tn + fp + fn + tp
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+        return {
+            'Accuracy': (tp + tn) / n if n else np.nan,
+            'Precision': precision,
+            'Recall': recall,
+            'F1-Score': f1
+        }
+    
+    def roc(self) -> dict:
+        """Courbe ROC et AUC (calculées au premier appel)"""
+        if self._roc is None:
+            fpr, tpr, thresholds = roc_curve(self.y_true, self.scores)
+            self._roc = {'fpr': fpr, 'tpr': tpr, 'thresholds': thresholds, 'auc': auc(fpr, tpr)}
+        return self._roc
+    
+    @property
+    def auc(self) -> float:
+        """Aire sous la courbe ROC"""
+        return self.roc()['auc']
+
+
+def evaluate(models: dict, X_scaled: np.ndarray, y_true: np.ndarray) -> dict:
+    """
+    Évalue tous les modèles en une passe d'inférence.
+    
+    Parameters
+    ----------
+    models : dict
+        Dictionnaire des modèles entraînés
+    X_scaled : np.ndarray
+        Features de test standardisées
+    y_true : np.ndarray
+        Labels de test
+    
+    Returns
+    -------
+    dict
+        ``ModelEvaluation`` par modèle
+    """
+    y_true = np.asarray(y_true)
+    evaluations = {}
+    for name, prediction in predict_models(models, X_scaled).items():
+        scores = prediction['pred'] if prediction['proba'] is None else prediction['proba'][:, 1]
+        evaluations[name] = ModelEvaluation(y_true, scores)
+    return evaluations
+
+
+def evaluation_table(evaluations: dict, threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+    """
+    Tableau comparatif des modèles au seuil donné.
+    
+    Returns
+    -------
+    pd.DataFrame
+        Modèle, Accuracy, Precision, Recall, F1-Score
+    """
+    return pd.DataFrame([
+        {'Modèle': name, **evaluation.metrics(threshold)}
+        for name, evaluation in evaluations.items()
+    ])
@@ -0,0 +1,181 @@
+"""
+ChurnGuard - Index de Filtres
+=============================
+Bitsets pré-calculés pour les filtres de la barre latérale
+"""
+
+import pandas as pd
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import CATEGORICAL_COLUMNS
+
+
+class Selection:
+    """
+    Sélection paresseuse de lignes, stockée sous forme de bitset.
+    
+    Les sélections se combinent par ``&``, ``|`` et ``~`` sans toucher
+    aux données ; les indices de lignes ne sont calculés qu'au premier
+    accès, et seules les colonnes demandées sont extraites.
+    
+    Parameters
+    ----------
+    bits : np.ndarray
+        Bitset compacté (``np.packbits``), un bit par ligne
+    n_rows : int
+        Nombre de lignes du dataset
+    """
+    
+    def __init__(self, bits: np.ndarray, n_rows: int):
+        self.bits = bits
+        self.n_rows = n_rows
+        self._indices = None
+    
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> 'Selection':
+        """Sélection à partir d'un masque booléen"""
+        return cls(np.packbits(mask), len(mask))
+    
+    @classmethod
+    def full(cls, n_rows: int) -> 'Selection':
+        """Sélection de toutes les lignes"""
+        return cls.from_mask(np.ones(n_rows, dtype=bool))
+    
+    def __and__(self, other: 'Selection') -> 'Selection':
+        return Selection(self.bits & other.bits, self.n_rows)
+    
+    def __or__(self, other: 'Selection') -> 'Selection':
+        return Selection(self.bits | other.bits, self.n_rows)
+    
+    def __invert__(self) -> 'Selection':
+        # Les bits de bourrage du dernier octet restent à zéro
+        return Selection(np.packbits(~self.mask()), self.n_rows)
+    
+    def count(self) -> int:
+        """Nombre de lignes sélectionnées (popcount)"""
+        return int(np.bitwise_count(self.bits).sum())
+    
+    def mask(self) -> np.ndarray:
+        """Masque booléen des lignes sélectionnées"""
+        return np.unpackbits(self.bits, count=self.n_rows).view(bool)
+    
+    @property
+    def indices(self) -> np.ndarray:
+        """Positions des lignes sélectionnées (calculées une fois)"""
+        if self._indices is None:
+            self._indices = np.flatnonzero(self.mask())
+        return self._indices
+    
+    def is_full(self) -> bool:
+        """Vrai si toutes les lignes sont sélectionnées"""
+        return self.count() == self.n_rows
+    
+    def take(self, df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+        """
+        Extrait les lignes sélectionnées, pour les seules colonnes utiles.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Dataset indexé
+        columns : list, optional
+            Colonnes à extraire (toutes par défaut)
+        
+        Returns
+        -------
+        pd.DataFrame
+            Lignes sélectionnées
+        """
+        columns = list(df.columns) if columns is None else columns
+        if self.is_full():
+            return df[columns]
+        return df[columns].take(self.indices)
+
+
+class FilterIndex:
+    """
+    Index de filtres : un bitset par modalité de chaque variable indexée.
+    
+    Un filtre « valeurs autorisées » est l'union (OU) des bitsets de ses
+    modalités ; plusieurs filtres se combinent par intersection (ET). Le
+    coût d'un filtre est proportionnel à ``n_rows / 8`` octets, sans copie
+    du DataFrame.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Données clients au schéma compact
+    columns : list, optional
+        Variables indexées (catégorielles et churn par défaut)
+    version : str, optional
+        Version des données indexées
+    """
+    
+    def __init__(self, df: pd.DataFrame, columns: list = None, version: str = None):
+        self.n_rows = len(df)
+        self.version = version
+        self.bitsets = {}
+        
+        for column in columns or CATEGORICAL_COLUMNS + ['churn']:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes = values.cat.codes.to_numpy()
+                levels = list(values.cat.categories)
+            else:
+                levels, codes = np.unique(values.to_numpy(), return_inverse=True)
+                levels = levels.tolist()
+            self.bitsets[column] = {
+                level: np.packbits(codes == i) for i, level in enumerate(levels)
+            }
+    
+    @property
+    def nbytes(self) -> int:
+        """Empreinte mémoire des bitsets"""
+        return sum(bits.nbytes for column in self.bitsets.values() for bits in column.values())
+    
+    def all(self) -> Selection:
+        """Sélection de toutes les lignes"""
+        return Selection.full(self.n_rows)
+    
+    def select(self, column: str, values) -> Selection:
+        """
+        Lignes dont ``column`` prend l'une des ``values`` (OU des bitsets).
+        
+        Parameters
+        ----------
+        column : str
+            Variable indexée
+        values : iterable
+            Modalités autorisées
+        
+        Returns
+        -------
+        Selection
+            Lignes retenues
+        """
+        if column not in self.bitsets:
+            raise KeyError(f"Variable non indexée : {column}")
+        
+        bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in self.bitsets[column]:
+                bits |= self.bitsets[column][value]
+        return Selection(bits, self.n_rows)
+    
+    def query(self, filters: dict) -> Selection:
+        """
+        Combinaison ET de plusieurs filtres ``{variable: modalités}``.
+        
+        Returns
+        -------
+        Selection
+            Lignes retenues par tous les filtres
+        """
+        selection = self.all()
+        for column, values in filters.items():
+            selection = selection & self.select(column, values)
+        return selection
@@ -4,26 +4,35 @@ ChurnGuard - Module Modèles ML
 Fonctions d'entraînement et d'évaluation des modèles
 """
 
+import os
+import json
+import time
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 import streamlit as st
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.linear_model import LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    confusion_matrix, roc_curve, auc
-)
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config import RANDOM_STATE, CATEGORICAL_COLUMNS, FEATURE_COLUMNS
+from config import (
+    RANDOM_STATE, TEST_SIZE, CACHE_DIR, MODELS_CONFIG, MODELS_FILE, KNN_SEARCH, ANN_PARAMS, TRAINING_N_JOBS, CV_FOLDS,
+    SCORING_CHUNK_SIZE, RISK_BINS, RISK_LABELS
+)
+from utils.preprocessing import ChurnPreprocessor
+from utils.registry import ModelRegistry, training_key, array_digest
+from utils.evaluation import evaluate, evaluation_table, ModelEvaluation, DEFAULT_THRESHOLD
+from utils.validation import CrossValidationResult, cached_cross_validate, describe_estimators
+from utils.scoring import compiled_scorer, PredictionCache
+from utils.neighbors import ann_report
 
 
-def prepare_features(df: pd.DataFrame) -> tuple:
+def prepare_features(df: pd.DataFrame, preprocessor: ChurnPreprocessor = None) -> tuple:
     """
     Prépare les features pour le Machine Learning.
     
@@ -31,60 +40,350 @@ def prepare_features(df: pd.DataFrame) -> tuple:
     ----------
     df : pd.DataFrame
         DataFrame des données brutes
+    preprocessor : ChurnPreprocessor, optional
+        Prétraitement à utiliser (nouveau, non ajusté, par défaut)
         
     Returns
     -------
     tuple
-        (X, y, label_encoders, feature_columns)
+        (X, y, preprocessor, feature_columns) ; X est la matrice float32
+        encodée (non standardisée)
+    """
+    preprocessor = preprocessor or ChurnPreprocessor()
+    
+    X = preprocessor.encode(df)
+    y = df['churn'].to_numpy()
+    
+    return X, y, preprocessor, preprocessor.feature_columns
+
+
+def split_features(X: np.ndarray, y: np.ndarray) -> tuple:
+    """
+    Découpage entraînement / test (``TEST_SIZE``, ``RANDOM_STATE``).
+    
+    Returns
+    -------
+    tuple
+        (X_train, X_test, y_train, y_test)
+    """
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+
+@st.cache_resource
+def get_model_features(version: str, _df: pd.DataFrame) -> tuple:
     """
-    df_ml = df.copy()
+    Features d'une version des données, avec leur prétraitement ajusté.
     
-    # Encodage des variables catégorielles
-    label_encoders = {}
+    L'encodage n'est calculé qu'une fois par version. Le prétraitement est
+    ajusté sur le jeu d'entraînement puis sérialisé dans le cache disque ;
+    les processus suivants le rechargent sans le réajuster.
+    
+    Parameters
+    ----------
+    version : str
+        Version des données (clé de cache)
+    _df : pd.DataFrame
+        Données de cette version
+        
+    Returns
+    -------
+    tuple
+        (X, y, preprocessor, feature_columns)
+    """
+    path = os.path.join(CACHE_DIR, 'models', version, 'preprocessor.joblib')
     
-    for col in CATEGORICAL_COLUMNS:
-        le = LabelEncoder()
-        df_ml[col + '_encoded'] = le.fit_transform(df_ml[col])
-        label_encoders[col] = le
+    if os.path.exists(path):
+        preprocessor = ChurnPreprocessor.load(path)
+        X, y, _, feature_columns = prepare_features(_df, preprocessor)
+    else:
+        X, y, preprocessor, feature_columns = prepare_features(_df)
+        X_train, _, _, _ = split_features(X, y)
+        preprocessor.fit_scaler(X_train).save(path)
     
-    X = df_ml[FEATURE_COLUMNS]
-    y = df_ml['churn']
+    return X, y, preprocessor, feature_columns
+
+
+def build_estimator(config: dict):
+    """
+    Instancie un estimateur décrit dans ``MODELS_CONFIG``.
     
-    return X, y, label_encoders, FEATURE_COLUMNS
+    Parameters
+    ----------
+    config : dict
+        Entrée de configuration (``estimator`` : chemin d'import de la
+        classe, ``params`` : paramètres)
+        
+    Returns
+    -------
+    object
+        Estimateur non entraîné
+    """
+    module_name, _, class_name = config['estimator'].rpartition('.')
+    try:
+        estimator_class = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise ImportError(f"Estimateur introuvable : {config['estimator']}") from e
+    return estimator_class(**config.get('params', {}))
+
+
+def model_nbytes(model) -> int:
+    """Mémoire des tableaux d'un modèle entraîné (y compris arbres et index)"""
+    total = 0
+    for value in vars(model).values():
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif hasattr(value, 'get_arrays'):
+            total += sum(a.nbytes for a in value.get_arrays() if isinstance(a, np.ndarray))
+        elif isinstance(getattr(value, 'nbytes', None), int):
+            total += value.nbytes
+    return total
+
+
+def _fit_one(name: str, config: dict, X: np.ndarray, y: np.ndarray) -> dict:
+    """Entraîne un modèle et mesure sa durée et sa mémoire"""
+    model = build_estimator(config)
+    start = time.perf_counter()
+    model.fit(X, y)
+    return {
+        'name': name,
+        'model': model,
+        'fit_seconds': time.perf_counter() - start,
+        'bytes': model_nbytes(model)
+    }
+
+
+def fit_models(X_train_scaled: np.ndarray, y_train: np.ndarray, models_config: dict = None, n_jobs: int = None) -> tuple:
+    """
+    Entraîne en parallèle les modèles de ``MODELS_CONFIG``.
+    
+    Les modèles sont entraînés sur un pool de threads qui partagent une
+    seule vue en lecture seule de la matrice standardisée (aucune copie
+    par modèle) ; les noyaux scikit-learn libèrent le GIL pendant le calcul.
+    
+    Parameters
+    ----------
+    X_train_scaled : np.ndarray
+        Features d'entraînement standardisées
+    y_train : np.ndarray
+        Labels d'entraînement
+    models_config : dict, optional
+        Configuration des modèles (``MODELS_CONFIG`` par défaut)
+    n_jobs : int, optional
+        Nombre de threads (``TRAINING_N_JOBS`` par défaut, -1 = tous les cœurs)
+        
+    Returns
+    -------
+    tuple
+        (trained_models, report) ; report donne, par modèle, la durée
+        d'entraînement et la mémoire des tableaux
+    """
+    models_config = models_config or MODELS_CONFIG
+    n_jobs = n_jobs or TRAINING_N_JOBS
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(models_config)))
+    
+    X = np.asarray(X_train_scaled).view()
+    X.flags.writeable = False
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        results = list(executor.map(
+            lambda item: _fit_one(item[0], item[1], X, y_train),
+            models_config.items()
+        ))
+    wall_seconds = time.perf_counter() - start
+    
+    trained_models = {r['name']: r['model'] for r in results}
+    report = {
+        'models': [{k: r[k] for k in ('name', 'fit_seconds', 'bytes')} for r in results],
+        'wall_seconds': wall_seconds,
+        'n_jobs': n_jobs
+    }
+    return trained_models, report
+
+
+def registry_key(X_train: np.ndarray, y_train: np.ndarray, preprocessor: ChurnPreprocessor,
+                 version: str = None) -> str:
+    """
+    Clé du registre des modèles d'un entraînement.
+    
+    La clé couvre ``MODELS_CONFIG``, la recherche des voisins
+    (``KNN_SEARCH``), le fichier de configuration (``MODELS_FILE``), le
+    découpage entraînement / test et le prétraitement. Les données sont
+    identifiées par leur version si elle est fournie (aucun hachage des
+    tableaux), par leur contenu sinon.
+    
+    Parameters
+    ----------
+    X_train, y_train : np.ndarray
+        Jeu d'entraînement encodé
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    version : str, optional
+        Version des données (``data_version``) dont provient ``X_train``
+    
+    Returns
+    -------
+    str
+        Empreinte hexadécimale (SHA-1)
+    """
+    config = {
+        'models': MODELS_CONFIG,
+        'knn_search': KNN_SEARCH,
+        'models_file': MODELS_FILE,
+        'split': {'test_size': TEST_SIZE, 'random_state': RANDOM_STATE}
+    }
+    return training_key(X_train, y_train, preprocessor, config, version)
+
+
+def _fit_registered(X_train: np.ndarray, y_train: np.ndarray, preprocessor: ChurnPreprocessor) -> tuple:
+    """Entraîne les modèles d'une entrée absente du registre"""
+    models, report = fit_models(preprocessor.transform(X_train), y_train)
+    # Contenu des données d'entraînement, haché une seule fois (à l'entraînement)
+    return models, {**report, 'data_digest': array_digest(X_train, y_train)}
 
 
 @st.cache_resource
-def train_models(_X_train: pd.DataFrame, _y_train: pd.Series) -> tuple:
+def _registered_models(key: str, _X_train: np.ndarray, _y_train: np.ndarray, _preprocessor: ChurnPreprocessor) -> tuple:
+    """Modèles de l'entrée ``key`` du registre (mémorisés par processus)"""
+    return ModelRegistry().get_or_train(
+        key,
+        lambda: _fit_registered(_X_train, _y_train, _preprocessor),
+        _preprocessor
+    )
+
+
+def train_models(X_train: np.ndarray, y_train: np.ndarray, preprocessor: ChurnPreprocessor = None,
+                 version: str = None) -> tuple:
     """
     Entraîne les modèles de classification.
     
+    Les modèles sont cherchés dans le registre disque sous ``registry_key`` ;
+    ils ne sont entraînés (puis publiés) qu'en l'absence d'entrée. Un
+    nouveau processus recharge donc les modèles au lieu de les réentraîner.
+    
     Parameters
     ----------
-    _X_train : pd.DataFrame
-        Features d'entraînement
-    _y_train : pd.Series
+    X_train : np.ndarray
+        Features d'entraînement encodées
+    y_train : np.ndarray
         Labels d'entraînement
+    preprocessor : ChurnPreprocessor, optional
+        Prétraitement ; ajusté sur ``X_train`` s'il ne l'est pas encore
+    version : str, optional
+        Version des données (``data_version``) : la clé du registre en est
+        déduite sans hacher ``X_train`` à chaque appel
         
     Returns
     -------
     tuple
-        (trained_models, scaler)
+        (trained_models, preprocessor)
     """
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(_X_train)
+    preprocessor = preprocessor or ChurnPreprocessor()
+    if not preprocessor.is_fitted:
+        preprocessor.fit_scaler(X_train)
     
-    models = {
-        'Régression Logistique': LogisticRegression(random_state=RANDOM_STATE, max_iter=1000),
-        'KNN (k=5)': KNeighborsClassifier(n_neighbors=5),
-        'KNN (k=11)': KNeighborsClassifier(n_neighbors=11)
-    }
+    key = registry_key(X_train, y_train, preprocessor, version)
+    return _registered_models(key, X_train, y_train, preprocessor)
+
+
+def get_training_report(X_train: np.ndarray, y_train: np.ndarray, preprocessor: ChurnPreprocessor,
+                        version: str = None) -> pd.DataFrame:
+    """
+    Durée d'entraînement et taille de chaque modèle (entrée du registre).
     
-    trained_models = {}
-    for name, model in models.items():
-        model.fit(X_train_scaled, _y_train)
-        trained_models[name] = model
+    Returns
+    -------
+    pd.DataFrame
+        Modèle, temps d'entraînement (s) et mémoire des tableaux (octets)
+    """
+    report = ModelRegistry().manifest(registry_key(X_train, y_train, preprocessor, version))['metadata']
+    return pd.DataFrame([
+        {'Modèle': r['name'], 'Temps (s)': r['fit_seconds'], 'Mémoire (octets)': r['bytes']}
+        for r in report.get('models', [])
+    ])
+
+
+@st.cache_resource
+def _cached_evaluations(key: str, _models: dict, _X_test: np.ndarray, _y_test: np.ndarray, _preprocessor: ChurnPreprocessor) -> dict:
+    """Évaluations de l'entrée ``key`` (mémorisées par processus)"""
+    return evaluate(_models, _preprocessor.transform(_X_test), _y_test)
+
+
+def get_model_evaluations(models: dict, X_train: np.ndarray, y_train: np.ndarray,
+                          X_test: np.ndarray, y_test: np.ndarray, preprocessor: ChurnPreprocessor,
+                          version: str = None) -> dict:
+    """
+    Évaluations des modèles du registre sur le jeu de test.
+    
+    Les scores sont calculés une fois par modèle entraîné (clé du
+    registre) et par jeu de test ; les métriques, la courbe ROC et les
+    matrices de confusion à tout seuil en sont dérivées sans inférence.
+    Avec une version des données, le jeu de test (découpage déterministe)
+    est identifié par la clé du registre, sans hachage.
+    
+    Parameters
+    ----------
+    models : dict
+        Modèles renvoyés par ``train_models``
+    X_train, y_train : np.ndarray
+        Jeu d'entraînement des modèles (identifie l'entrée du registre)
+    X_test, y_test : np.ndarray
+        Jeu de test encodé
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    version : str, optional
+        Version des données (``data_version``)
     
-    return trained_models, scaler
+    Returns
+    -------
+    dict
+        ``ModelEvaluation`` par modèle
+    """
+    test_key = 'test' if version is not None else array_digest(X_test, y_test)
+    key = f"{registry_key(X_train, y_train, preprocessor, version)}-{test_key}"
+    return _cached_evaluations(key, models, X_test, y_test, preprocessor)
+
+
+@st.cache_resource
+def _cached_ann_report(key: str, _X_train: np.ndarray, _X_test: np.ndarray, _preprocessor: ChurnPreprocessor,
+                       n_neighbors: int) -> pd.DataFrame:
+    """Comparaison exacte / approchée de l'entrée ``key`` (mémorisée par processus)"""
+    return ann_report(
+        _preprocessor.transform(_X_train), _preprocessor.transform(_X_test), n_neighbors,
+        n_trees=ANN_PARAMS['n_trees'], leaf_size=ANN_PARAMS['leaf_size']
+    )
+
+
+def get_ann_report(X_train: np.ndarray, X_test: np.ndarray, preprocessor: ChurnPreprocessor,
+                   version: str = None, n_neighbors: int = 11) -> pd.DataFrame:
+    """
+    Rappel et latence de la recherche approchée des voisins (``ann_report``).
+    
+    La forêt est construite avec ``ANN_PARAMS`` ; le rapport est calculé
+    une fois par version des données et réglage (contenu des matrices
+    haché si la version est omise).
+    
+    Parameters
+    ----------
+    X_train, X_test : np.ndarray
+        Jeux d'entraînement (points indexés) et de test (requêtes) encodés
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    version : str, optional
+        Version des données (``data_version``)
+    n_neighbors : int
+        k du rappel@k
+    
+    Returns
+    -------
+    pd.DataFrame
+        Voir ``ann_report``
+    """
+    data_key = version if version is not None else array_digest(X_train, X_test)
+    key = f"{data_key}-{json.dumps(ANN_PARAMS, sort_keys=True)}"
+    return _cached_ann_report(key, X_train, X_test, preprocessor, n_neighbors)
 
 
 def evaluate_models(models: dict, X_test: pd.DataFrame, y_test: pd.Series, scaler: StandardScaler) -> pd.DataFrame:
@@ -99,28 +398,15 @@ def evaluate_models(models: dict, X_test: pd.DataFrame, y_test: pd.Series, scale
         Features de test
     y_test : pd.Series
         Labels de test
-    scaler : StandardScaler
-        Scaler entraîné
+    scaler : ChurnPreprocessor or StandardScaler
+        Prétraitement ajusté
         
     Returns
     -------
     pd.DataFrame
         DataFrame des résultats d'évaluation
     """
-    X_test_scaled = scaler.transform(X_test)
-    
-    results = []
-    for name, model in models.items():
-        y_pred = model.predict(X_test_scaled)
-        results.append({
-            'Modèle': name,
-            'Accuracy': accuracy_score(y_test, y_pred),
-            'Precision': precision_score(y_test, y_pred),
-            'Recall': recall_score(y_test, y_pred),
-            'F1-Score': f1_score(y_test, y_pred)
-        })
-    
-    return pd.DataFrame(results)
+    return evaluation_table(evaluate(models, scaler.transform(X_test), y_test))
 
 
 def get_roc_data(models: dict, X_test: pd.DataFrame, y_test: pd.Series, scaler: StandardScaler) -> dict:
@@ -132,37 +418,53 @@ def get_roc_data(models: dict, X_test: pd.DataFrame, y_test: pd.Series, scaler:
     dict
         Données ROC par modèle
     """
-    X_test_scaled = scaler.transform(X_test)
-    
     roc_data = {}
-    for name, model in models.items():
-        if hasattr(model, 'predict_proba'):
-            y_prob = model.predict_proba(X_test_scaled)[:, 1]
-            fpr, tpr, _ = roc_curve(y_test, y_prob)
-            roc_auc = auc(fpr, tpr)
-            roc_data[name] = {'fpr': fpr, 'tpr': tpr, 'auc': roc_auc}
+    for name, evaluation in evaluate(models, scaler.transform(X_test), y_test).items():
+        roc = evaluation.roc()
+        roc_data[name] = {'fpr': roc['fpr'], 'tpr': roc['tpr'], 'auc': roc['auc']}
     
     return roc_data
 
 
-def get_confusion_matrix(model, X_test: pd.DataFrame, y_test: pd.Series, scaler: StandardScaler) -> np.ndarray:
+def get_confusion_matrix(model, X_test: pd.DataFrame, y_test: pd.Series, scaler: StandardScaler, threshold: float = 0.5) -> np.ndarray:
     """
-    Calcule la matrice de confusion.
+    Calcule la matrice de confusion (au seuil de décision ``threshold``).
     """
-    X_test_scaled = scaler.transform(X_test)
-    y_pred = model.predict(X_test_scaled)
-    return confusion_matrix(y_test, y_pred)
+    return ModelEvaluation.from_model(model, scaler.transform(X_test), y_test).confusion(threshold)
 
 
-def predict_single(model, scaler: StandardScaler, features: pd.DataFrame) -> tuple:
+def predict_single(model, scaler: StandardScaler, features) -> tuple:
     """
     Prédiction pour un seul client.
     
+    Une régression logistique est scorée par son scorer compilé
+    (``compiled_scorer`` : produit scalaire et sigmoïde, sans validation
+    scikit-learn) ; les autres modèles passent par le prétraitement.
+    
+    Parameters
+    ----------
+    model : estimator
+        Modèle entraîné
+    scaler : ChurnPreprocessor
+        Prétraitement ajusté
+    features : dict or pd.DataFrame
+        Valeurs du client (dictionnaire ou DataFrame d'une ligne)
+    
     Returns
     -------
     tuple
         (prediction, probability)
     """
+    scorer = compiled_scorer(model, scaler) if isinstance(scaler, ChurnPreprocessor) else None
+    if scorer is not None:
+        if isinstance(features, dict):
+            proba = scorer.predict_proba_one(features)
+        else:
+            proba = float(scorer.predict_proba(features)[0, 1])
+        return int(proba > DEFAULT_THRESHOLD), proba
+    
+    if isinstance(features, dict):
+        features = pd.DataFrame([features])
     features_scaled = scaler.transform(features)
     prediction = model.predict(features_scaled)[0]
     
@@ -174,21 +476,178 @@ def predict_single(model, scaler: StandardScaler, features: pd.DataFrame) -> tup
     return prediction, proba
 
 
-def get_cross_validation_scores(models: dict, X: pd.DataFrame, y: pd.Series, scaler: StandardScaler, cv: int = 5) -> pd.DataFrame:
+def predict_batch(model, preprocessor: ChurnPreprocessor, customers,
+                  chunk_size: int = SCORING_CHUNK_SIZE, threshold: float = DEFAULT_THRESHOLD) -> tuple:
+    """
+    Prédictions vectorisées pour un nombre quelconque de clients.
+    
+    Les clients sont encodés, standardisés et prédits par blocs de
+    ``chunk_size`` lignes : une seule inférence par bloc, mémoire bornée
+    par la taille d'un bloc. Une régression logistique sur un DataFrame
+    est scorée par son scorer compilé.
+    
+    Parameters
+    ----------
+    model : estimator
+        Modèle entraîné
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    customers : pd.DataFrame or np.ndarray
+        Clients (DataFrame brut ou encodé) ou matrice déjà encodée
+    chunk_size : int
+        Nombre de clients par bloc
+    threshold : float
+        Seuil de décision (churn si la probabilité le dépasse strictement)
+    
+    Returns
+    -------
+    tuple
+        (predictions int8, probabilités de churn float64)
+    """
+    n = len(customers)
+    probabilities = np.empty(n, dtype=np.float64)
+    scorer = compiled_scorer(model, preprocessor) if isinstance(customers, pd.DataFrame) else None
+    
+    for start in range(0, n, chunk_size):
+        if isinstance(customers, pd.DataFrame):
+            chunk = customers.iloc[start:start + chunk_size]
+        else:
+            chunk = customers[start:start + chunk_size]
+        
+        if scorer is not None:
+            probabilities[start:start + len(chunk)] = scorer.predict_proba(chunk)[:, 1]
+            continue
+        
+        X_scaled = preprocessor.transform(chunk)
+        if hasattr(model, 'predict_proba'):
+            probabilities[start:start + len(chunk)] = model.predict_proba(X_scaled)[:, 1]
+        else:
+            probabilities[start:start + len(chunk)] = model.predict(X_scaled)
+    
+    return (probabilities > threshold).astype(np.int8), probabilities
+
+
+def risk_levels(probabilities: np.ndarray) -> pd.Categorical:
+    """Niveau de risque de chaque probabilité (bornes ``RISK_BINS``)"""
+    codes = np.digitize(probabilities, RISK_BINS).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=RISK_LABELS)
+
+
+def sensitivity_curves(model, preprocessor: ChurnPreprocessor, customer: dict, ranges: dict) -> pd.DataFrame:
     """
-    Calcule les scores de validation croisée.
+    Risque d'un client quand chaque variable parcourt sa plage, les autres fixées.
+    
+    Toutes les lignes perturbées sont rassemblées dans une seule matrice et
+    prédites en un appel. ``total_charges`` suit les charges mensuelles et
+    l'ancienneté (``monthly_charges * tenure_months``) sur les lignes qui
+    les font varier.
+    
+    Parameters
+    ----------
+    model : estimator
+        Modèle entraîné
+    preprocessor : ChurnPreprocessor
+        Prétraitement ajusté
+    customer : dict
+        Valeurs du client de référence
+    ranges : dict
+        Valeurs à parcourir par variable (``{colonne: valeurs}``)
+    
+    Returns
+    -------
+    pd.DataFrame
+        Une ligne par valeur : variable, valeur et probabilité de churn
     """
-    X_scaled = scaler.transform(X)
+    sizes = [len(values) for values in ranges.values()]
+    n = sum(sizes)
+    rows = {
+        column: np.full(n, value, dtype=object if isinstance(value, str) else np.float64)
+        for column, value in customer.items()
+    }
+    
+    start = 0
+    for (column, values), size in zip(ranges.items(), sizes):
+        rows[column][start:start + size] = values
+        start += size
     
-    cv_results = []
-    for name, model in models.items():
-        scores = cross_val_score(model, X_scaled, y, cv=cv, scoring='f1')
-        cv_results.append({
-            'Modèle': name,
-            'F1 Moyen': scores.mean(),
-            'Écart-type': scores.std(),
-            'Min': scores.min(),
-            'Max': scores.max()
-        })
+    variables = np.repeat(list(ranges), sizes)
+    if 'total_charges' in rows:
+        varied = np.isin(variables, ['monthly_charges', 'tenure_months'])
+        rows['total_charges'][varied] = rows['monthly_charges'][varied] * rows['tenure_months'][varied]
+    
+    _, probabilities = predict_batch(model, preprocessor, pd.DataFrame(rows), chunk_size=max(n, 1))
+    return pd.DataFrame({
+        'variable': variables,
+        'value': np.concatenate([np.asarray(values, dtype=object) for values in ranges.values()]),
+        'probability': probabilities
+    })
+
+
+@st.cache_resource
+def get_prediction_cache() -> PredictionCache:
+    """Cache des prédictions individuelles, unique pour le processus (toutes sessions)"""
+    return PredictionCache()
+
+
+@st.cache_resource
+def _cached_cross_validation(key: str, _X: np.ndarray, _y: np.ndarray, _estimators: dict, n_splits: int,
+                             _preprocessor: ChurnPreprocessor, _version: str) -> CrossValidationResult:
+    """Validation croisée de l'entrée ``key`` (mémorisée par processus)"""
+    return cached_cross_validate(_X, _y, _estimators, n_splits, preprocessor=_preprocessor, version=_version)
+
+
+def get_cross_validation(X: np.ndarray, y: np.ndarray, preprocessor: ChurnPreprocessor = None,
+                         models_config: dict = None, n_splits: int = CV_FOLDS,
+                         version: str = None) -> CrossValidationResult:
+    """
+    Validation croisée des modèles de ``MODELS_CONFIG``.
+    
+    Les plis sont traités en parallèle, avec une standardisation ajustée
+    dans chaque pli ; les prédictions hors pli sont mémorisées par
+    processus et sur disque (clé : données et configuration des modèles).
+    
+    Parameters
+    ----------
+    X : np.ndarray
+        Features encodées (non standardisées) de tout le dataset
+    y : np.ndarray
+        Labels
+    preprocessor : ChurnPreprocessor, optional
+        Prétraitement (colonnes et modalités) ; son scaler n'est pas utilisé
+    models_config : dict, optional
+        Configuration des modèles (``MODELS_CONFIG`` par défaut)
+    n_splits : int
+        Nombre de plis
+    version : str, optional
+        Version des données (``data_version``) : identifie les données sans
+        hacher ``X`` à chaque rerun, comme pour ``train_models``
+    
+    Returns
+    -------
+    CrossValidationResult
+        Plis, prédictions hors pli et métriques
+    """
+    estimators = {name: build_estimator(config) for name, config in (models_config or MODELS_CONFIG).items()}
+    config = {'models': describe_estimators(estimators), 'n_splits': n_splits}
+    key = training_key(X, y, config=config, version=version)
+    return _cached_cross_validation(key, X, y, estimators, n_splits, preprocessor, version)
+
+
+def get_cross_validation_scores(models: dict, X: pd.DataFrame, y: pd.Series, scaler: StandardScaler, cv: int = CV_FOLDS) -> pd.DataFrame:
+    """
+    Calcule les scores de validation croisée (F1 par pli).
+    
+    Les modèles sont clonés et la standardisation est réajustée dans
+    chaque pli ; ``scaler`` ne sert qu'à encoder un DataFrame brut.
+    """
+    if isinstance(X, pd.DataFrame):
+        X = (scaler if isinstance(scaler, ChurnPreprocessor) else ChurnPreprocessor()).encode(X)
+    result = cached_cross_validate(X, np.asarray(y), models, cv)
     
-    return pd.DataFrame(cv_results)
+    f1 = result.scores().groupby('Modèle', sort=False)['F1-Score']
+    return pd.DataFrame({
+        'F1 Moyen': f1.mean(),
+        'Écart-type': f1.std(ddof=0),
+        'Min': f1.min(),
+        'Max': f1.max()
+    }).reset_index()
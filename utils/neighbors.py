@@ -0,0 +1,533 @@
+"""
+ChurnGuard - Voisins Approchés
+==============================
+Forêt de projections aléatoires pour les modèles KNN
+"""
+
+import time
+import weakref
+
+import pandas as pd
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.neighbors import NearestNeighbors
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import RANDOM_STATE
+from utils.registry import array_digest
+
+
+# Nombre de requêtes traitées ensemble (borne la mémoire des candidats)
+QUERY_BATCH_SIZE = 2048
+
+
+def query_batch_size(n_points: int, memory_budget: int) -> int:
+    """
+    Requêtes comparées ensemble à ``n_points`` points en force brute.
+    
+    Le lot est borné par ``QUERY_BATCH_SIZE`` et par ``memory_budget``
+    octets de distances float32 et d'indices int64 (``argpartition``).
+    """
+    return int(min(QUERY_BATCH_SIZE, max(1, memory_budget // (12 * max(1, n_points)))))
+
+
+def _build_tree(X: np.ndarray, leaf_size: int, rng: np.random.Generator) -> dict:
+    """
+    Construit un arbre de projections aléatoires, niveau par niveau.
+    
+    Les points de chaque nœud occupent un segment contigu d'une permutation
+    unique. À chaque niveau, tous les nœuds de plus de ``leaf_size`` points
+    sont coupés en même temps : la direction est la différence de deux
+    points tirés dans le nœud, le seuil la médiane des projections (arbre
+    équilibré). Aucune boucle Python par nœud ni par point.
+    """
+    n, d = X.shape
+    perm = np.arange(n)
+    
+    # Frontière courante : identifiant, début et taille du segment de chaque nœud
+    node_ids, node_starts, node_sizes = np.array([0]), np.array([0]), np.array([n])
+    n_nodes = 1
+    split_ids, split_w, split_thr = [], [], []
+    leaf_ids, leaf_starts, leaf_sizes = [], [], []
+    
+    while len(node_ids):
+        split = node_sizes > leaf_size
+        leaf_ids.append(node_ids[~split])
+        leaf_starts.append(node_starts[~split])
+        leaf_sizes.append(node_sizes[~split])
+        if not split.any():
+            break
+        
+        ids, starts, sizes = node_ids[split], node_starts[split], node_sizes[split]
+        offsets = np.cumsum(sizes) - sizes
+        local = np.repeat(np.arange(len(ids)), sizes)
+        positions = np.arange(sizes.sum()) - np.repeat(offsets, sizes) + np.repeat(starts, sizes)
+        points = perm[positions]
+        
+        # Direction : différence de deux points distincts de chaque nœud
+        first = rng.integers(0, sizes)
+        second = (first + 1 + rng.integers(0, sizes - 1)) % sizes
+        w = X[perm[starts + first]] - X[perm[starts + second]]
+        norms = np.linalg.norm(w, axis=1)
+        degenerate = norms == 0
+        if degenerate.any():
+            w[degenerate] = rng.standard_normal((degenerate.sum(), d))
+            norms[degenerate] = np.linalg.norm(w[degenerate], axis=1)
+        w = (w / norms[:, None]).astype(np.float32)
+        
+        # Tri par (nœud, projection) en une seule clé : chaque segment est
+        # réordonné sur place et sa médiane sépare les deux enfants
+        projections = np.einsum('ij,ij->i', X[points], w[local]).astype(np.float64)
+        low = projections.min()
+        key = local * (projections.max() - low + 1.0) + (projections - low)
+        order = np.argsort(key)
+        perm[positions] = points[order]
+        
+        sorted_projections = projections[order]
+        half = sizes // 2
+        split_ids.append(ids)
+        split_w.append(w)
+        split_thr.append((sorted_projections[offsets + half - 1] + sorted_projections[offsets + half]) / 2)
+        
+        left = n_nodes + 2 * np.arange(len(ids))
+        node_ids = np.concatenate([left, left + 1])
+        node_starts = np.concatenate([starts, starts + half])
+        node_sizes = np.concatenate([half, sizes - half])
+        n_nodes += 2 * len(ids)
+    
+    children = np.full((n_nodes, 2), -1, dtype=np.int64)
+    directions = np.zeros((n_nodes, d), dtype=np.float32)
+    thresholds = np.zeros(n_nodes, dtype=np.float32)
+    if split_ids:
+        ids = np.concatenate(split_ids)
+        # Les enfants d'un nœud coupé sont numérotés à la suite, dans l'ordre des coupes
+        children[ids, 0] = 1 + 2 * np.arange(len(ids))
+        children[ids, 1] = children[ids, 0] + 1
+        directions[ids] = np.concatenate(split_w)
+        thresholds[ids] = np.concatenate(split_thr)
+    
+    # Feuilles : tableau (n_feuilles, leaf_size) complété par -1
+    leaf_ids = np.concatenate(leaf_ids)
+    leaf_starts = np.concatenate(leaf_starts)
+    leaf_sizes = np.concatenate(leaf_sizes)
+    leaf_slot = np.full(n_nodes, -1, dtype=np.int64)
+    leaf_slot[leaf_ids] = np.arange(len(leaf_ids))
+    column = np.arange(leaf_sizes.max())
+    filled = column < leaf_sizes[:, None]
+    leaves = np.where(filled, perm[np.minimum(leaf_starts[:, None] + column, n - 1)], -1)
+    
+    return {
+        'directions': directions,
+        'thresholds': thresholds,
+        'children': children,
+        'leaf_slot': leaf_slot,
+        'leaves': leaves
+    }
+
+
+def _descend(tree: dict, Q: np.ndarray) -> np.ndarray:
+    """Feuille atteinte par chaque requête (descente vectorisée)"""
+    node = np.zeros(len(Q), dtype=np.int64)
+    while True:
+        internal = np.flatnonzero(tree['children'][node, 0] >= 0)
+        if len(internal) == 0:
+            break
+        current = node[internal]
+        projections = np.einsum('ij,ij->i', Q[internal], tree['directions'][current])
+        side = (projections > tree['thresholds'][current]).astype(np.int64)
+        node[internal] = tree['children'][current, side]
+    return tree['leaves'][tree['leaf_slot'][node]]
+
+
+class RandomProjectionForest:
+    """
+    Index de voisins approchés : forêt d'arbres de projections aléatoires.
+    
+    Chaque arbre partitionne l'espace par des hyperplans aléatoires jusqu'à
+    des feuilles d'au plus ``leaf_size`` points ; les candidats d'une
+    requête sont l'union des feuilles atteintes dans ``search_trees``
+    arbres, classés ensuite par distance exacte. ``search_trees`` règle le
+    compromis rappel / latence sans reconstruire l'index.
+    
+    Parameters
+    ----------
+    n_trees : int
+        Nombre d'arbres construits
+    leaf_size : int
+        Taille maximale d'une feuille
+    random_state : int, optional
+        Graine des directions aléatoires
+    """
+    
+    def __init__(self, n_trees: int = 10, leaf_size: int = 32, random_state: int = None):
+        self.n_trees = n_trees
+        self.leaf_size = leaf_size
+        self.random_state = random_state
+    
+    def fit(self, X: np.ndarray) -> 'RandomProjectionForest':
+        """Construit les arbres sur les points ``X``"""
+        self.data_ = np.ascontiguousarray(X, dtype=np.float32)
+        rng = np.random.default_rng(self.random_state)
+        self.trees_ = [_build_tree(self.data_, self.leaf_size, rng) for _ in range(self.n_trees)]
+        return self
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des arbres et des points indexés"""
+        return self.data_.nbytes + sum(values.nbytes for tree in self.trees_ for values in tree.values())
+    
+    def query(self, Q: np.ndarray, k: int, search_trees: int = None) -> tuple:
+        """
+        Plus proches voisins approchés.
+        
+        Parameters
+        ----------
+        Q : np.ndarray
+            Requêtes
+        k : int
+            Nombre de voisins
+        search_trees : int, optional
+            Arbres parcourus (tous par défaut) : plus d'arbres, meilleur
+            rappel mais requête plus lente
+        
+        Returns
+        -------
+        tuple
+            (distances, indices), de forme ``(len(Q), k)``, triés par distance ;
+            ``k`` est ramené au nombre de points indexés. Une requête dont
+            les feuilles parcourues comptent moins de ``k`` points distincts
+            est résolue par recherche exacte.
+        """
+        Q = np.ascontiguousarray(Q, dtype=np.float32)
+        k = min(k, len(self.data_))
+        trees = self.trees_[:search_trees or self.n_trees]
+        distances = np.empty((len(Q), k), dtype=np.float32)
+        indices = np.empty((len(Q), k), dtype=np.int64)
+        
+        for start in range(0, len(Q), QUERY_BATCH_SIZE):
+            batch = Q[start:start + QUERY_BATCH_SIZE]
+            rows = slice(start, start + len(batch))
+            candidates = np.sort(np.hstack([_descend(tree, batch) for tree in trees]), axis=1)
+            # Doublons (même point vu dans plusieurs arbres) et cases vides écartés
+            invalid = candidates < 0
+            invalid[:, 1:] |= candidates[:, 1:] == candidates[:, :-1]
+            short = (~invalid).sum(axis=1) < k
+            
+            if not short.all():
+                diff = self.data_[np.maximum(candidates, 0)] - batch[:, None, :]
+                d2 = np.einsum('ijk,ijk->ij', diff, diff)
+                d2[invalid] = np.inf
+                
+                top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+                top_d2 = np.take_along_axis(d2, top, axis=1)
+                order = np.argsort(top_d2, axis=1)
+                top = np.take_along_axis(top, order, axis=1)
+                
+                distances[rows] = np.sqrt(np.take_along_axis(top_d2, order, axis=1))
+                indices[rows] = np.take_along_axis(candidates, top, axis=1)
+            
+            if short.any():
+                # Pas assez de candidats : voisins exacts plutôt que des cases vides
+                exact = NearestNeighbors(n_neighbors=k, algorithm='brute').fit(self.data_)
+                fallback = start + np.flatnonzero(short)
+                distances[fallback], indices[fallback] = exact.kneighbors(batch[short])
+        
+        return distances, indices
+
+
+class ANNKNeighborsClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Classifieur KNN sur index de voisins approchés.
+    
+    Même vote uniforme que ``KNeighborsClassifier`` (distance euclidienne),
+    mais les voisins viennent d'une ``RandomProjectionForest`` : utilisable
+    tel quel dans ``MODELS_CONFIG``.
+    
+    Parameters
+    ----------
+    n_neighbors : int
+        Nombre de voisins
+    n_trees : int
+        Arbres de la forêt
+    leaf_size : int
+        Taille maximale d'une feuille (portée à ``2 * n_neighbors`` au moins)
+    search_trees : int, optional
+        Arbres parcourus par requête (compromis rappel / latence)
+    random_state : int, optional
+        Graine de la forêt
+    """
+    
+    def __init__(self, n_neighbors: int = 5, n_trees: int = 10, leaf_size: int = 32,
+                 search_trees: int = None, random_state: int = RANDOM_STATE):
+        self.n_neighbors = n_neighbors
+        self.n_trees = n_trees
+        self.leaf_size = leaf_size
+        self.search_trees = search_trees
+        self.random_state = random_state
+    
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'ANNKNeighborsClassifier':
+        """Indexe les points d'entraînement"""
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        self.n_features_in_ = np.shape(X)[1]
+        # Des feuilles d'au moins k points garantissent k candidats par arbre
+        leaf_size = max(self.leaf_size, 2 * self.n_neighbors)
+        self.index_ = RandomProjectionForest(self.n_trees, leaf_size, self.random_state).fit(X)
+        return self
+    
+    def kneighbors(self, X: np.ndarray, n_neighbors: int = None, return_distance: bool = True):
+        """Voisins approchés (même interface que ``KNeighborsClassifier``)"""
+        distances, indices = self.index_.query(X, n_neighbors or self.n_neighbors, self.search_trees)
+        return (distances, indices) if return_distance else indices
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Proportion de chaque classe parmi les voisins"""
+        neighbors = self.kneighbors(X, return_distance=False)
+        labels = self._y[neighbors]
+        return np.stack([(labels == c).mean(axis=1) for c in range(len(self.classes_))], axis=1)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe majoritaire parmi les voisins"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class MultiKNeighbors:
+    """
+    Évaluation d'un KNN pour plusieurs k à partir d'une seule recherche.
+    
+    Les voisins sont cherchés une fois pour le plus grand k ; les
+    effectifs (ou poids) cumulés de chaque classe le long des voisins
+    (triés par distance) donnent alors, pour tout k plus petit, le vote de
+    ``KNeighborsClassifier`` sans nouvelle recherche, uniforme ou pondéré
+    par l'inverse de la distance (``weights`` choisi à l'appel).
+    
+    Parameters
+    ----------
+    model : KNeighborsClassifier or ANNKNeighborsClassifier
+        KNN entraîné fournissant la recherche de voisins (son vote est ignoré)
+    k_values : list
+        Valeurs de k à évaluer
+    """
+    
+    def __init__(self, model, k_values: list):
+        self.model = model
+        self.k_values = sorted(set(int(k) for k in k_values))
+        self.classes_ = model.classes_
+        self._counts = None
+        self._weighted = None
+    
+    @property
+    def max_k(self) -> int:
+        """Plus grand k (taille de la recherche)"""
+        return self.k_values[-1]
+    
+    def query(self, X: np.ndarray) -> 'MultiKNeighbors':
+        """
+        Cherche les ``max_k`` voisins de ``X`` et cumule les votes.
+        
+        Returns
+        -------
+        MultiKNeighbors
+            L'évaluateur, prêt pour ``predict_proba(k)``
+        """
+        distances, indices = self.model.kneighbors(X, n_neighbors=self.max_k)
+        labels = self.model._y[indices]
+        n_classes = len(self.classes_)
+        
+        # counts[:, j, c] : voisins de classe c parmi les j + 1 plus proches
+        one_hot = labels[:, :, None] == np.arange(n_classes)
+        self._counts = np.cumsum(one_hot, axis=1, dtype=np.int32)
+        self._weighted = None
+        self.distances_ = distances
+        self.indices_ = indices
+        return self
+    
+    def _weighted_counts(self) -> np.ndarray:
+        """Poids cumulés par classe (inverse de la distance), calculés au premier appel"""
+        if self._weighted is None:
+            distances = np.asarray(self.distances_, dtype=np.float64)
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / distances
+            # Comme scikit-learn : un voisin à distance nulle emporte le vote.
+            # Les voisins étant triés, la règle vaut pour tout préfixe k.
+            exact = distances[:, 0] == 0
+            weights[exact] = distances[exact] == 0
+            
+            one_hot = self.model._y[self.indices_][:, :, None] == np.arange(len(self.classes_))
+            self._weighted = np.cumsum(one_hot * weights[:, :, None], axis=1)
+        return self._weighted
+    
+    def _votes(self, k: int, weights: str) -> np.ndarray:
+        """Votes cumulés des ``k`` premiers voisins"""
+        if self._counts is None:
+            raise ValueError("Appeler query avant predict_proba")
+        if not 1 <= k <= self.max_k:
+            raise ValueError(f"k doit être compris entre 1 et {self.max_k}")
+        if weights == 'uniform':
+            return self._counts[:, k - 1, :]
+        if weights == 'distance':
+            return self._weighted_counts()[:, k - 1, :]
+        raise ValueError(f"Pondération inconnue : {weights} (choix : uniform, distance)")
+    
+    def predict_proba(self, k: int, weights: str = 'uniform') -> np.ndarray:
+        """Probabilités de classe pour ``k`` voisins"""
+        votes = self._votes(k, weights)
+        return votes / votes.sum(axis=1, keepdims=True)
+    
+    def predict(self, k: int, weights: str = 'uniform') -> np.ndarray:
+        """Classe majoritaire parmi les ``k`` voisins"""
+        return self.classes_[np.argmax(self._votes(k, weights), axis=1)]
+    
+    def sweep(self, y_true: np.ndarray) -> pd.DataFrame:
+        """
+        Métriques de chaque k sur les requêtes de ``query``.
+        
+        Parameters
+        ----------
+        y_true : np.ndarray
+            Labels réels des requêtes
+        
+        Returns
+        -------
+        pd.DataFrame
+            k, Accuracy, Precision, Recall, F1-Score et AUC
+        """
+        from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+        
+        rows = []
+        for k in self.k_values:
+            y_pred = self.predict(k)
+            rows.append({
+                'k': k,
+                'Accuracy': accuracy_score(y_true, y_pred),
+                'Precision': precision_score(y_true, y_pred, zero_division=0),
+                'Recall': recall_score(y_true, y_pred),
+                'F1-Score': f1_score(y_true, y_pred),
+                'AUC': roc_auc_score(y_true, self.predict_proba(k)[:, 1])
+            })
+        return pd.DataFrame(rows)
+
+
+def _fit_matrix(model) -> np.ndarray:
+    """Matrice d'entraînement dans laquelle un KNN cherche ses voisins"""
+    if hasattr(model, 'index_'):
+        return model.index_.data_
+    return model._fit_X
+
+
+# Empreinte des données d'entraînement de chaque KNN (libérée avec le modèle)
+_FIT_DIGESTS = weakref.WeakKeyDictionary()
+
+
+def _fit_digest(model) -> str:
+    """Empreinte des points et labels indexés, recalculée seulement après un nouveau ``fit``"""
+    X, y = _fit_matrix(model), model._y
+    cached = _FIT_DIGESTS.get(model)
+    if cached is not None and cached[0] is X and cached[1] is y:
+        return cached[2]
+    digest = array_digest(X, y)
+    _FIT_DIGESTS[model] = (X, y, digest)
+    return digest
+
+
+def _same_neighbors(a, b) -> bool:
+    """Vrai si deux KNN (vote uniforme) ne diffèrent que par k"""
+    if type(a) is not type(b) or getattr(a, 'weights', 'uniform') != 'uniform':
+        return False
+    # La forêt d'un KNN approché dépend de sa taille de feuille effective
+    # (portée à 2k à l'entraînement), pas du paramètre leaf_size
+    ignored = {'n_neighbors', 'leaf_size'} if hasattr(a, 'index_') else {'n_neighbors'}
+    params_a, params_b = a.get_params(), b.get_params()
+    if any(params_a[p] != params_b[p] for p in params_a if p not in ignored):
+        return False
+    if hasattr(a, 'index_') and a.index_.leaf_size != b.index_.leaf_size:
+        return False
+    
+    X_a, X_b = _fit_matrix(a), _fit_matrix(b)
+    if X_a is X_b and a._y is b._y:
+        return True
+    return X_a.shape == X_b.shape and _fit_digest(a) == _fit_digest(b)
+
+
+def knn_groups(models: dict) -> list:
+    """
+    Regroupe les KNN qui ne diffèrent que par k (même index de voisins).
+    
+    Returns
+    -------
+    list
+        Listes de noms de modèles ; chaque groupe peut partager une recherche
+    """
+    groups = []
+    for name, model in models.items():
+        if not hasattr(model, 'kneighbors'):
+            continue
+        for group in groups:
+            if _same_neighbors(models[group[0]], model):
+                group.append(name)
+                break
+        else:
+            groups.append([name])
+    return groups
+
+
+def ann_report(X_train: np.ndarray, X_query: np.ndarray, n_neighbors: int = 11,
+               search_trees: list = None, n_trees: int = 16, leaf_size: int = 32) -> pd.DataFrame:
+    """
+    Compare la recherche approchée à la recherche exacte.
+    
+    Parameters
+    ----------
+    X_train : np.ndarray
+        Points indexés (features standardisées)
+    X_query : np.ndarray
+        Requêtes
+    n_neighbors : int
+        k du rappel@k
+    search_trees : list, optional
+        Valeurs du réglage rappel / latence à évaluer
+    n_trees : int
+        Arbres de la forêt
+    leaf_size : int
+        Taille maximale d'une feuille
+    
+    Returns
+    -------
+    pd.DataFrame
+        Par réglage : rappel@k, latence par requête et accélération
+        par rapport à la recherche exacte
+    """
+    search_trees = search_trees or [1, 2, 4, 8, n_trees]
+    
+    exact = NearestNeighbors(n_neighbors=n_neighbors).fit(X_train)
+    start = time.perf_counter()
+    exact_indices = exact.kneighbors(X_query, return_distance=False)
+    exact_seconds = time.perf_counter() - start
+    
+    forest = RandomProjectionForest(n_trees, max(leaf_size, 2 * n_neighbors), RANDOM_STATE).fit(X_train)
+    
+    rows = [{
+        'Méthode': 'Exacte (scikit-learn)',
+        'Arbres parcourus': None,
+        f'Rappel@{n_neighbors}': 1.0,
+        'Latence (ms/requête)': exact_seconds / len(X_query) * 1000,
+        'Accélération': 1.0
+    }]
+    for trees in search_trees:
+        start = time.perf_counter()
+        _, indices = forest.query(X_query, n_neighbors, trees)
+        seconds = time.perf_counter() - start
+        
+        # Rappel : part des vrais k voisins retrouvés
+        hits = (indices[:, :, None] == exact_indices[:, None, :]).any(axis=2).sum()
+        rows.append({
+            'Méthode': 'Forêt de projections',
+            'Arbres parcourus': trees,
+            f'Rappel@{n_neighbors}': hits / exact_indices.size,
+            'Latence (ms/requête)': seconds / len(X_query) * 1000,
+            'Accélération': exact_seconds / seconds if seconds > 0 else np.inf
+        })
+    
+    return pd.DataFrame(rows)
@@ -0,0 +1,430 @@
+"""
+ChurnGuard - Apprentissage Incrémental
+======================================
+Mise à jour des modèles par lots de clients (partial_fit, index KNN
+incrémental) avec réentraînement complet périodique
+"""
+
+import os
+import time
+
+import pandas as pd
+import numpy as np
+import joblib
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import SGDClassifier
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import (
+    ONLINE_SGD_PARAMS, ONLINE_N_NEIGHBORS, ONLINE_REBUILD_FRACTION, ONLINE_REFIT_EVERY,
+    ONLINE_KNN_MEMORY, INGEST_CHUNK_SIZE
+)
+from utils.preprocessing import ChurnPreprocessor
+from utils.neighbors import query_batch_size
+
+
+class GrowableArray:
+    """
+    Tableau extensible par lignes : la capacité double quand elle est
+    atteinte, l'ajout d'un lot coûte donc O(lot) en amorti.
+    
+    Parameters
+    ----------
+    shape : tuple
+        Forme d'une ligne (``()`` pour un vecteur)
+    dtype : type
+        Type des valeurs
+    """
+    
+    def __init__(self, shape: tuple = (), dtype=np.float32, capacity: int = 1024):
+        self._data = np.empty((capacity, *shape), dtype=dtype)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def values(self) -> np.ndarray:
+        """Vue sur les lignes remplies (sans copie)"""
+        return self._data[:self._size]
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire réservée (octets)"""
+        return self._data.nbytes
+    
+    def append(self, rows: np.ndarray):
+        """Ajoute des lignes en fin de tableau"""
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        end = self._size + len(rows)
+        if end > len(self._data):
+            grown = np.empty((max(end, 2 * len(self._data)), *self._data.shape[1:]), dtype=self._data.dtype)
+            grown[:self._size] = self.values
+            self._data = grown
+        self._data[self._size:end] = rows
+        self._size = end
+
+
+class IncrementalKNN(ClassifierMixin, BaseEstimator):
+    """
+    Classifieur KNN auquel on ajoute des points sans reconstruire l'index.
+    
+    Les points indexés au dernier ``fit`` (ou à la dernière fusion) sont
+    cherchés dans un arbre scikit-learn ; les points ajoutés depuis par
+    ``partial_fit`` forment un tampon parcouru en force brute. Les deux
+    listes de candidats sont fusionnées par distance : le résultat est
+    celui d'un KNN exact sur tous les points. Le tampon est fusionné dans
+    l'arbre dès qu'il dépasse ``rebuild_fraction`` de l'index.
+    
+    Parameters
+    ----------
+    n_neighbors : int
+        Nombre de voisins
+    rebuild_fraction : float
+        Taille relative du tampon déclenchant la reconstruction de l'arbre
+    memory_budget : int
+        Mémoire des distances d'un lot de requêtes au tampon (octets)
+    """
+    
+    def __init__(self, n_neighbors: int = 5, rebuild_fraction: float = ONLINE_REBUILD_FRACTION,
+                 memory_budget: int = ONLINE_KNN_MEMORY):
+        self.n_neighbors = n_neighbors
+        self.rebuild_fraction = rebuild_fraction
+        self.memory_budget = memory_budget
+    
+    @property
+    def _fit_X(self) -> np.ndarray:
+        """Tous les points (indexés puis en tampon)"""
+        return self._points.values
+    
+    @property
+    def _y(self) -> np.ndarray:
+        """Codes de classe de tous les points"""
+        return self._labels.values
+    
+    @property
+    def n_buffered(self) -> int:
+        """Points ajoutés depuis la dernière reconstruction de l'arbre"""
+        return len(self._points) - self.n_indexed_
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des points, labels et de l'arbre"""
+        tree = self.tree_._tree
+        arrays = tree.get_arrays() if hasattr(tree, 'get_arrays') else ()
+        return self._points.nbytes + self._labels.nbytes + sum(a.nbytes for a in arrays if isinstance(a, np.ndarray))
+    
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'IncrementalKNN':
+        """Indexe les points d'entraînement"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        self.n_features_in_ = X.shape[1]
+        self._points = GrowableArray((X.shape[1],), np.float32, capacity=max(len(X), 1024))
+        self._labels = GrowableArray((), np.int8 if len(self.classes_) < 128 else np.int64, capacity=max(len(X), 1024))
+        self._points.append(X)
+        self._labels.append(codes)
+        self._rebuild()
+        return self
+    
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> 'IncrementalKNN':
+        """Ajoute des points étiquetés (classes déjà connues)"""
+        y = np.asarray(y)
+        codes = np.searchsorted(self.classes_, y)
+        if (codes >= len(self.classes_)).any() or (self.classes_[np.minimum(codes, len(self.classes_) - 1)] != y).any():
+            raise ValueError(f"Classe(s) inconnue(s) : {sorted(set(y.tolist()) - set(self.classes_.tolist()))}")
+        
+        self._points.append(X)
+        self._labels.append(codes)
+        if self.n_buffered > self.rebuild_fraction * self.n_indexed_:
+            self._rebuild()
+        return self
+    
+    def _rebuild(self):
+        """Reconstruit l'arbre sur tous les points (tampon vidé)"""
+        self.tree_ = NearestNeighbors(n_neighbors=self.n_neighbors).fit(self._fit_X)
+        self.n_indexed_ = len(self._points)
+    
+    def kneighbors(self, X: np.ndarray, n_neighbors: int = None, return_distance: bool = True):
+        """
+        Voisins exacts parmi tous les points (même interface que ``KNeighborsClassifier``).
+        
+        ``k`` est ramené au nombre de points s'il le dépasse.
+        """
+        k = min(n_neighbors or self.n_neighbors, len(self._points))
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        distances, indices = self.tree_.kneighbors(X, min(k, self.n_indexed_))
+        
+        buffered = self._fit_X[self.n_indexed_:]
+        if len(buffered):
+            distances, indices = self._merge_buffer(X, buffered, distances, indices, k)
+        return (distances, indices) if return_distance else indices
+    
+    def _merge_buffer(self, X: np.ndarray, buffered: np.ndarray, distances: np.ndarray,
+                      indices: np.ndarray, k: int) -> tuple:
+        """
+        Fusionne les voisins de l'arbre avec ceux du tampon (force brute).
+        
+        Les requêtes sont traitées par lots dont la matrice de distances au
+        tampon tient dans ``memory_budget`` octets.
+        """
+        k_buffer = min(k, len(buffered))
+        buffered_norms = np.einsum('ij,ij->i', buffered, buffered)
+        merged_distances = np.empty((len(X), k), dtype=np.float64)
+        merged_indices = np.empty((len(X), k), dtype=np.int64)
+        batch_size = query_batch_size(len(buffered), self.memory_budget)
+        
+        for start in range(0, len(X), batch_size):
+            batch = X[start:start + batch_size]
+            d2 = batch @ buffered.T
+            d2 *= -2
+            d2 += buffered_norms
+            d2 += np.einsum('ij,ij->i', batch, batch)[:, None]
+            top = np.argpartition(d2, k_buffer - 1, axis=1)[:, :k_buffer]
+            buffer_distances = np.sqrt(np.maximum(np.take_along_axis(d2, top, axis=1), 0))
+            
+            candidate_distances = np.hstack([distances[start:start + len(batch)], buffer_distances])
+            candidate_indices = np.hstack([indices[start:start + len(batch)], top + self.n_indexed_])
+            order = np.argsort(candidate_distances, axis=1, kind='stable')[:, :k]
+            merged_distances[start:start + len(batch)] = np.take_along_axis(candidate_distances, order, axis=1)
+            merged_indices[start:start + len(batch)] = np.take_along_axis(candidate_indices, order, axis=1)
+        
+        return merged_distances, merged_indices
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Proportion de chaque classe parmi les voisins"""
+        neighbors = self.kneighbors(X, return_distance=False)
+        labels = self._y[neighbors]
+        return np.stack([(labels == c).mean(axis=1) for c in range(len(self.classes_))], axis=1)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe majoritaire parmi les voisins"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class OnlineChurnModel:
+    """
+    Modèles de churn mis à jour par lots de clients étiquetés.
+    
+    Chaque lot met à jour, en O(lot) : les moyennes et variances courantes
+    des features, la régression logistique (``SGDClassifier.partial_fit``)
+    et l'index KNN (points ajoutés au tampon). La standardisation appliquée
+    reste celle du dernier réentraînement complet, pour que les points
+    déjà indexés et les nouveaux soient dans le même repère ; tous les
+    ``refit_every`` lots, elle adopte les statistiques courantes (sans
+    relire les données) et les deux modèles sont réentraînés sur tous les
+    points.
+    
+    Parameters
+    ----------
+    n_neighbors : int
+        Voisins du KNN
+    refit_every : int
+        Lots entre deux réentraînements complets (0 = jamais)
+    rebuild_fraction : float
+        Taille relative du tampon KNN déclenchant la fusion dans l'arbre
+    sgd_params : dict, optional
+        Paramètres du ``SGDClassifier`` (``ONLINE_SGD_PARAMS`` par défaut)
+    preprocessor : ChurnPreprocessor, optional
+        Prétraitement (colonnes et modalités) ; sa standardisation est
+        gérée par le modèle
+    """
+    
+    def __init__(self, n_neighbors: int = ONLINE_N_NEIGHBORS, refit_every: int = ONLINE_REFIT_EVERY,
+                 rebuild_fraction: float = ONLINE_REBUILD_FRACTION, sgd_params: dict = None,
+                 preprocessor: ChurnPreprocessor = None):
+        self.n_neighbors = n_neighbors
+        self.refit_every = refit_every
+        self.rebuild_fraction = rebuild_fraction
+        self.sgd_params = dict(sgd_params or ONLINE_SGD_PARAMS)
+        self.preprocessor = preprocessor or ChurnPreprocessor()
+        self.running_scaler = None
+        self.history = []
+    
+    @property
+    def is_fitted(self) -> bool:
+        """Vrai après ``fit`` (ou un premier lot)"""
+        return self.running_scaler is not None
+    
+    @property
+    def models(self) -> dict:
+        """Modèles au format de ``train_models`` (entrées : ``preprocessor.transform``)"""
+        return {
+            'Régression Logistique (SGD)': self.sgd_,
+            f'KNN (k={self.n_neighbors})': self.knn_
+        }
+    
+    @property
+    def n_samples(self) -> int:
+        """Clients vus depuis le début"""
+        return int(self.running_scaler.n_samples_seen_) if self.is_fitted else 0
+    
+    def _encode(self, X) -> np.ndarray:
+        """Matrice encodée (DataFrame brut ou matrice déjà encodée)"""
+        if isinstance(X, pd.DataFrame):
+            return self.preprocessor.encode(X)
+        return np.ascontiguousarray(X, dtype=np.float32)
+    
+    def fit(self, X, y: np.ndarray) -> 'OnlineChurnModel':
+        """
+        Entraînement complet initial.
+        
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Clients (DataFrame brut ou matrice encodée)
+        y : np.ndarray
+            Labels
+        """
+        X = self._encode(X)
+        y = np.asarray(y)
+        self.running_scaler = StandardScaler().partial_fit(X)
+        self._train(self.preprocessor.set_scaler(self.running_scaler).scale(X), y)
+        return self
+    
+    def _train(self, X_scaled: np.ndarray, y: np.ndarray):
+        """Entraîne les deux modèles sur une matrice standardisée"""
+        self.sgd_ = SGDClassifier(**self.sgd_params).fit(X_scaled, y)
+        self.knn_ = IncrementalKNN(self.n_neighbors, self.rebuild_fraction).fit(X_scaled, y)
+        self.batches_since_refit = 0
+    
+    def partial_fit(self, X, y: np.ndarray) -> dict:
+        """
+        Intègre un lot de clients étiquetés.
+        
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Nouveaux clients (DataFrame brut ou matrice encodée)
+        y : np.ndarray
+            Labels du lot
+        
+        Returns
+        -------
+        dict
+            Lignes du lot, durée de la mise à jour, réentraînement complet
+            déclenché ou non, clients vus au total
+        """
+        if not self.is_fitted:
+            start = time.perf_counter()
+            self.fit(X, y)
+            return self._log(len(y), time.perf_counter() - start, True)
+        
+        start = time.perf_counter()
+        self._update(X, y)
+        refit = self._end_batch()
+        return self._log(len(y), time.perf_counter() - start, refit)
+    
+    def partial_fit_file(self, path: str, chunksize: int = INGEST_CHUNK_SIZE, errors: str = 'raise') -> dict:
+        """
+        Intègre un fichier quotidien de clients étiquetés (CSV ou Parquet).
+        
+        Le fichier est lu et validé par blocs (``read_customer_file``) : la
+        mémoire reste bornée par un bloc et le fichier compte pour un lot
+        (``refit_every``).
+        
+        Parameters
+        ----------
+        path : str
+            Fichier ``.csv`` ou ``.parquet`` (colonne ``churn`` obligatoire)
+        chunksize : int
+            Lignes par bloc
+        errors : str
+            ``'raise'`` ou ``'drop'`` (lignes invalides écartées)
+        
+        Returns
+        -------
+        dict
+            Comme ``partial_fit``, plus les lignes rejetées
+        """
+        # Import différé : data_loader importe utils
+        from data_loader import read_customer_file
+        
+        start = time.perf_counter()
+        stats = {}
+        initial = not self.is_fitted
+        for chunk in read_customer_file(path, chunksize, errors, stats):
+            if not len(chunk):
+                continue
+            if self.is_fitted:
+                self._update(chunk, chunk['churn'].to_numpy())
+            else:
+                self.fit(chunk, chunk['churn'].to_numpy())
+        if not self.is_fitted:
+            raise ValueError(f"Aucun client valide dans {path}")
+        
+        refit = initial or self._end_batch()
+        entry = self._log(stats['rows'], time.perf_counter() - start, refit)
+        return {**entry, 'rejected_rows': stats['rejected_rows']}
+    
+    def _update(self, X, y: np.ndarray):
+        """Met à jour la standardisation courante et les deux modèles"""
+        X = self._encode(X)
+        y = np.asarray(y)
+        self.running_scaler.partial_fit(X)
+        X_scaled = self.preprocessor.scale(X)
+        self.sgd_.partial_fit(X_scaled, y)
+        self.knn_.partial_fit(X_scaled, y)
+    
+    def _end_batch(self) -> bool:
+        """Clôt un lot ; réentraînement complet tous les ``refit_every`` lots"""
+        self.batches_since_refit += 1
+        refit = bool(self.refit_every) and self.batches_since_refit >= self.refit_every
+        if refit:
+            self.refit()
+        return refit
+    
+    def refit(self) -> 'OnlineChurnModel':
+        """
+        Réentraînement complet sur tous les clients vus.
+        
+        Les points de l'index, standardisés avec l'ancienne transformation,
+        sont ramenés dans le repère des statistiques courantes (transformation
+        affine, sans relecture des données) avant d'entraîner les modèles.
+        """
+        old_mean, old_scale = self.preprocessor._mean, self.preprocessor._scale
+        X = self.knn_._fit_X * old_scale + old_mean
+        y = self.knn_.classes_[self.knn_._y]
+        self._train(self.preprocessor.set_scaler(self.running_scaler).scale(X, copy=False), y)
+        return self
+    
+    def _log(self, rows: int, seconds: float, refit: bool) -> dict:
+        """Ajoute une entrée à l'historique des lots"""
+        entry = {'rows': rows, 'seconds': seconds, 'refit': refit, 'n_samples': self.n_samples}
+        self.history.append(entry)
+        return entry
+    
+    def history_report(self) -> pd.DataFrame:
+        """
+        Historique des mises à jour.
+        
+        Returns
+        -------
+        pd.DataFrame
+            Lot, lignes, durée (s), réentraînement complet, clients vus
+        """
+        return pd.DataFrame([
+            {'Lot': i, 'Lignes': e['rows'], 'Durée (s)': e['seconds'],
+             'Réentraînement complet': e['refit'], 'Clients vus': e['n_samples']}
+            for i, e in enumerate(self.history)
+        ], columns=['Lot', 'Lignes', 'Durée (s)', 'Réentraînement complet', 'Clients vus'])
+    
+    def save(self, path: str) -> str:
+        """Sérialise le modèle (joblib, remplacement atomique)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> 'OnlineChurnModel':
+        """Recharge un modèle sérialisé par ``save``"""
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise ValueError(f"{path} ne contient pas un OnlineChurnModel")
+        return model
@@ -0,0 +1,404 @@
+"""
+ChurnGuard - Entraînement Hors Mémoire
+======================================
+Features float32 projetées depuis le disque, standardisation et modèles
+entraînés par blocs, mémoire de pointe mesurée
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import (
+    OUT_OF_CORE_DIR, OUT_OF_CORE_BLOCK_SIZE, OUT_OF_CORE_EPOCHS, OUT_OF_CORE_KNN_MEMORY,
+    OUT_OF_CORE_SGD_PARAMS, ONLINE_N_NEIGHBORS, RANDOM_STATE
+)
+from utils.preprocessing import ChurnPreprocessor
+from utils.neighbors import query_batch_size
+
+
+def current_rss() -> int:
+    """Mémoire résidente actuelle du processus (octets ; None si inconnue)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PeakMemory:
+    """
+    Mesure la mémoire résidente de pointe d'un bloc ``with``.
+    
+    La mémoire résidente est échantillonnée par un thread (Linux) ; à
+    défaut, le maximum du processus (``ru_maxrss``) est utilisé.
+    """
+    
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss() or 0)
+    
+    def __enter__(self) -> 'PeakMemory':
+        self.baseline = current_rss()
+        if self.baseline is not None:
+            self.peak = self.baseline
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, current_rss() or 0)
+        elif resource is not None:
+            # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+            scale = 1 if sys.platform == 'darwin' else 1024
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        return False
+
+
+class FeatureFile:
+    """
+    Matrice de features encodées sur disque (float32), projetée en mémoire.
+    
+    Le répertoire contient ``X.f32`` (lignes contiguës), ``y.i1`` (labels)
+    et ``manifest.json`` (forme et colonnes). Les lectures passent par
+    ``np.memmap`` : seules les pages utilisées sont chargées.
+    
+    Parameters
+    ----------
+    path : str
+        Répertoire écrit par ``FeatureFile.create``
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+    
+    @property
+    def n_rows(self) -> int:
+        """Nombre de clients"""
+        return self.manifest['n_rows']
+    
+    @property
+    def columns(self) -> list:
+        """Colonnes de la matrice (ordre de ``FEATURE_COLUMNS``)"""
+        return self.manifest['columns']
+    
+    @property
+    def nbytes(self) -> int:
+        """Taille des fichiers de la matrice et des labels (octets)"""
+        return sum(os.path.getsize(os.path.join(self.path, name)) for name in ('X.f32', 'y.i1'))
+    
+    def matrix(self, name: str = 'X.f32') -> np.memmap:
+        """Matrice projetée en lecture seule"""
+        return np.memmap(os.path.join(self.path, name), dtype=np.float32, mode='r',
+                         shape=(self.n_rows, len(self.columns)))
+    
+    @property
+    def X(self) -> np.memmap:
+        """Features encodées (non standardisées)"""
+        return self.matrix('X.f32')
+    
+    @property
+    def y(self) -> np.memmap:
+        """Labels"""
+        return np.memmap(os.path.join(self.path, 'y.i1'), dtype=np.int8, mode='r', shape=(self.n_rows,))
+    
+    def blocks(self, block_size: int = OUT_OF_CORE_BLOCK_SIZE, name: str = 'X.f32'):
+        """Parcourt la matrice par blocs : ``(début, X_bloc, y_bloc)``"""
+        X, y = self.matrix(name), self.y
+        for start in range(0, self.n_rows, block_size):
+            yield start, X[start:start + block_size], y[start:start + block_size]
+    
+    @classmethod
+    def create(cls, path: str, chunks, preprocessor: ChurnPreprocessor = None,
+               label: str = 'churn') -> 'FeatureFile':
+        """
+        Encode des blocs de clients et les écrit à la suite sur disque.
+        
+        Parameters
+        ----------
+        path : str
+            Répertoire cible (remplacé atomiquement s'il existe)
+        chunks : iterable of pd.DataFrame
+            Blocs de clients (``read_customer_file``, ``iter_churn_chunks``...)
+        preprocessor : ChurnPreprocessor, optional
+            Encodage (colonnes et modalités)
+        label : str
+            Colonne cible
+        
+        Returns
+        -------
+        FeatureFile
+            Matrice écrite ; la mémoire reste bornée par un bloc
+        """
+        preprocessor = preprocessor or ChurnPreprocessor()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp_')
+        
+        try:
+            n_rows = 0
+            with open(os.path.join(tmp_dir, 'X.f32'), 'wb') as fx, open(os.path.join(tmp_dir, 'y.i1'), 'wb') as fy:
+                for chunk in chunks:
+                    fx.write(preprocessor.encode(chunk).tobytes())
+                    fy.write(np.ascontiguousarray(chunk[label].to_numpy(), dtype=np.int8).tobytes())
+                    n_rows += len(chunk)
+            
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({'n_rows': n_rows, 'columns': preprocessor.feature_columns}, f, ensure_ascii=False)
+            
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp_dir, path)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        return cls(path)
+    
+    def write_scaled(self, preprocessor: ChurnPreprocessor, block_size: int = OUT_OF_CORE_BLOCK_SIZE,
+                     name: str = 'X_scaled.f32') -> np.memmap:
+        """Écrit la matrice standardisée par blocs ; renvoie sa projection"""
+        tmp_path = os.path.join(self.path, f".{name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            for _, X_block, _ in self.blocks(block_size):
+                f.write(preprocessor.scale(X_block).tobytes())
+        os.replace(tmp_path, os.path.join(self.path, name))
+        return self.matrix(name)
+
+
+class ChunkedKNN(ClassifierMixin, BaseEstimator):
+    """
+    Classifieur KNN exact sur une matrice projetée depuis le disque.
+    
+    L'index n'est pas construit en mémoire : chaque ``kneighbors`` lit
+    les points par blocs de ``block_size`` lignes (un seul parcours du
+    fichier pour toutes les requêtes) et fusionne au fil de l'eau les k
+    meilleurs candidats de chaque requête. Seuls les labels (1 octet par
+    point) restent en mémoire ; sérialisé, le modèle référence le fichier.
+    Les requêtes sont comparées à un bloc par lots dont la matrice de
+    distances tient dans ``memory_budget`` octets.
+    
+    Parameters
+    ----------
+    n_neighbors : int
+        Nombre de voisins
+    block_size : int
+        Points lus par bloc
+    memory_budget : int
+        Mémoire des distances d'un lot de requêtes (octets)
+    """
+    
+    def __init__(self, n_neighbors: int = 5, block_size: int = OUT_OF_CORE_BLOCK_SIZE,
+                 memory_budget: int = OUT_OF_CORE_KNN_MEMORY):
+        self.n_neighbors = n_neighbors
+        self.block_size = block_size
+        self.memory_budget = memory_budget
+    
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'ChunkedKNN':
+        """Référence les points (memmap conseillé) et encode les labels"""
+        self._fit_X = X
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        self._y = codes.astype(np.int8 if len(self.classes_) < 128 else np.int64)
+        self.n_features_in_ = X.shape[1]
+        return self
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire propre au modèle (labels ; les points restent sur disque)"""
+        return self._y.nbytes
+    
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        X = state.get('_fit_X')
+        if isinstance(X, np.memmap):
+            state['_fit_X'] = ('memmap', X.filename, X.dtype.str, X.shape, X.offset)
+        return state
+    
+    def __setstate__(self, state: dict):
+        X = state.get('_fit_X')
+        if isinstance(X, tuple) and X and X[0] == 'memmap':
+            _, filename, dtype, shape, offset = X
+            state['_fit_X'] = np.memmap(filename, dtype=dtype, mode='r', shape=shape, offset=offset)
+        self.__dict__.update(state)
+    
+    def kneighbors(self, X: np.ndarray, n_neighbors: int = None, return_distance: bool = True):
+        """Voisins exacts (même interface que ``KNeighborsClassifier``, k ramené au nombre de points)"""
+        k = min(n_neighbors or self.n_neighbors, len(self._fit_X))
+        query_batch = query_batch_size(min(self.block_size, len(self._fit_X)), self.memory_budget)
+        Q = np.ascontiguousarray(X, dtype=np.float32)
+        query_norms = np.einsum('ij,ij->i', Q, Q)
+        best_d2 = np.full((len(Q), k), np.inf)
+        best_indices = np.zeros((len(Q), k), dtype=np.int64)
+        
+        for block_start in range(0, len(self._fit_X), self.block_size):
+            block = np.asarray(self._fit_X[block_start:block_start + self.block_size], dtype=np.float32)
+            block_norms = np.einsum('ij,ij->i', block, block)
+            k_block = min(k, len(block))
+            
+            for start in range(0, len(Q), query_batch):
+                rows = slice(start, start + query_batch)
+                # Une seule matrice de distances, complétée sur place
+                d2 = Q[rows] @ block.T
+                d2 *= -2
+                d2 += block_norms
+                d2 += query_norms[rows, None]
+                top = np.argpartition(d2, k_block - 1, axis=1)[:, :k_block]
+                
+                candidate_d2 = np.hstack([best_d2[rows], np.take_along_axis(d2, top, axis=1)])
+                candidate_indices = np.hstack([best_indices[rows], top + block_start])
+                order = np.argsort(candidate_d2, axis=1, kind='stable')[:, :k]
+                best_d2[rows] = np.take_along_axis(candidate_d2, order, axis=1)
+                best_indices[rows] = np.take_along_axis(candidate_indices, order, axis=1)
+        
+        if not return_distance:
+            return best_indices
+        return np.sqrt(np.maximum(best_d2, 0)), best_indices
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Proportion de chaque classe parmi les voisins"""
+        neighbors = self.kneighbors(X, return_distance=False)
+        labels = self._y[neighbors]
+        return np.stack([(labels == c).mean(axis=1) for c in range(len(self.classes_))], axis=1)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe majoritaire parmi les voisins"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def train_out_of_core(chunks, path: str = None, preprocessor: ChurnPreprocessor = None,
+                      n_neighbors: int = ONLINE_N_NEIGHBORS, epochs: int = OUT_OF_CORE_EPOCHS,
+                      block_size: int = OUT_OF_CORE_BLOCK_SIZE, sgd_params: dict = None,
+                      random_state: int = RANDOM_STATE) -> tuple:
+    """
+    Entraîne les modèles sans charger le dataset en mémoire.
+    
+    Étapes, chacune en un parcours par blocs : écriture des features
+    encodées (float32) sur disque, moyennes et variances
+    (``StandardScaler.partial_fit``), écriture de la matrice standardisée,
+    régression logistique par ``SGDClassifier.partial_fit`` moyenné (``epochs``
+    passes, blocs et lignes mélangés), puis KNN exact lisant la matrice
+    standardisée par blocs.
+    
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        Blocs de clients étiquetés (``read_customer_file``, ``iter_churn_chunks``...)
+    path : str, optional
+        Répertoire des matrices (``OUT_OF_CORE_DIR`` par défaut) ; il doit
+        être conservé tant que le KNN est utilisé
+    preprocessor : ChurnPreprocessor, optional
+        Encodage ; sa standardisation est ajustée ici
+    n_neighbors : int
+        Voisins du KNN
+    epochs : int
+        Passes de descente de gradient
+    block_size : int
+        Lignes lues par bloc (borne la mémoire)
+    sgd_params : dict, optional
+        Paramètres du ``SGDClassifier`` (``OUT_OF_CORE_SGD_PARAMS`` par défaut)
+    random_state : int
+        Graine du mélange des blocs
+    
+    Returns
+    -------
+    tuple
+        (models, preprocessor, report) ; ``report`` donne les lignes, la
+        taille des fichiers, la durée de chaque étape et la mémoire
+        résidente de pointe
+    """
+    path = path or OUT_OF_CORE_DIR
+    preprocessor = preprocessor or ChurnPreprocessor()
+    rng = np.random.default_rng(random_state)
+    stages = {}
+    
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        features = FeatureFile.create(path, chunks, preprocessor)
+        stages['features'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        scaler = StandardScaler()
+        for _, X_block, _ in features.blocks(block_size):
+            scaler.partial_fit(X_block)
+        preprocessor.set_scaler(scaler)
+        X_scaled = features.write_scaled(preprocessor, block_size)
+        stages['scaler'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        sgd = SGDClassifier(**(sgd_params or OUT_OF_CORE_SGD_PARAMS))
+        classes = np.unique(features.y)
+        starts = np.arange(0, features.n_rows, block_size)
+        for _ in range(epochs):
+            for block_start in rng.permutation(starts):
+                X_block = np.asarray(X_scaled[block_start:block_start + block_size])
+                y_block = np.asarray(features.y[block_start:block_start + block_size])
+                order = rng.permutation(len(y_block))
+                sgd.partial_fit(X_block[order], y_block[order], classes=classes)
+        stages['sgd'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        knn = ChunkedKNN(n_neighbors, block_size).fit(X_scaled, features.y)
+        stages['knn'] = time.perf_counter() - start
+    
+    models = {
+        'Régression Logistique (SGD)': sgd,
+        f'KNN (k={n_neighbors})': knn
+    }
+    report = {
+        'rows': features.n_rows,
+        'feature_bytes': features.nbytes,
+        'stages': stages,
+        'baseline_rss_bytes': memory.baseline,
+        'peak_rss_bytes': memory.peak
+    }
+    return models, preprocessor, report
+
+
+def out_of_core_report(report: dict) -> pd.DataFrame:
+    """
+    Tableau d'un rapport de ``train_out_of_core``.
+    
+    Returns
+    -------
+    pd.DataFrame
+        Étape et durée (s), suivies des lignes, octets sur disque et
+        mémoire résidente (initiale et de pointe)
+    """
+    rows = [{'Mesure': f"Durée {stage} (s)", 'Valeur': seconds} for stage, seconds in report['stages'].items()]
+    rows += [
+        {'Mesure': 'Lignes', 'Valeur': report['rows']},
+        {'Mesure': 'Features sur disque (octets)', 'Valeur': report['feature_bytes']},
+        {'Mesure': 'Mémoire résidente initiale (octets)', 'Valeur': report['baseline_rss_bytes']},
+        {'Mesure': 'Mémoire résidente de pointe (octets)', 'Valeur': report['peak_rss_bytes']}
+    ]
+    return pd.DataFrame(rows, dtype=object)
@@ -0,0 +1,211 @@
+"""
+ChurnGuard - Prétraitement
+==========================
+Pipeline de features ajusté une fois (encodage, standardisation, ordre des colonnes)
+"""
+
+import os
+import copy
+
+import pandas as pd
+import numpy as np
+import joblib
+from sklearn.preprocessing import StandardScaler
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import FEATURE_COLUMNS, CATEGORY_LEVELS
+
+
+# Suffixe des colonnes encodées dans FEATURE_COLUMNS
+ENCODED_SUFFIX = '_encoded'
+
+
+class ChurnPreprocessor:
+    """
+    Pipeline de prétraitement des features, ajusté une seule fois.
+    
+    Regroupe les tables d'encodage des variables catégorielles (ordre de
+    ``LabelEncoder`` : modalités triées), le ``StandardScaler`` et l'ordre
+    des colonnes de ``FEATURE_COLUMNS``. La transformation est vectorisée
+    et écrit directement dans une matrice float32 contiguë, sans copie du
+    DataFrame ; les codes d'une colonne catégorielle au schéma compact
+    sont repris tels quels.
+    
+    Parameters
+    ----------
+    feature_columns : list, optional
+        Colonnes du modèle (``FEATURE_COLUMNS`` par défaut)
+    categories : dict, optional
+        Modalités de chaque variable encodée (``CATEGORY_LEVELS`` par défaut)
+    """
+    
+    def __init__(self, feature_columns: list = None, categories: dict = None):
+        self.feature_columns = list(feature_columns or FEATURE_COLUMNS)
+        self.categories = {column: list(levels) for column, levels in (categories or CATEGORY_LEVELS).items()}
+        self.scaler = StandardScaler()
+        self._indexes = {column: pd.Index(levels) for column, levels in self.categories.items()}
+        self._mean = None
+        self._scale = None
+    
+    @property
+    def is_fitted(self) -> bool:
+        """Vrai si le scaler est ajusté"""
+        return self._mean is not None
+    
+    def _codes(self, values: pd.Series, column: str) -> np.ndarray:
+        """Codes d'une variable catégorielle selon les modalités apprises"""
+        levels = self.categories[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) and list(values.cat.categories) == levels:
+            codes = values.cat.codes.to_numpy()
+        else:
+            codes = self._indexes[column].get_indexer(values)
+        if (codes < 0).any():
+            unknown = sorted(set(np.asarray(values)[codes < 0].tolist()))
+            raise ValueError(f"Modalité(s) inconnue(s) pour {column} : {unknown}")
+        return codes
+    
+    def check_codes(self, codes, column: str) -> np.ndarray:
+        """
+        Valide les codes d'une colonne déjà encodée (``*_encoded``).
+        
+        Raises
+        ------
+        ValueError
+            Si un code n'est pas un entier compris entre 0 et le nombre de
+            modalités apprises (exclu)
+        """
+        codes = np.asarray(codes, dtype=np.float64)
+        valid = (codes >= 0) & (codes < len(self.categories[column])) & (codes == np.floor(codes))
+        if not valid.all():
+            raise ValueError(f"Modalité(s) inconnue(s) pour {column} : {sorted(set(codes[~valid].tolist()))}")
+        return codes.astype(np.intp)
+    
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Matrice des features encodées (non standardisées).
+        
+        Les colonnes ``*_encoded`` sont calculées depuis la variable brute
+        si elles sont absentes ; une colonne déjà encodée est reprise après
+        contrôle de ses codes.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Clients (colonnes brutes ou encodées)
+        
+        Returns
+        -------
+        np.ndarray
+            Matrice float32 contiguë, colonnes dans l'ordre ``feature_columns``
+        """
+        X = np.empty((len(df), len(self.feature_columns)), dtype=np.float32)
+        for j, column in enumerate(self.feature_columns):
+            source = column[:-len(ENCODED_SUFFIX)] if column.endswith(ENCODED_SUFFIX) else None
+            if column in df.columns and source in self.categories:
+                X[:, j] = self.check_codes(df[column], source)
+            elif column in df.columns:
+                X[:, j] = df[column].to_numpy()
+            elif source is not None:
+                X[:, j] = self._codes(df[source], source)
+            else:
+                raise KeyError(f"Colonne manquante : {column}")
+        self.check_finite(X)
+        return X
+    
+    def check_finite(self, X: np.ndarray, columns: list = None):
+        """
+        Vérifie qu'une matrice (ou une ligne) ne contient que des valeurs finies.
+        
+        Raises
+        ------
+        ValueError
+            Si une valeur est manquante (NaN) ou infinie ; le message
+            nomme les colonnes concernées (``feature_columns`` par défaut)
+        """
+        X = np.atleast_2d(X)
+        finite = np.isfinite(X)
+        if not finite.all():
+            columns = columns or self.feature_columns
+            invalid = [columns[j] for j in np.flatnonzero(~finite.all(axis=0))]
+            raise ValueError(f"Valeur(s) manquante(s) ou infinie(s) pour : {invalid}")
+    
+    def fit_scaler(self, X: np.ndarray) -> 'ChurnPreprocessor':
+        """Ajuste la standardisation sur une matrice encodée (jeu d'entraînement)"""
+        return self.set_scaler(StandardScaler().fit(X))
+    
+    def set_scaler(self, scaler: StandardScaler) -> 'ChurnPreprocessor':
+        """Adopte la standardisation d'un ``StandardScaler`` ajusté (copiée)"""
+        self.scaler = copy.deepcopy(scaler)
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._scale = self.scaler.scale_.astype(np.float32)
+        return self
+    
+    def fit(self, df: pd.DataFrame) -> 'ChurnPreprocessor':
+        """Ajuste la standardisation sur un DataFrame d'entraînement"""
+        return self.fit_scaler(self.encode(df))
+    
+    def scale(self, X: np.ndarray, copy: bool = True) -> np.ndarray:
+        """
+        Standardise une matrice encodée.
+        
+        Parameters
+        ----------
+        X : np.ndarray
+            Matrice encodée
+        copy : bool
+            Si False et que ``X`` est déjà float32 contiguë, la
+            standardisation est faite en place
+        
+        Returns
+        -------
+        np.ndarray
+            Matrice float32 contiguë standardisée
+        """
+        if not self.is_fitted:
+            raise ValueError("Le prétraitement n'est pas ajusté (appeler fit ou fit_scaler)")
+        X = np.array(X, dtype=np.float32, order='C', copy=copy or None)
+        X -= self._mean
+        X /= self._scale
+        return X
+    
+    def transform(self, X) -> np.ndarray:
+        """
+        Features prêtes pour les modèles.
+        
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Clients (DataFrame brut ou encodé) ou matrice déjà encodée
+        
+        Returns
+        -------
+        np.ndarray
+            Matrice float32 contiguë standardisée
+        """
+        if isinstance(X, pd.DataFrame):
+            return self.scale(self.encode(X), copy=False)
+        return self.scale(X)
+    
+    def fit_transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Ajuste puis transforme (un seul encodage)"""
+        X = self.encode(df)
+        return self.fit_scaler(X).scale(X, copy=False)
+    
+    def save(self, path: str) -> str:
+        """Sérialise le prétraitement ajusté (joblib, remplacement atomique)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> 'ChurnPreprocessor':
+        """Recharge un prétraitement sérialisé par ``save``"""
+        preprocessor = joblib.load(path)
+        if not isinstance(preprocessor, cls):
+            raise ValueError(f"{path} ne contient pas un ChurnPreprocessor")
+        return preprocessor
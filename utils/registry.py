@@ -0,0 +1,235 @@
+"""
+ChurnGuard - Registre des Modèles
+=================================
+Modèles entraînés persistés sur disque, indexés par empreinte des données et de la configuration
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import joblib
+import sklearn
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import MODELS_CONFIG, REGISTRY_DIR
+
+
+def _hash_arrays(digest, *arrays):
+    """Ajoute le type, la forme et le contenu des tableaux à une empreinte"""
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        digest.update(f"{values.dtype.str}{values.shape}".encode())
+        digest.update(memoryview(values).cast('B'))
+
+
+def array_digest(*arrays) -> str:
+    """Empreinte SHA-1 du contenu de tableaux (jeu de test, lot de clients...)"""
+    digest = hashlib.sha1()
+    _hash_arrays(digest, *arrays)
+    return digest.hexdigest()
+
+
+def training_key(X_train: np.ndarray, y_train: np.ndarray, preprocessor=None, config: dict = None,
+                 version: str = None) -> str:
+    """
+    Empreinte d'un entraînement : données, configuration, version de scikit-learn.
+    
+    Parameters
+    ----------
+    X_train : np.ndarray
+        Features d'entraînement encodées
+    y_train : np.ndarray
+        Labels d'entraînement
+    preprocessor : ChurnPreprocessor, optional
+        Prétraitement (ordre des colonnes et modalités)
+    config : dict, optional
+        Configuration des modèles (``MODELS_CONFIG`` par défaut)
+    version : str, optional
+        Version des données (``data_version``) : si fournie, elle identifie
+        les données avec leurs formes, sans parcourir les tableaux ; sinon
+        leur contenu est haché
+    
+    Returns
+    -------
+    str
+        Empreinte hexadécimale (SHA-1)
+    """
+    digest = hashlib.sha1()
+    description = {
+        'config': config or MODELS_CONFIG,
+        'sklearn': sklearn.__version__
+    }
+    if version is None:
+        _hash_arrays(digest, X_train, y_train)
+    else:
+        description['data'] = {'version': version, 'shapes': [np.shape(X_train), np.shape(y_train)]}
+    if preprocessor is not None:
+        description['features'] = preprocessor.feature_columns
+        description['categories'] = preprocessor.categories
+        if preprocessor.is_fitted:
+            description['scaler'] = [preprocessor.scaler.mean_.tolist(), preprocessor.scaler.scale_.tolist()]
+    digest.update(json.dumps(description, sort_keys=True, default=str).encode())
+    
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Registre disque des modèles entraînés.
+    
+    Chaque entrée est un répertoire ``<clé>/`` contenant un fichier joblib
+    par modèle, le prétraitement et un ``manifest.json``. Les entrées sont
+    publiées atomiquement (répertoire temporaire renommé) et relues en
+    memory-mapping : les grands tableaux (points d'entraînement des KNN,
+    arbres) sont partagés par tous les processus via le cache de pages.
+    
+    Parameters
+    ----------
+    root : str, optional
+        Répertoire du registre (``REGISTRY_DIR`` par défaut)
+    """
+    
+    def __init__(self, root: str = None):
+        self.root = root or REGISTRY_DIR
+    
+    def path(self, key: str) -> str:
+        """Répertoire d'une entrée"""
+        return os.path.join(self.root, key)
+    
+    def exists(self, key: str) -> bool:
+        """Vrai si l'entrée est publiée"""
+        return os.path.exists(os.path.join(self.path(key), 'manifest.json'))
+    
+    def keys(self) -> list:
+        """Clés des entrées publiées"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(key for key in os.listdir(self.root) if self.exists(key))
+    
+    def save(self, key: str, models: dict, preprocessor, metadata: dict = None) -> str:
+        """
+        Publie des modèles entraînés et leur prétraitement.
+        
+        Parameters
+        ----------
+        key : str
+            Empreinte de l'entraînement (voir ``training_key``)
+        models : dict
+            Modèles entraînés par nom
+        preprocessor : ChurnPreprocessor
+            Prétraitement ajusté
+        metadata : dict, optional
+            Informations complémentaires (durées d'entraînement...)
+        
+        Returns
+        -------
+        str
+            Répertoire de l'entrée
+        """
+        path = self.path(key)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix='.tmp_')
+        
+        manifest = {
+            'key': key,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sklearn': sklearn.__version__,
+            'models': [],
+            'metadata': metadata or {}
+        }
+        
+        try:
+            joblib.dump(preprocessor, os.path.join(tmp_dir, 'preprocessor.joblib'))
+            for i, (name, model) in enumerate(models.items()):
+                entry = {'name': name, 'file': f"model_{i:02d}.joblib"}
+                # Sans compression : condition du memory-mapping au chargement
+                joblib.dump(model, os.path.join(tmp_dir, entry['file']))
+                manifest['models'].append(entry)
+            
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            
+            try:
+                os.replace(tmp_dir, path)
+            except OSError:
+                # Un autre processus a publié la même entrée entre-temps
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        return path
+    
+    def manifest(self, key: str) -> dict:
+        """Manifeste d'une entrée"""
+        with open(os.path.join(self.path(key), 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    
+    def load(self, key: str, mmap: bool = True) -> tuple:
+        """
+        Recharge une entrée.
+        
+        Parameters
+        ----------
+        key : str
+            Empreinte de l'entraînement
+        mmap : bool
+            Projeter les tableaux en mémoire (lecture seule) plutôt que les lire
+        
+        Returns
+        -------
+        tuple
+            (models, preprocessor)
+        """
+        if not self.exists(key):
+            raise KeyError(f"Modèles absents du registre : {key}")
+        
+        path = self.path(key)
+        mmap_mode = 'r' if mmap else None
+        manifest = self.manifest(key)
+        
+        preprocessor = joblib.load(os.path.join(path, 'preprocessor.joblib'))
+        models = {
+            entry['name']: joblib.load(os.path.join(path, entry['file']), mmap_mode=mmap_mode)
+            for entry in manifest['models']
+        }
+        return models, preprocessor
+    
+    def get_or_train(self, key: str, trainer, preprocessor) -> tuple:
+        """
+        Modèles de l'entrée ``key``, entraînés et publiés seulement si absents.
+        
+        Parameters
+        ----------
+        key : str
+            Empreinte de l'entraînement
+        trainer : callable
+            Fonction sans argument renvoyant ``(modèles, rapport)`` ; le
+            rapport est conservé dans le manifeste
+        preprocessor : ChurnPreprocessor
+            Prétraitement ajusté, publié avec les modèles
+        
+        Returns
+        -------
+        tuple
+            (models, preprocessor)
+        """
+        if self.exists(key):
+            return self.load(key)
+        
+        start = time.perf_counter()
+        models, report = trainer()
+        self.save(key, models, preprocessor, {'fit_seconds': time.perf_counter() - start, **report})
+        return self.load(key)
+    
+    def drop(self, key: str):
+        """Supprime une entrée"""
+        shutil.rmtree(self.path(key), ignore_errors=True)
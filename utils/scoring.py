@@ -0,0 +1,341 @@
+"""
+ChurnGuard - Scoring Rapide
+===========================
+Régression logistique compilée : standardisation et encodage des modalités
+repliés dans un vecteur de poids et un biais ; cache LRU des prédictions
+"""
+
+import math
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import PREDICTION_CACHE_SIZE
+from utils.preprocessing import ChurnPreprocessor, ENCODED_SUFFIX
+
+
+class FusedLogisticScorer:
+    """
+    Score d'une régression logistique sans passer par scikit-learn.
+    
+    Pour un modèle ``w·(x - m)/s + b`` sur les features encodées, les poids
+    deviennent ``w/s`` et le biais ``b - Σ w·m/s`` ; la contribution d'une
+    modalité (code × poids) est tabulée. Un score se réduit alors à un
+    produit scalaire, des lectures de table et une sigmoïde, en float64
+    (la chaîne scikit-learn standardise en float32 : écart ~1e-7).
+    
+    Parameters
+    ----------
+    numeric_columns : list
+        Colonnes numériques, dans l'ordre de ``weights``
+    weights : np.ndarray
+        Poids repliés des colonnes numériques
+    tables : dict
+        Par variable catégorielle : ``{'feature', 'levels', 'contributions'}``
+        (contribution de chaque modalité au score)
+    bias : float
+        Biais replié
+    preprocessor : ChurnPreprocessor
+        Prétraitement d'origine (validation des modalités en lot)
+    """
+    
+    def __init__(self, numeric_columns: list, weights: np.ndarray, tables: dict, bias: float,
+                 preprocessor: ChurnPreprocessor):
+        self.numeric_columns = list(numeric_columns)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.tables = tables
+        self.bias = float(bias)
+        self.preprocessor = preprocessor
+        self._lookups = {
+            column: dict(zip(table['levels'], table['contributions'].tolist()))
+            for column, table in tables.items()
+        }
+        self._buffers = threading.local()
+    
+    @classmethod
+    def from_model(cls, model, preprocessor: ChurnPreprocessor) -> 'FusedLogisticScorer':
+        """
+        Compile un modèle logistique binaire entraîné sur ``preprocessor``.
+        
+        Raises
+        ------
+        ValueError
+            Si le modèle n'est pas une régression logistique binaire ou si
+            le prétraitement n'est pas ajusté
+        """
+        if not is_logistic(model):
+            raise ValueError(f"{type(model).__name__} n'est pas une régression logistique binaire")
+        if not preprocessor.is_fitted:
+            raise ValueError("Le prétraitement n'est pas ajusté (appeler fit ou fit_scaler)")
+        
+        coef = model.coef_[0].astype(np.float64)
+        mean = preprocessor.scaler.mean_.astype(np.float64)
+        scale = preprocessor.scaler.scale_.astype(np.float64)
+        folded = coef / scale
+        bias = float(model.intercept_[0]) - float(folded @ mean)
+        
+        numeric_columns, weights, tables = [], [], {}
+        for j, column in enumerate(preprocessor.feature_columns):
+            source = column[:-len(ENCODED_SUFFIX)] if column.endswith(ENCODED_SUFFIX) else None
+            if source in preprocessor.categories:
+                levels = preprocessor.categories[source]
+                tables[source] = {
+                    'feature': column,
+                    'levels': levels,
+                    'contributions': folded[j] * np.arange(len(levels), dtype=np.float64)
+                }
+            else:
+                numeric_columns.append(column)
+                weights.append(folded[j])
+        return cls(numeric_columns, np.array(weights), tables, bias, preprocessor)
+    
+    def _buffer(self) -> np.ndarray:
+        """Vecteur de features préalloué (un par thread)"""
+        buffer = getattr(self._buffers, 'row', None)
+        if buffer is None:
+            buffer = self._buffers.row = np.empty(len(self.numeric_columns), dtype=np.float64)
+        return buffer
+    
+    def decision_one(self, customer: dict) -> float:
+        """
+        Score linéaire d'un client (dictionnaire de valeurs brutes ou encodées).
+        
+        Raises
+        ------
+        KeyError
+            Colonne numérique absente
+        ValueError
+            Valeur numérique manquante ou infinie, modalité inconnue
+        """
+        buffer = self._buffer()
+        try:
+            for j, column in enumerate(self.numeric_columns):
+                buffer[j] = customer[column]
+        except KeyError:
+            raise KeyError(f"Colonne manquante : {column}") from None
+        z = float(buffer @ self.weights) + self.bias
+        # Une valeur non finie rend le score non fini : contrôle détaillé seulement dans ce cas
+        if not math.isfinite(z):
+            self.preprocessor.check_finite(buffer, self.numeric_columns)
+        
+        for column, lookup in self._lookups.items():
+            table = self.tables[column]
+            if table['feature'] in customer:
+                code = customer[table['feature']]
+                if not (0 <= code < len(table['levels']) and code == int(code)):
+                    raise ValueError(f"Modalité(s) inconnue(s) pour {column} : {[code]}")
+                z += table['contributions'][int(code)]
+                continue
+            try:
+                z += lookup[customer[column]]
+            except KeyError:
+                raise ValueError(f"Modalité(s) inconnue(s) pour {column} : {[customer[column]]}") from None
+        return z
+    
+    def predict_proba_one(self, customer: dict) -> float:
+        """Probabilité de churn d'un client"""
+        z = self.decision_one(customer)
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
+    
+    def decision_function(self, customers: pd.DataFrame) -> np.ndarray:
+        """
+        Scores linéaires d'un lot de clients.
+        
+        Raises
+        ------
+        KeyError
+            Colonne numérique absente
+        ValueError
+            Valeur numérique manquante ou infinie, modalité inconnue
+        """
+        X = np.empty((len(customers), len(self.numeric_columns)), dtype=np.float64)
+        for j, column in enumerate(self.numeric_columns):
+            if column not in customers.columns:
+                raise KeyError(f"Colonne manquante : {column}")
+            X[:, j] = customers[column].to_numpy()
+        z = X @ self.weights
+        if not np.isfinite(z).all():
+            self.preprocessor.check_finite(X, self.numeric_columns)
+        z += self.bias
+        
+        for column, table in self.tables.items():
+            if table['feature'] in customers.columns:
+                codes = self.preprocessor.check_codes(customers[table['feature']], column)
+            else:
+                codes = self.preprocessor._codes(customers[column], column)
+            z += table['contributions'][codes]
+        return z
+    
+    def predict_proba(self, customers: pd.DataFrame) -> np.ndarray:
+        """Probabilités ``[non churn, churn]`` d'un lot (format de ``predict_proba``)"""
+        p = expit(self.decision_function(customers))
+        return np.column_stack([1 - p, p])
+
+
+def is_logistic(model) -> bool:
+    """Vrai pour une régression logistique binaire entraînée"""
+    if isinstance(model, SGDClassifier):
+        logistic = model.loss == 'log_loss'
+    else:
+        logistic = isinstance(model, LogisticRegression)
+    return logistic and hasattr(model, 'coef_') and model.coef_.shape[0] == 1
+
+
+# Scorers compilés par modèle (libérés avec le modèle)
+_SCORERS = weakref.WeakKeyDictionary()
+
+
+def compiled_scorer(model, preprocessor: ChurnPreprocessor) -> FusedLogisticScorer:
+    """
+    Scorer compilé d'un modèle, mémorisé tant que le modèle existe.
+    
+    Le scorer est recompilé si le prétraitement, sa standardisation ou
+    les coefficients du modèle (``partial_fit``) changent.
+    
+    Returns
+    -------
+    FusedLogisticScorer
+        None si le modèle n'est pas une régression logistique binaire
+    """
+    if not is_logistic(model) or not preprocessor.is_fitted:
+        return None
+    
+    cached = _SCORERS.get(model)
+    if cached is not None:
+        cached_preprocessor, mean, coef, intercept, scorer = cached
+        if (cached_preprocessor is preprocessor and mean is preprocessor._mean
+                and np.array_equal(coef, model.coef_) and np.array_equal(intercept, model.intercept_)):
+            return scorer
+    
+    scorer = FusedLogisticScorer.from_model(model, preprocessor)
+    _SCORERS[model] = (preprocessor, preprocessor._mean, model.coef_.copy(), model.intercept_.copy(), scorer)
+    return scorer
+
+
+def canonical_features(features: dict) -> tuple:
+    """
+    Clé canonique d'un client : couples (colonne, valeur) triés.
+    
+    Les valeurs numériques sont converties en float arrondi (``65``,
+    ``65.0`` et ``True`` / ``1`` donnent la même clé), les modalités en
+    chaîne.
+    """
+    items = []
+    for column in sorted(features):
+        value = features[column]
+        if isinstance(value, (bool, int, float, np.number)):
+            value = round(float(value), 9)
+        else:
+            value = str(value)
+        items.append((column, value))
+    return tuple(items)
+
+
+class PredictionCache:
+    """
+    Cache LRU borné des prédictions individuelles, partagé par le processus.
+    
+    La clé est le modèle et le vecteur de features canonique ; chaque
+    modèle a une version (par exemple la version des données) : une
+    lecture avec une autre version vide les entrées du modèle.
+    
+    Parameters
+    ----------
+    maxsize : int
+        Nombre maximal d'entrées (les moins récemment lues sont évincées)
+    """
+    
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def invalidate(self, model_name: str = None):
+        """Vide les entrées d'un modèle (de tous les modèles si None)"""
+        with self._lock:
+            self._invalidate(model_name)
+    
+    def _invalidate(self, model_name: str = None):
+        if model_name is None:
+            self._entries.clear()
+            self._versions.clear()
+        else:
+            for key in [key for key in self._entries if key[0] == model_name]:
+                del self._entries[key]
+            self._versions.pop(model_name, None)
+        self.invalidations += 1
+    
+    def get_or_predict(self, model_name: str, version: str, features: dict, predict):
+        """
+        Prédiction mémorisée d'un client, calculée par ``predict`` si absente.
+        
+        Parameters
+        ----------
+        model_name : str
+            Nom du modèle
+        version : str
+            Version du modèle ; si elle change, ses entrées sont invalidées
+        features : dict
+            Valeurs du client
+        predict : callable
+            Fonction sans argument renvoyant la prédiction
+        
+        Returns
+        -------
+        object
+            Résultat de ``predict`` (mémorisé ou calculé)
+        """
+        key = (model_name, canonical_features(features))
+        with self._lock:
+            if model_name in self._versions and self._versions[model_name] != version:
+                self._invalidate(model_name)
+            self._versions[model_name] = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        result = predict()
+        with self._lock:
+            if self._versions.get(model_name) == version:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+    
+    def stats(self) -> dict:
+        """Compteurs : succès, échecs, taux de succès, taille, évictions, invalidations"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,305 @@
+"""
+ChurnGuard - Recherche d'Hyperparamètres
+========================================
+Successive halving sur des échantillons croissants, matrices standardisées et
+recherches de voisins partagées entre candidats
+"""
+
+import os
+import json
+import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import (
+    SEARCH_SPACE, SEARCH_FACTOR, SEARCH_MIN_RESOURCES, SEARCH_CV_FOLDS, SEARCH_DIR,
+    RANDOM_STATE, TRAINING_N_JOBS
+)
+from utils.preprocessing import ChurnPreprocessor
+from utils.evaluation import ModelEvaluation
+from utils.neighbors import MultiKNeighbors
+from utils.validation import fold_assignments
+from utils.models import build_estimator
+
+
+# Paramètres d'un KNN dérivables d'une seule recherche de voisins
+SHARED_NEIGHBOR_PARAMS = ('n_neighbors', 'weights')
+
+
+def candidates(space: dict = None) -> list:
+    """
+    Candidats de l'espace de recherche (grille complète de chaque famille).
+    
+    Parameters
+    ----------
+    space : dict, optional
+        Espace de recherche (``SEARCH_SPACE`` par défaut)
+    
+    Returns
+    -------
+    list
+        Dictionnaires ``{'family', 'name', 'model_name', 'tuned', 'config'}`` :
+        ``name`` identifie le candidat, ``model_name`` est le nom du modèle
+        dans ``MODELS_CONFIG`` (gabarit ``name`` de la famille), ``tuned``
+        les valeurs de la grille et ``config`` une entrée au format de
+        ``MODELS_CONFIG``
+    """
+    result = []
+    for family, spec in (space or SEARCH_SPACE).items():
+        grid = spec.get('grid', {})
+        for values in itertools.product(*grid.values()):
+            varied = dict(zip(grid, values))
+            params = {**spec.get('params', {}), **varied}
+            label = ', '.join(f"{key}={value}" for key, value in varied.items())
+            result.append({
+                'family': family,
+                'name': f"{family} ({label})" if label else family,
+                'model_name': spec.get('name', family).format(**params),
+                'tuned': varied,
+                'config': {
+                    'type': 'classification',
+                    'estimator': spec['estimator'],
+                    'params': params
+                }
+            })
+    return result
+
+
+def _score(evaluation: ModelEvaluation, scoring: str) -> float:
+    """Score d'un candidat sur ses prédictions hors pli"""
+    if scoring == 'roc_auc':
+        return evaluation.auc
+    if scoring == 'f1':
+        return evaluation.metrics()['F1-Score']
+    raise ValueError(f"Score inconnu : {scoring} (choix : roc_auc, f1)")
+
+
+def _work_units(alive: list) -> list:
+    """
+    Regroupe les candidats en unités de calcul.
+    
+    Les KNN qui ne diffèrent que par k et la pondération forment une seule
+    unité (une recherche de voisins pour le plus grand k) ; chaque autre
+    candidat est sa propre unité.
+    """
+    groups = {}
+    units = []
+    for candidate in alive:
+        config = candidate['config']
+        if hasattr(build_estimator(config), 'kneighbors'):
+            shared = {k: v for k, v in config['params'].items() if k not in SHARED_NEIGHBOR_PARAMS}
+            key = (config['estimator'], json.dumps(shared, sort_keys=True, default=str))
+            if key not in groups:
+                groups[key] = []
+                units.append(groups[key])
+            groups[key].append(candidate)
+        else:
+            units.append([candidate])
+    return units
+
+
+def _run_unit(unit: list, fold: dict) -> dict:
+    """Scores de validation des candidats d'une unité sur un pli"""
+    config = unit[0]['config']
+    if len(unit) == 1 and not hasattr(build_estimator(config), 'kneighbors'):
+        model = build_estimator(config).fit(fold['X_train'], fold['y_train'])
+        return {unit[0]['name']: model.predict_proba(fold['X_val'])[:, 1]}
+    
+    k_values = [min(c['config']['params'].get('n_neighbors', 5), len(fold['y_train'])) for c in unit]
+    params = {k: v for k, v in config['params'].items() if k not in SHARED_NEIGHBOR_PARAMS}
+    base = build_estimator({**config, 'params': {**params, 'n_neighbors': max(k_values)}})
+    multi = MultiKNeighbors(base.fit(fold['X_train'], fold['y_train']), k_values).query(fold['X_val'])
+    return {
+        c['name']: multi.predict_proba(k, c['config']['params'].get('weights', 'uniform'))[:, 1]
+        for c, k in zip(unit, k_values)
+    }
+
+
+def _folds(X: np.ndarray, y: np.ndarray, n_splits: int) -> list:
+    """Plis d'un échantillon, standardisés une fois pour tous les candidats"""
+    assignments = fold_assignments(y, n_splits)
+    folds = []
+    for fold in range(n_splits):
+        train = assignments != fold
+        scaler = ChurnPreprocessor().fit_scaler(X[train])
+        folds.append({
+            'X_train': scaler.scale(X[train], copy=False),
+            'y_train': y[train],
+            'X_val': scaler.scale(X[~train], copy=False),
+            'val_index': np.flatnonzero(~train)
+        })
+    return folds
+
+
+class SearchResult:
+    """
+    Résultat d'une recherche d'hyperparamètres.
+    
+    Parameters
+    ----------
+    history : pd.DataFrame
+        Score de chaque candidat à chaque tour
+    best : dict
+        Par famille : candidat, nom du modèle, paramètres de la grille,
+        configuration et score du meilleur candidat
+    scoring : str
+        Score optimisé
+    wall_seconds : float
+        Durée de la recherche
+    """
+    
+    def __init__(self, history: pd.DataFrame, best: dict, scoring: str, wall_seconds: float):
+        self.history = history
+        self.best = best
+        self.scoring = scoring
+        self.wall_seconds = wall_seconds
+    
+    @property
+    def models_config(self) -> dict:
+        """Meilleur candidat de chaque famille, au format de ``MODELS_CONFIG`` (noms canoniques)"""
+        return {entry['model_name']: entry['config'] for entry in self.best.values()}
+    
+    def summary(self) -> pd.DataFrame:
+        """
+        Meilleurs candidats.
+        
+        Returns
+        -------
+        pd.DataFrame
+            Famille, modèle, candidat retenu et score sur tout l'échantillon
+        """
+        return pd.DataFrame([
+            {'Famille': family, 'Modèle': entry['model_name'], 'Candidat': entry['name'], 'Score': entry['score']}
+            for family, entry in self.best.items()
+        ])
+    
+    def save(self, path: str = None) -> str:
+        """
+        Écrit la configuration retenue (JSON, remplacement atomique).
+        
+        Le fichier se charge comme ``MODELS_CONFIG`` via la variable
+        d'environnement ``CHURNGUARD_MODELS_FILE`` : les modèles gardent
+        leurs noms canoniques, les paramètres retenus par la recherche sont
+        listés à part (``params``).
+        
+        Returns
+        -------
+        str
+            Chemin du fichier écrit
+        """
+        path = path or os.path.join(SEARCH_DIR, 'models.json')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        payload = {
+            'models': self.models_config,
+            'scoring': self.scoring,
+            'params': {entry['model_name']: entry['tuned'] for entry in self.best.values()},
+            'scores': {entry['model_name']: entry['score'] for entry in self.best.values()},
+            'wall_seconds': self.wall_seconds
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+def successive_halving(X: np.ndarray, y: np.ndarray, space: dict = None, factor: int = SEARCH_FACTOR,
+                       min_resources: int = SEARCH_MIN_RESOURCES, n_splits: int = SEARCH_CV_FOLDS,
+                       scoring: str = 'roc_auc', n_jobs: int = None,
+                       random_state: int = RANDOM_STATE) -> SearchResult:
+    """
+    Recherche d'hyperparamètres par successive halving.
+    
+    Tous les candidats sont évalués (validation croisée) sur un petit
+    échantillon ; seul le meilleur ``1 / factor`` de chaque famille passe
+    au tour suivant, évalué sur un échantillon ``factor`` fois plus grand,
+    jusqu'au dataset complet. À chaque tour, les plis sont standardisés
+    une seule fois pour tous les candidats, et les KNN ne différant que
+    par k et la pondération partagent une recherche de voisins.
+    
+    Parameters
+    ----------
+    X : np.ndarray
+        Features encodées (non standardisées)
+    y : np.ndarray
+        Labels
+    space : dict, optional
+        Espace de recherche (``SEARCH_SPACE`` par défaut)
+    factor : int
+        Facteur d'élimination et de croissance de l'échantillon
+    min_resources : int
+        Taille minimale de l'échantillon du premier tour
+    n_splits : int
+        Plis de validation croisée à chaque tour
+    scoring : str
+        'roc_auc' ou 'f1'
+    n_jobs : int, optional
+        Unités de calcul simultanées (``TRAINING_N_JOBS`` par défaut,
+        -1 = tous les cœurs)
+    random_state : int
+        Graine du tirage des échantillons (emboîtés d'un tour à l'autre)
+    
+    Returns
+    -------
+    SearchResult
+        Historique des tours et meilleur candidat de chaque famille
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    alive = candidates(space)
+    families = list(dict.fromkeys(c['family'] for c in alive))
+    largest = max(sum(c['family'] == family for c in alive) for family in families)
+    n_rounds = 1 + int(np.floor(np.log(largest) / np.log(factor) + 1e-9))
+    
+    n_jobs = n_jobs or TRAINING_N_JOBS
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    
+    order = np.random.default_rng(random_state).permutation(len(y))
+    history = []
+    start = time.perf_counter()
+    
+    for round_index in range(n_rounds):
+        n_rows = len(y) // factor ** (n_rounds - 1 - round_index)
+        rows = np.sort(order[:min(len(y), max(n_rows, min_resources))])
+        folds = _folds(X[rows], y[rows], n_splits)
+        units = _work_units(alive)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(n_jobs, len(units) * n_splits))) as executor:
+            results = list(executor.map(
+                lambda task: (task[1], _run_unit(task[0], folds[task[1]])),
+                [(unit, fold) for unit in units for fold in range(n_splits)]
+            ))
+        
+        oof = {c['name']: np.empty(len(rows), dtype=np.float64) for c in alive}
+        for fold, scores in results:
+            for name, values in scores.items():
+                oof[name][folds[fold]['val_index']] = values
+        
+        for candidate in alive:
+            candidate['score'] = _score(ModelEvaluation(y[rows], oof[candidate['name']]), scoring)
+            history.append({
+                'Tour': round_index, 'Lignes': len(rows), 'Famille': candidate['family'],
+                'Candidat': candidate['name'], 'Score': candidate['score']
+            })
+        
+        survivors = []
+        for family in families:
+            ranked = sorted((c for c in alive if c['family'] == family), key=lambda c: -c['score'])
+            keep = len(ranked) if round_index == n_rounds - 1 else int(np.ceil(len(ranked) / factor))
+            survivors.extend(ranked[:keep])
+        alive = survivors
+    
+    best = {}
+    for candidate in alive:
+        if candidate['family'] not in best:
+            best[candidate['family']] = {k: candidate[k] for k in ('name', 'model_name', 'tuned', 'config', 'score')}
+    
+    return SearchResult(pd.DataFrame(history), best, scoring, time.perf_counter() - start)
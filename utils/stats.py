@@ -0,0 +1,161 @@
+"""
+ChurnGuard - Statistiques Incrémentales
+=======================================
+Accumulateur fusionnable des indicateurs clés
+"""
+
+import json
+
+import pandas as pd
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import NUMERIC_COLUMNS
+
+
+class SummaryStats:
+    """
+    Accumulateur fusionnable des statistiques résumées du dataset.
+    
+    Ne conserve que des sommes (effectif, sommes et sommes des carrés des
+    variables numériques, nombre de churns, chiffre d'affaires) : un lot de
+    nouveaux clients s'intègre en O(lot) avec ``update`` et deux
+    accumulateurs calculés sur des partitions disjointes se combinent avec
+    ``merge``, sans relire les lignes.
+    
+    Parameters
+    ----------
+    columns : list, optional
+        Variables numériques suivies (``NUMERIC_COLUMNS`` par défaut)
+    """
+    
+    def __init__(self, columns: list = None):
+        self.columns = list(columns or NUMERIC_COLUMNS)
+        self.count = 0
+        self.churn_count = 0
+        self.sums = np.zeros(len(self.columns))
+        self.sums_sq = np.zeros(len(self.columns))
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: list = None) -> 'SummaryStats':
+        """Accumulateur initialisé sur un DataFrame"""
+        return cls(columns).update(df)
+    
+    def update(self, batch: pd.DataFrame) -> 'SummaryStats':
+        """
+        Intègre un lot de clients.
+        
+        Parameters
+        ----------
+        batch : pd.DataFrame
+            Nouveaux clients (colonnes suivies et ``churn``)
+        
+        Returns
+        -------
+        SummaryStats
+            L'accumulateur mis à jour
+        """
+        for i, column in enumerate(self.columns):
+            values = batch[column].to_numpy(dtype=np.float64)
+            self.sums[i] += values.sum()
+            self.sums_sq[i] += np.dot(values, values)
+        
+        self.count += len(batch)
+        self.churn_count += int(batch['churn'].to_numpy().sum(dtype=np.int64))
+        return self
+    
+    def merge(self, other: 'SummaryStats') -> 'SummaryStats':
+        """
+        Combine deux accumulateurs (partitions disjointes des clients).
+        
+        Returns
+        -------
+        SummaryStats
+            Nouvel accumulateur couvrant les deux partitions
+        """
+        if self.columns != other.columns:
+            raise ValueError("Les accumulateurs ne suivent pas les mêmes variables")
+        
+        merged = SummaryStats(self.columns)
+        merged.count = self.count + other.count
+        merged.churn_count = self.churn_count + other.churn_count
+        merged.sums = self.sums + other.sums
+        merged.sums_sq = self.sums_sq + other.sums_sq
+        return merged
+    
+    def __add__(self, other: 'SummaryStats') -> 'SummaryStats':
+        return self.merge(other)
+    
+    @property
+    def nbytes(self) -> int:
+        """Empreinte mémoire des sommes"""
+        return self.sums.nbytes + self.sums_sq.nbytes
+    
+    def mean(self, column: str) -> float:
+        """Moyenne d'une variable suivie"""
+        if self.count == 0:
+            return np.nan
+        return self.sums[self.columns.index(column)] / self.count
+    
+    def std(self, column: str) -> float:
+        """Écart-type (échantillon) d'une variable suivie"""
+        if self.count < 2:
+            return np.nan
+        i = self.columns.index(column)
+        variance = (self.sums_sq[i] - self.sums[i] ** 2 / self.count) / (self.count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+    
+    def total(self, column: str) -> float:
+        """Somme d'une variable suivie"""
+        return self.sums[self.columns.index(column)]
+    
+    def summary(self) -> dict:
+        """
+        Statistiques résumées, au format de ``get_summary_stats``.
+        
+        Returns
+        -------
+        dict
+            Dictionnaire des statistiques
+        """
+        return {
+            'total_clients': self.count,
+            'churn_count': self.churn_count,
+            'churn_rate': self.churn_count / self.count * 100 if self.count else np.nan,
+            'avg_tenure': self.mean('tenure_months'),
+            'avg_charges': self.mean('monthly_charges'),
+            'avg_satisfaction': self.mean('satisfaction_score'),
+            'total_revenue': self.total('total_charges')
+        }
+    
+    def to_dict(self) -> dict:
+        """Représentation sérialisable (JSON)"""
+        return {
+            'columns': self.columns,
+            'count': self.count,
+            'churn_count': self.churn_count,
+            'sums': self.sums.tolist(),
+            'sums_sq': self.sums_sq.tolist()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SummaryStats':
+        """Reconstruit un accumulateur sérialisé par ``to_dict``"""
+        stats = cls(data['columns'])
+        stats.count = int(data['count'])
+        stats.churn_count = int(data['churn_count'])
+        stats.sums = np.asarray(data['sums'], dtype=np.float64)
+        stats.sums_sq = np.asarray(data['sums_sq'], dtype=np.float64)
+        return stats
+    
+    def to_json(self) -> str:
+        """Sérialisation JSON"""
+        return json.dumps(self.to_dict())
+    
+    @classmethod
+    def from_json(cls, payload: str) -> 'SummaryStats':
+        """Désérialisation JSON"""
+        return cls.from_dict(json.loads(payload))
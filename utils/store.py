@@ -0,0 +1,236 @@
+"""
+ChurnGuard - Magasin de Données Partagé
+=======================================
+Datasets en lecture seule partagés par toutes les pages et sessions
+"""
+
+import mmap
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+import numpy as np
+
+
+def _readonly(values: np.ndarray) -> np.ndarray:
+    """Vue en lecture seule d'un tableau (sans copie)"""
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+def _is_mapped(values: np.ndarray) -> bool:
+    """Vrai si le tableau est projeté depuis un fichier (memory-mapping)"""
+    base = values
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+def _physical_arrays(df: pd.DataFrame) -> list:
+    """Tableaux physiques des colonnes (codes pour les catégorielles)"""
+    arrays = []
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays.append(values.cat.codes.to_numpy())
+        else:
+            arrays.append(values.to_numpy())
+    return arrays
+
+
+def freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reconstruit un DataFrame sur des vues en lecture seule de ses colonnes.
+    
+    Aucune donnée n'est copiée (colonnes non consolidées) ; toute écriture
+    en place sur le résultat lève une erreur.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = _readonly(values.cat.codes.to_numpy())
+            columns[column] = pd.Categorical.from_codes(codes, dtype=values.dtype, validate=False)
+        else:
+            columns[column] = _readonly(values.to_numpy())
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+class DatasetStore:
+    """
+    Magasin de datasets en lecture seule, partagé par tout le processus.
+    
+    Chaque dataset est enregistré une seule fois sous sa version (clé du
+    cache disque) ; les appelants reçoivent des vues sans copie dont les
+    tableaux sont en lecture seule. Les artefacts dérivés (cube, index de
+    filtres, statistiques...) sont mémorisés par version et disparaissent
+    avec elle.
+    
+    Le verrou du magasin ne protège que les lectures et insertions : les
+    chargements et constructions s'exécutent hors verrou, un seul par clé
+    (les appels simultanés sur la même clé attendent son résultat), sans
+    bloquer les autres versions ni les autres artefacts.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._frames = {}
+        self._derived = {}
+        self._pending = {}
+    
+    @property
+    def versions(self) -> list:
+        """Versions des datasets enregistrés"""
+        with self._lock:
+            return list(self._frames)
+    
+    def publish(self, version: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Enregistre un dataset sous une version.
+        
+        Parameters
+        ----------
+        version : str
+            Version du dataset
+        df : pd.DataFrame
+            Données (non copiées)
+        
+        Returns
+        -------
+        pd.DataFrame
+            Vue en lecture seule du dataset enregistré
+        """
+        return self._publish(version, df).copy(deep=False)
+    
+    def _publish(self, version: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Enregistre un dataset ; renvoie le DataFrame gelé du magasin"""
+        frozen = freeze(df)
+        with self._lock:
+            self._frames[version] = frozen
+            self._derived = {key: value for key, value in self._derived.items() if key[0] != version}
+        return frozen
+    
+    def _once(self, key: tuple, build):
+        """
+        Exécute ``build`` une seule fois pour ``key``, hors du verrou global.
+        
+        Les appels simultanés sur la même clé attendent le résultat (ou
+        l'erreur) du premier ; ``build`` doit enregistrer son résultat avant
+        de rendre la main.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            result = build()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+    
+    def get(self, version: str, loader=None) -> pd.DataFrame:
+        """
+        Vue en lecture seule d'un dataset, chargé au premier appel.
+        
+        Parameters
+        ----------
+        version : str
+            Version du dataset
+        loader : callable, optional
+            Fonction sans argument produisant le dataset s'il est absent ;
+            un seul chargement a lieu même si plusieurs sessions le
+            demandent en même temps
+        
+        Returns
+        -------
+        pd.DataFrame
+            Vue sans copie (les colonnes ajoutées n'affectent pas le magasin)
+        """
+        with self._lock:
+            frozen = self._frames.get(version)
+        if frozen is None:
+            if loader is None:
+                raise KeyError(f"Dataset absent du magasin : {version}")
+            frozen = self._once(('dataset', version), lambda: self._publish(version, loader()))
+        return frozen.copy(deep=False)
+    
+    def derive(self, version: str, name: str, builder):
+        """
+        Artefact dérivé d'un dataset, construit une fois par version.
+        
+        Parameters
+        ----------
+        version : str
+            Version du dataset source
+        name : str
+            Nom de l'artefact
+        builder : callable
+            Fonction recevant la vue du dataset et construisant l'artefact
+        """
+        key = (version, name)
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+            source = self._frames.get(version)
+        if source is None:
+            raise KeyError(f"Dataset absent du magasin : {version}")
+        
+        def build():
+            artifact = builder(source.copy(deep=False))
+            with self._lock:
+                # Pas d'insertion si le dataset a été remplacé ou retiré entre-temps
+                if self._frames.get(version) is source:
+                    self._derived[key] = artifact
+            return artifact
+        
+        return self._once(('derived', *key), build)
+    
+    def drop(self, version: str):
+        """Retire un dataset et ses artefacts dérivés"""
+        with self._lock:
+            self._frames.pop(version, None)
+            self._derived = {key: value for key, value in self._derived.items() if key[0] != version}
+    
+    def memory_report(self) -> pd.DataFrame:
+        """
+        Empreinte mémoire du magasin.
+        
+        Returns
+        -------
+        pd.DataFrame
+            Par dataset et artefact : lignes, octets, dont octets projetés
+            depuis le cache disque (partagés entre processus)
+        """
+        rows = []
+        with self._lock:
+            for version, df in self._frames.items():
+                arrays = _physical_arrays(df)
+                rows.append({
+                    'Version': version,
+                    'Objet': 'dataset',
+                    'Lignes': len(df),
+                    'Octets': int(df.memory_usage(index=False, deep=True).sum()),
+                    'Octets projetés': sum(a.nbytes for a in arrays if _is_mapped(a))
+                })
+            for (version, name), artifact in self._derived.items():
+                rows.append({
+                    'Version': version,
+                    'Objet': name,
+                    'Lignes': None,
+                    'Octets': getattr(artifact, 'nbytes', None),
+                    'Octets projetés': 0
+                })
+        return pd.DataFrame(rows, columns=['Version', 'Objet', 'Lignes', 'Octets', 'Octets projetés'])
@@ -0,0 +1,251 @@
+"""
+ChurnGuard - Validation Croisée
+===============================
+Plis parallèles avec prétraitement ajusté dans chaque pli, prédictions hors
+pli mémorisées sur disque
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import CV_FOLDS, CV_DIR, TRAINING_N_JOBS
+from utils.preprocessing import ChurnPreprocessor
+from utils.evaluation import ModelEvaluation, predict_models, DEFAULT_THRESHOLD
+from utils.registry import training_key
+
+
+# Métriques calculées sur chaque pli
+CV_METRICS = ['Accuracy', 'Precision', 'Recall', 'F1-Score', 'AUC']
+
+
+def fold_assignments(y: np.ndarray, n_splits: int = CV_FOLDS) -> np.ndarray:
+    """
+    Pli de validation de chaque ligne.
+    
+    Plis stratifiés sans mélange, identiques à ceux de
+    ``cross_val_score(cv=n_splits)`` pour un classifieur.
+    
+    Returns
+    -------
+    np.ndarray
+        Numéro de pli (int8) par ligne
+    """
+    y = np.asarray(y)
+    folds = np.empty(len(y), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_splits)
+    for fold, (_, val_index) in enumerate(splitter.split(np.zeros((len(y), 1)), y)):
+        folds[val_index] = fold
+    return folds
+
+
+def describe_estimators(estimators: dict) -> dict:
+    """Description des estimateurs au format de ``MODELS_CONFIG`` (pour l'empreinte)"""
+    return {
+        name: {
+            'estimator': f"{type(estimator).__module__}.{type(estimator).__name__}",
+            'params': estimator.get_params()
+        }
+        for name, estimator in estimators.items()
+    }
+
+
+def _run_fold(fold: int, folds: np.ndarray, X: np.ndarray, y: np.ndarray, estimators: dict) -> dict:
+    """Ajuste prétraitement et modèles sans le pli ``fold`` ; scores du pli"""
+    train = folds != fold
+    scaler = ChurnPreprocessor().fit_scaler(X[train])
+    X_train = scaler.scale(X[train], copy=False)
+    X_val = scaler.scale(X[~train], copy=False)
+    
+    fitted = {name: clone(estimator).fit(X_train, y[train]) for name, estimator in estimators.items()}
+    scores = {}
+    for name, prediction in predict_models(fitted, X_val).items():
+        scores[name] = prediction['pred'] if prediction['proba'] is None else prediction['proba'][:, 1]
+    return scores
+
+
+class CrossValidationResult:
+    """
+    Prédictions hors pli d'une validation croisée.
+    
+    Chaque ligne est prédite par les modèles entraînés sans son pli ; les
+    métriques de chaque pli, ou globales, sont dérivées de ces scores à
+    n'importe quel seuil, sans nouvel entraînement.
+    
+    Parameters
+    ----------
+    names : list
+        Noms des modèles
+    y : np.ndarray
+        Labels réels
+    folds : np.ndarray
+        Numéro de pli de chaque ligne
+    oof : np.ndarray
+        Scores hors pli, une ligne par modèle
+    wall_seconds : float
+        Durée de la validation croisée
+    """
+    
+    def __init__(self, names: list, y: np.ndarray, folds: np.ndarray, oof: np.ndarray, wall_seconds: float = np.nan):
+        self.names = list(names)
+        self.y = np.asarray(y, dtype=np.int8)
+        self.folds = np.asarray(folds, dtype=np.int8)
+        self.oof = np.asarray(oof, dtype=np.float64)
+        self.wall_seconds = float(wall_seconds)
+    
+    @property
+    def n_splits(self) -> int:
+        """Nombre de plis"""
+        return int(self.folds.max()) + 1
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des tableaux (octets)"""
+        return self.y.nbytes + self.folds.nbytes + self.oof.nbytes
+    
+    def evaluation(self, name: str) -> ModelEvaluation:
+        """Évaluation globale d'un modèle sur ses prédictions hors pli"""
+        return ModelEvaluation(self.y, self.oof[self.names.index(name)])
+    
+    def scores(self, threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+        """
+        Métriques de chaque modèle sur chaque pli.
+        
+        Returns
+        -------
+        pd.DataFrame
+            Modèle, Pli et une colonne par métrique de ``CV_METRICS``
+        """
+        rows = []
+        for i, name in enumerate(self.names):
+            for fold in range(self.n_splits):
+                mask = self.folds == fold
+                evaluation = ModelEvaluation(self.y[mask], self.oof[i, mask])
+                rows.append({'Modèle': name, 'Pli': fold, **evaluation.metrics(threshold), 'AUC': evaluation.auc})
+        return pd.DataFrame(rows, columns=['Modèle', 'Pli'] + CV_METRICS)
+    
+    def summary(self, threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+        """
+        Moyenne et écart-type des métriques sur les plis.
+        
+        Returns
+        -------
+        pd.DataFrame
+            Une ligne par modèle ; colonnes ``<métrique>`` (moyenne) et
+            ``<métrique> (écart-type)``
+        """
+        grouped = self.scores(threshold).groupby('Modèle', sort=False)[CV_METRICS]
+        mean = grouped.mean()
+        std = grouped.std(ddof=0).add_suffix(' (écart-type)')
+        columns = [c for metric in CV_METRICS for c in (metric, f"{metric} (écart-type)")]
+        return pd.concat([mean, std], axis=1)[columns].reset_index()
+    
+    def save(self, path: str) -> str:
+        """Enregistre les plis et prédictions hors pli (npz, remplacement atomique)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path, names=np.array(self.names), y=self.y, folds=self.folds,
+            oof=self.oof, wall_seconds=self.wall_seconds
+        )
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> 'CrossValidationResult':
+        """Recharge un résultat enregistré par ``save``"""
+        with np.load(path) as data:
+            return cls(data['names'].tolist(), data['y'], data['folds'], data['oof'], data['wall_seconds'])
+
+
+def cross_validate(X: np.ndarray, y: np.ndarray, estimators: dict, n_splits: int = CV_FOLDS,
+                   n_jobs: int = None) -> CrossValidationResult:
+    """
+    Validation croisée de plusieurs modèles, plis en parallèle.
+    
+    Dans chaque pli, la standardisation est ajustée sur les seules lignes
+    d'entraînement (pas de fuite vers le pli de validation), puis tous les
+    modèles sont entraînés ; les KNN ne différant que par k partagent une
+    recherche de voisins.
+    
+    Parameters
+    ----------
+    X : np.ndarray
+        Features encodées, non standardisées
+    y : np.ndarray
+        Labels
+    estimators : dict
+        Estimateurs (non entraînés ou entraînés : ils sont clonés)
+    n_splits : int
+        Nombre de plis
+    n_jobs : int, optional
+        Nombre de plis traités simultanément (``TRAINING_N_JOBS`` par
+        défaut, -1 = tous les cœurs)
+    
+    Returns
+    -------
+    CrossValidationResult
+        Plis et prédictions hors pli
+    """
+    X = np.asarray(X, dtype=np.float32).view()
+    X.flags.writeable = False
+    y = np.asarray(y)
+    folds = fold_assignments(y, n_splits)
+    
+    n_jobs = n_jobs or TRAINING_N_JOBS
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, n_splits))
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        results = list(executor.map(
+            lambda fold: _run_fold(fold, folds, X, y, estimators),
+            range(n_splits)
+        ))
+    wall_seconds = time.perf_counter() - start
+    
+    names = list(estimators)
+    oof = np.empty((len(names), len(y)), dtype=np.float64)
+    for fold, scores in enumerate(results):
+        for i, name in enumerate(names):
+            oof[i, folds == fold] = scores[name]
+    return CrossValidationResult(names, y, folds, oof, wall_seconds)
+
+
+def cached_cross_validate(X: np.ndarray, y: np.ndarray, estimators: dict, n_splits: int = CV_FOLDS,
+                          n_jobs: int = None, preprocessor: ChurnPreprocessor = None,
+                          root: str = CV_DIR, version: str = None) -> CrossValidationResult:
+    """
+    ``cross_validate`` mémorisé sur disque.
+    
+    La clé est l'empreinte des données, des estimateurs (classe et
+    paramètres), du nombre de plis et des colonnes du prétraitement : un
+    nouveau processus relit les prédictions hors pli au lieu de refaire
+    les entraînements. Avec ``version`` (``data_version``), les données
+    sont identifiées sans être hachées.
+    
+    Returns
+    -------
+    CrossValidationResult
+        Plis et prédictions hors pli
+    """
+    columns = ChurnPreprocessor(preprocessor.feature_columns, preprocessor.categories) if preprocessor else None
+    config = {'models': describe_estimators(estimators), 'n_splits': n_splits}
+    key = training_key(X, y, columns, config=config, version=version)
+    path = os.path.join(root, f"{key}.npz")
+    
+    if os.path.exists(path):
+        return CrossValidationResult.load(path)
+    result = cross_validate(X, y, estimators, n_splits, n_jobs)
+    result.save(path)
+    return result
@@ -8,12 +8,13 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config import COLORS
+from config import COLORS, CORRELATION_COLUMNS, COLUMN_LABELS
 
 
 def plot_churn_distribution(df: pd.DataFrame) -> go.Figure:
@@ -45,7 +46,7 @@ def plot_churn_distribution(df: pd.DataFrame) -> go.Figure:
 def plot_churn_by_feature(df: pd.DataFrame, feature: str, title: str) -> go.Figure:
     """Analyse du churn par feature (bar chart ou histogram)"""
     
-    if df[feature].dtype in ['int64', 'float64'] and df[feature].nunique() > 10:
+    if pd.api.types.is_numeric_dtype(df[feature]) and df[feature].nunique() > 10:
         # Distribution continue
         fig = go.Figure()
         
@@ -67,35 +68,41 @@ def plot_churn_by_feature(df: pd.DataFrame, feature: str, title: str) -> go.Figu
         )
     else:
         # Taux de churn par catégorie
-        churn_rate = df.groupby(feature)['churn'].agg(['mean', 'count']).reset_index()
-        churn_rate.columns = [feature, 'taux_churn', 'count']
-        churn_rate['taux_churn'] = churn_rate['taux_churn'] * 100
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=churn_rate[feature],
-                y=churn_rate['taux_churn'],
-                marker_color=COLORS['primary'],
-                text=churn_rate['taux_churn'].round(1).astype(str) + '%',
-                textposition='outside'
-            )
-        ])
-        
-        fig.update_layout(
-            title=title,
-            xaxis_title=feature,
-            yaxis_title="Taux de Churn (%)",
-            height=400
+        churn_rate = df.groupby(feature, observed=True)['churn'].agg(['mean', 'count'])
+        churn_rate.columns = ['churn_rate', 'count']
+        fig = plot_churn_rate(churn_rate, feature, title)
+    
+    return fig
+
+
+def plot_churn_rate(churn_rate: pd.DataFrame, feature: str, title: str) -> go.Figure:
+    """Taux de churn par modalité, à partir d'agrégats (colonne churn_rate)"""
+    taux_churn = churn_rate['churn_rate'] * 100
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=churn_rate.index.astype(str),
+            y=taux_churn,
+            marker_color=COLORS['primary'],
+            text=taux_churn.round(1).astype(str) + '%',
+            textposition='outside'
         )
+    ])
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title=feature,
+        yaxis_title="Taux de Churn (%)",
+        height=400
+    )
     
     return fig
 
 
-def plot_correlation_matrix(df: pd.DataFrame) -> go.Figure:
-    """Matrice de corrélation heatmap"""
-    numeric_cols = ['age', 'tenure_months', 'monthly_charges', 'num_services', 
-                   'support_tickets', 'satisfaction_score', 'churn']
-    corr_matrix = df[numeric_cols].corr()
+def plot_correlation_matrix(df: pd.DataFrame, corr_matrix: pd.DataFrame = None) -> go.Figure:
+    """Matrice de corrélation heatmap (calculée sur ``df`` si non fournie)"""
+    if corr_matrix is None:
+        corr_matrix = df[CORRELATION_COLUMNS].corr()
     
     fig = go.Figure(data=go.Heatmap(
         z=corr_matrix.values,
@@ -226,6 +233,43 @@ def plot_risk_gauge(proba: float) -> go.Figure:
     return fig
 
 
+def plot_sensitivity_curves(curves: pd.DataFrame, customer: dict, n_cols: int = 5) -> go.Figure:
+    """Courbes de risque par variable (sortie de ``sensitivity_curves``), valeur actuelle marquée"""
+    variables = list(dict.fromkeys(curves['variable']))
+    n_rows = -(-len(variables) // n_cols)
+    fig = make_subplots(
+        rows=n_rows, cols=n_cols,
+        subplot_titles=[COLUMN_LABELS.get(v, v) for v in variables],
+        vertical_spacing=0.18, horizontal_spacing=0.05, shared_yaxes=True
+    )
+    
+    for i, variable in enumerate(variables):
+        row, col = i // n_cols + 1, i % n_cols + 1
+        data = curves[curves['variable'] == variable]
+        risk = data['probability'] * 100
+        current = customer.get(variable)
+        
+        if isinstance(current, str):
+            colors = [COLORS['churn'] if v == current else COLORS['primary'] for v in data['value']]
+            fig.add_trace(go.Bar(x=data['value'], y=risk, marker_color=colors), row=row, col=col)
+        else:
+            fig.add_trace(go.Scatter(
+                x=data['value'], y=risk, mode='lines',
+                line=dict(color=COLORS['primary'], width=2)
+            ), row=row, col=col)
+            if current is not None:
+                fig.add_vline(x=current, line=dict(color=COLORS['churn'], width=1, dash='dash'), row=row, col=col)
+    
+    fig.update_yaxes(range=[0, 100], ticksuffix='%')
+    fig.update_layout(
+        title="Sensibilité du Risque (valeur actuelle en rouge)",
+        height=280 * n_rows + 80,
+        showlegend=False
+    )
+    
+    return fig
+
+
 def plot_histogram(df: pd.DataFrame, column: str, title: str, nbins: int = 30) -> go.Figure:
     """Histogramme simple"""
     fig = go.Figure()